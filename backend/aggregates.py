@@ -0,0 +1,104 @@
+from collections import Counter
+from sqlalchemy import String, cast, delete, func, insert, literal, select, update
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.orm import Session
+from . import models
+
+# Dashboard dimension -> ticket attribute it counts by.
+DIMENSIONS = {
+    "status": "status",
+    "priority": "priority",
+    "column": "column_id",
+    "owner": "owner_id",
+}
+# Bucket for tickets whose attribute is NULL (e.g. unassigned owner).
+NONE_VALUE = ""
+
+def _value(value) -> str:
+    return NONE_VALUE if value is None else str(value)
+
+def deltas(before: dict = None, after: dict = None) -> Counter:
+    """Counter changes for one ticket going from `before` to `after`.
+
+    Both are dicts with project_id and the DIMENSIONS attributes; None stands
+    for a ticket that does not exist on that side (create or delete).
+    """
+    changes = Counter()
+    for state, sign in ((before, -1), (after, 1)):
+        if state is None or state.get("project_id") is None:
+            continue
+        for dimension, attribute in DIMENSIONS.items():
+            changes[(state["project_id"], dimension, _value(state.get(attribute)))] += sign
+    return changes
+
+def snapshot(ticket) -> dict:
+    """The attributes deltas() needs, read from a Ticket instance."""
+    return {"project_id": ticket.project_id, **{attribute: getattr(ticket, attribute) for attribute in DIMENSIONS.values()}}
+
+def _upsert(db: Session):
+    table = models.TicketAggregate.__table__
+    dialect = db.get_bind().dialect.name
+    if dialect not in ("postgresql", "sqlite"):
+        return None
+    statement = (postgresql.insert if dialect == "postgresql" else sqlite.insert)(table)
+    return statement.on_conflict_do_update(
+        index_elements=[table.c.project_id, table.c.dimension, table.c.value],
+        set_={"count": table.c.count + statement.excluded.count},
+    )
+
+def apply(db: Session, changes: Counter):
+    """Add `changes` to the counters inside the caller's transaction.
+
+    Rows are written in key order so concurrent writers take row locks in the
+    same order.
+    """
+    rows = [
+        {"project_id": project_id, "dimension": dimension, "value": value, "count": amount}
+        for (project_id, dimension, value), amount in sorted(changes.items())
+        if amount
+    ]
+    if not rows:
+        return
+    statement = _upsert(db)
+    if statement is not None:
+        db.execute(statement, rows)
+        return
+    table = models.TicketAggregate.__table__
+    for row in rows:
+        updated = db.execute(
+            update(table)
+            .where(table.c.project_id == row["project_id"], table.c.dimension == row["dimension"], table.c.value == row["value"])
+            .values(count=table.c.count + row["count"])
+        ).rowcount
+        if not updated:
+            db.execute(insert(table).values(**row))
+
+def ticket_changed(db: Session, before: dict = None, after: dict = None):
+    apply(db, deltas(before, after))
+
+def recompute(db: Session, project_id: int):
+    """Rebuild a project's counters from the tickets table with GROUP BY."""
+    table = models.TicketAggregate.__table__
+    db.execute(delete(table).where(table.c.project_id == project_id))
+    for dimension, attribute in DIMENSIONS.items():
+        column = getattr(models.Ticket, attribute)
+        value = func.coalesce(cast(column, String), NONE_VALUE)
+        db.execute(
+            insert(table).from_select(
+                ["project_id", "dimension", "value", "count"],
+                select(models.Ticket.project_id, literal(dimension), value, func.count())
+                .where(models.Ticket.project_id == project_id)
+                .group_by(models.Ticket.project_id, value),
+            )
+        )
+
+def read(db: Session, project_id: int) -> dict:
+    """Counts per dimension for a project, in O(groups)."""
+    result = {dimension: {} for dimension in DIMENSIONS}
+    for dimension, value, count in db.execute(
+        select(models.TicketAggregate.dimension, models.TicketAggregate.value, models.TicketAggregate.count)
+        .where(models.TicketAggregate.project_id == project_id, models.TicketAggregate.count != 0)
+    ):
+        if dimension in result:
+            result[dimension][value] = count
+    return {"project_id": project_id, "total": sum(result["status"].values()), **result}
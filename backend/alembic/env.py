@@ -16,7 +16,7 @@ if config.config_file_name is not None:
 
 # add your model's MetaData object here
 # for 'autogenerate' support
-from models import Base
+from backend.models import Base
 target_metadata = Base.metadata
 
 # other values from the config, defined by the needs of env.py,
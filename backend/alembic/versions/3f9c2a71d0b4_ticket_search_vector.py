@@ -0,0 +1,44 @@
+"""ticket search vector
+
+Revision ID: 3f9c2a71d0b4
+Revises: 
+Create Date: 2026-10-18 09:12:44.318204
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+
+# revision identifiers, used by Alembic.
+revision: str = '3f9c2a71d0b4'
+down_revision: Union[str, None] = None
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    if op.get_bind().dialect.name != "postgresql":
+        op.add_column('tickets', sa.Column('search_vector', sa.Text(), nullable=True))
+        return
+
+    op.add_column('tickets', sa.Column('search_vector', postgresql.TSVECTOR(), nullable=True))
+    op.execute(
+        """
+        UPDATE tickets SET search_vector =
+            setweight(to_tsvector('english', coalesce(title, '')), 'A') ||
+            setweight(to_tsvector('english', coalesce(description, '')), 'B') ||
+            setweight(to_tsvector('english', coalesce(
+                (SELECT string_agg(content, ' ') FROM comments WHERE comments.ticket_id = tickets.id), ''
+            )), 'C')
+        """
+    )
+    op.create_index('ix_tickets_search_vector', 'tickets', ['search_vector'], postgresql_using='gin')
+
+
+def downgrade() -> None:
+    if op.get_bind().dialect.name == "postgresql":
+        op.drop_index('ix_tickets_search_vector', table_name='tickets')
+    op.drop_column('tickets', 'search_vector')
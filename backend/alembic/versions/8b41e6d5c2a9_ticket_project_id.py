@@ -0,0 +1,57 @@
+"""ticket project_id and filter indexes
+
+Revision ID: 8b41e6d5c2a9
+Revises: 3f9c2a71d0b4
+Create Date: 2026-10-18 10:03:27.551930
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '8b41e6d5c2a9'
+down_revision: Union[str, None] = '3f9c2a71d0b4'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    with op.batch_alter_table('tickets') as batch_op:
+        batch_op.add_column(sa.Column('project_id', sa.Integer(), nullable=True))
+        batch_op.create_foreign_key('fk_tickets_project_id_projects', 'projects', ['project_id'], ['id'])
+
+    op.execute(
+        """
+        UPDATE tickets SET project_id = (
+            SELECT boards.project_id FROM columns
+            JOIN boards ON boards.id = columns.board_id
+            WHERE columns.id = tickets.column_id
+        )
+        """
+    )
+    # Tickets outside any column belong to no project and were unreachable
+    # through the API; drop them so the column can be NOT NULL.
+    orphans = 'SELECT id FROM tickets WHERE project_id IS NULL'
+    op.execute(f'DELETE FROM comments WHERE ticket_id IN ({orphans})')
+    op.execute(f'DELETE FROM ticket_history WHERE ticket_id IN ({orphans})')
+    op.execute('DELETE FROM tickets WHERE project_id IS NULL')
+    with op.batch_alter_table('tickets') as batch_op:
+        batch_op.alter_column('project_id', existing_type=sa.Integer(), nullable=False)
+
+    op.create_index('ix_tickets_project_id_id', 'tickets', ['project_id', 'id'])
+    op.create_index('ix_tickets_project_id_status_id', 'tickets', ['project_id', 'status', 'id'])
+    op.create_index('ix_tickets_project_id_priority_id', 'tickets', ['project_id', 'priority', 'id'])
+    op.create_index('ix_tickets_project_id_owner_id_id', 'tickets', ['project_id', 'owner_id', 'id'])
+
+
+def downgrade() -> None:
+    op.drop_index('ix_tickets_project_id_owner_id_id', table_name='tickets')
+    op.drop_index('ix_tickets_project_id_priority_id', table_name='tickets')
+    op.drop_index('ix_tickets_project_id_status_id', table_name='tickets')
+    op.drop_index('ix_tickets_project_id_id', table_name='tickets')
+    with op.batch_alter_table('tickets') as batch_op:
+        batch_op.drop_constraint('fk_tickets_project_id_projects', type_='foreignkey')
+        batch_op.drop_column('project_id')
@@ -0,0 +1,49 @@
+"""ticket aggregates
+
+Revision ID: a9d4e7c2b810
+Revises: e2a8f4b61c70
+Create Date: 2026-10-18 13:22:41.518302
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'a9d4e7c2b810'
+down_revision: Union[str, None] = 'e2a8f4b61c70'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+DIMENSIONS = {
+    'status': 'status',
+    'priority': 'priority',
+    'column': 'column_id',
+    'owner': 'owner_id',
+}
+
+
+def upgrade() -> None:
+    op.create_table(
+        'ticket_aggregates',
+        sa.Column('project_id', sa.Integer(), sa.ForeignKey('projects.id'), primary_key=True),
+        sa.Column('dimension', sa.String(), primary_key=True),
+        sa.Column('value', sa.String(), primary_key=True),
+        sa.Column('count', sa.Integer(), nullable=False, server_default='0'),
+    )
+    for dimension, column in DIMENSIONS.items():
+        op.execute(
+            f"""
+            INSERT INTO ticket_aggregates (project_id, dimension, value, count)
+            SELECT project_id, '{dimension}', COALESCE(CAST({column} AS VARCHAR), ''), COUNT(*)
+            FROM tickets
+            WHERE project_id IS NOT NULL
+            GROUP BY project_id, COALESCE(CAST({column} AS VARCHAR), '')
+            """
+        )
+
+
+def downgrade() -> None:
+    op.drop_table('ticket_aggregates')
@@ -0,0 +1,56 @@
+"""flow analytics rollups
+
+Revision ID: b3e6f1a9d472
+Revises: a9d4e7c2b810
+Create Date: 2026-10-18 14:05:12.904117
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'b3e6f1a9d472'
+down_revision: Union[str, None] = 'a9d4e7c2b810'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        'analytics_watermarks',
+        sa.Column('name', sa.String(), primary_key=True),
+        sa.Column('last_id', sa.Integer(), nullable=False),
+        sa.Column('updated_at', sa.DateTime(timezone=True), server_default=sa.func.now()),
+    )
+    op.create_table(
+        'ticket_flow_states',
+        sa.Column('ticket_id', sa.Integer(), primary_key=True),
+        sa.Column('project_id', sa.Integer(), nullable=False),
+        sa.Column('status', sa.String()),
+        sa.Column('column_id', sa.Integer()),
+        sa.Column('created_at', sa.DateTime(timezone=True)),
+        sa.Column('started_at', sa.DateTime(timezone=True)),
+        sa.Column('done_at', sa.DateTime(timezone=True)),
+        sa.Column('column_entered_at', sa.DateTime(timezone=True)),
+    )
+    op.create_index('ix_ticket_flow_states_project_id', 'ticket_flow_states', ['project_id'])
+    op.create_table(
+        'flow_buckets',
+        sa.Column('project_id', sa.Integer(), primary_key=True),
+        sa.Column('column_id', sa.Integer(), primary_key=True),
+        sa.Column('day', sa.Date(), primary_key=True),
+        sa.Column('metric', sa.String(), primary_key=True),
+        sa.Column('count', sa.Integer(), nullable=False),
+        sa.Column('total_seconds', sa.Float(), nullable=False),
+        sa.Column('digest', sa.Text()),
+    )
+
+
+def downgrade() -> None:
+    op.drop_table('flow_buckets')
+    op.drop_index('ix_ticket_flow_states_project_id', table_name='ticket_flow_states')
+    op.drop_table('ticket_flow_states')
+    op.drop_table('analytics_watermarks')
@@ -0,0 +1,46 @@
+"""project/ticket versions and ticket tombstones
+
+Revision ID: c5d7a09e4f13
+Revises: 8b41e6d5c2a9
+Create Date: 2026-10-18 11:26:05.104377
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'c5d7a09e4f13'
+down_revision: Union[str, None] = '8b41e6d5c2a9'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.add_column('projects', sa.Column('version', sa.Integer(), nullable=False, server_default='0'))
+    op.add_column('tickets', sa.Column('version', sa.Integer(), nullable=False, server_default='0'))
+    op.create_index('ix_tickets_project_id_version', 'tickets', ['project_id', 'version'])
+
+    op.create_table(
+        'ticket_tombstones',
+        sa.Column('id', sa.Integer(), nullable=False),
+        sa.Column('ticket_id', sa.Integer(), nullable=False),
+        sa.Column('project_id', sa.Integer(), nullable=False),
+        sa.Column('version', sa.Integer(), nullable=False),
+        sa.Column('deleted_at', sa.DateTime(timezone=True), server_default=sa.func.now(), nullable=True),
+        sa.ForeignKeyConstraint(['project_id'], ['projects.id']),
+        sa.PrimaryKeyConstraint('id'),
+    )
+    op.create_index('ix_ticket_tombstones_id', 'ticket_tombstones', ['id'])
+    op.create_index('ix_ticket_tombstones_project_id_version', 'ticket_tombstones', ['project_id', 'version'])
+
+
+def downgrade() -> None:
+    op.drop_index('ix_ticket_tombstones_project_id_version', table_name='ticket_tombstones')
+    op.drop_index('ix_ticket_tombstones_id', table_name='ticket_tombstones')
+    op.drop_table('ticket_tombstones')
+    op.drop_index('ix_tickets_project_id_version', table_name='tickets')
+    op.drop_column('tickets', 'version')
+    op.drop_column('projects', 'version')
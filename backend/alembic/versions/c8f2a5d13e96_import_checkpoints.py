@@ -0,0 +1,34 @@
+"""import checkpoints
+
+Revision ID: c8f2a5d13e96
+Revises: b3e6f1a9d472
+Create Date: 2026-10-18 14:47:36.220845
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'c8f2a5d13e96'
+down_revision: Union[str, None] = 'b3e6f1a9d472'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        'import_checkpoints',
+        sa.Column('job', sa.String(), primary_key=True),
+        sa.Column('project_id', sa.Integer(), nullable=False),
+        sa.Column('position', sa.Integer(), nullable=False),
+        sa.Column('imported', sa.Integer(), nullable=False),
+        sa.Column('failed', sa.Integer(), nullable=False),
+        sa.Column('updated_at', sa.DateTime(timezone=True), server_default=sa.func.now()),
+    )
+
+
+def downgrade() -> None:
+    op.drop_table('import_checkpoints')
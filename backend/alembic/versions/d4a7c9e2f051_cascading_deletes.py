@@ -0,0 +1,68 @@
+"""cascading deletes and project deletion jobs
+
+Revision ID: d4a7c9e2f051
+Revises: c8f2a5d13e96
+Create Date: 2026-10-18 15:32:08.417230
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'd4a7c9e2f051'
+down_revision: Union[str, None] = 'c8f2a5d13e96'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+# Constraints created by metadata.create_all carry PostgreSQL's default
+# names; SQLite leaves them unnamed, which the batch naming convention covers.
+NAMING_CONVENTION = {"fk": "%(table_name)s_%(column_0_name)s_fkey"}
+
+# (table, column, referred table, constraint name)
+FOREIGN_KEYS = [
+    ('project_users', 'project_id', 'projects', 'project_users_project_id_fkey'),
+    ('boards', 'project_id', 'projects', 'boards_project_id_fkey'),
+    ('columns', 'board_id', 'boards', 'columns_board_id_fkey'),
+    ('tickets', 'column_id', 'columns', 'tickets_column_id_fkey'),
+    ('tickets', 'project_id', 'projects', 'fk_tickets_project_id_projects'),
+    ('comments', 'ticket_id', 'tickets', 'comments_ticket_id_fkey'),
+    ('ticket_history', 'ticket_id', 'tickets', 'ticket_history_ticket_id_fkey'),
+    ('ticket_tombstones', 'project_id', 'projects', 'ticket_tombstones_project_id_fkey'),
+    ('ticket_aggregates', 'project_id', 'projects', 'ticket_aggregates_project_id_fkey'),
+    ('invitations', 'project_id', 'projects', 'invitations_project_id_fkey'),
+]
+
+
+def _recreate_foreign_keys(ondelete) -> None:
+    for table, column, referred, name in FOREIGN_KEYS:
+        with op.batch_alter_table(table, naming_convention=NAMING_CONVENTION) as batch_op:
+            batch_op.drop_constraint(name, type_='foreignkey')
+            batch_op.create_foreign_key(name, referred, [column], ['id'], ondelete=ondelete)
+
+
+def upgrade() -> None:
+    _recreate_foreign_keys('CASCADE')
+    op.add_column('projects', sa.Column('deleted_at', sa.DateTime(timezone=True), nullable=True))
+    op.create_table(
+        'project_deletions',
+        sa.Column('project_id', sa.Integer(), primary_key=True),
+        sa.Column('requested_by_id', sa.Integer(), nullable=True),
+        sa.Column('status', sa.String(), nullable=False),
+        sa.Column('total_tickets', sa.Integer(), nullable=False),
+        sa.Column('deleted_tickets', sa.Integer(), nullable=False),
+        sa.Column('error', sa.Text(), nullable=True),
+        sa.Column('created_at', sa.DateTime(timezone=True), server_default=sa.func.now()),
+        sa.Column('updated_at', sa.DateTime(timezone=True), server_default=sa.func.now()),
+        sa.Column('finished_at', sa.DateTime(timezone=True), nullable=True),
+    )
+    op.create_index('ix_project_deletions_status', 'project_deletions', ['status'])
+
+
+def downgrade() -> None:
+    op.drop_index('ix_project_deletions_status', table_name='project_deletions')
+    op.drop_table('project_deletions')
+    op.drop_column('projects', 'deleted_at')
+    _recreate_foreign_keys(None)
@@ -0,0 +1,26 @@
+"""ticket history (ticket_id, id) index
+
+Revision ID: e2a8f4b61c70
+Revises: c5d7a09e4f13
+Create Date: 2026-10-18 12:02:51.662310
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'e2a8f4b61c70'
+down_revision: Union[str, None] = 'c5d7a09e4f13'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_index('ix_ticket_history_ticket_id_id', 'ticket_history', ['ticket_id', 'id'])
+
+
+def downgrade() -> None:
+    op.drop_index('ix_ticket_history_ticket_id_id', table_name='ticket_history')
@@ -0,0 +1,72 @@
+"""ticket and column ranks
+
+Revision ID: e7b2d5f8a316
+Revises: d4a7c9e2f051
+Create Date: 2026-10-18 16:05:51.903317
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'e7b2d5f8a316'
+down_revision: Union[str, None] = 'd4a7c9e2f051'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+RANK_TYPE = sa.String().with_variant(sa.String(collation='C'), 'postgresql')
+
+# Frozen copy of the key format in backend/ranking.py at this revision:
+# base-36 digits, a six-digit head, trailing zeros stripped.
+DIGITS = '0123456789abcdefghijklmnopqrstuvwxyz'
+WIDTH = 6
+
+
+def _encode(head: int) -> str:
+    digits = []
+    for _ in range(WIDTH):
+        head, digit = divmod(head, len(DIGITS))
+        digits.append(DIGITS[digit])
+    return ''.join(reversed(digits)).rstrip('0')
+
+
+def _spread(count: int) -> list:
+    step = max(len(DIGITS) ** WIDTH // (count + 1), 1)
+    return [_encode((index + 1) * step) for index in range(count)]
+
+
+def _backfill(table_name: str, scope: str) -> None:
+    # Existing rows keep their id order, spread evenly within each scope.
+    bind = op.get_bind()
+    table = sa.table(table_name, sa.column('id', sa.Integer()), sa.column(scope, sa.Integer()), sa.column('rank', sa.String()))
+    scope_column = table.c[scope]
+    for scope_id in bind.execute(sa.select(scope_column).where(scope_column.is_not(None)).distinct()).scalars().all():
+        ids = bind.execute(sa.select(table.c.id).where(scope_column == scope_id).order_by(table.c.id)).scalars().all()
+        bind.execute(
+            table.update().where(table.c.id == sa.bindparam('row_id')).values(rank=sa.bindparam('new_rank')),
+            [{'row_id': row_id, 'new_rank': rank} for row_id, rank in zip(ids, _spread(len(ids)))],
+        )
+    # Tickets without a column still need a key.
+    bind.execute(table.update().where(table.c.rank.is_(None)).values(rank=_spread(1)[0]))
+
+
+def upgrade() -> None:
+    for table_name, scope in (('columns', 'board_id'), ('tickets', 'column_id')):
+        op.add_column(table_name, sa.Column('rank', RANK_TYPE, nullable=True))
+        _backfill(table_name, scope)
+        with op.batch_alter_table(table_name) as batch_op:
+            batch_op.alter_column('rank', existing_type=RANK_TYPE, nullable=False)
+    op.create_index('ix_columns_board_id_rank', 'columns', ['board_id', 'rank'])
+    op.create_index('ix_tickets_column_id_rank', 'tickets', ['column_id', 'rank'])
+
+
+def downgrade() -> None:
+    op.drop_index('ix_tickets_column_id_rank', table_name='tickets')
+    op.drop_index('ix_columns_board_id_rank', table_name='columns')
+    with op.batch_alter_table('tickets') as batch_op:
+        batch_op.drop_column('rank')
+    with op.batch_alter_table('columns') as batch_op:
+        batch_op.drop_column('rank')
@@ -0,0 +1,320 @@
+from collections import defaultdict
+from datetime import date, datetime, timedelta, timezone
+from dotenv import load_dotenv
+from sqlalchemy import select, tuple_
+from sqlalchemy.orm import Session
+import argparse
+import json
+import logging
+import math
+import os
+import time
+from . import models
+from .database import SessionLocal
+
+load_dotenv()
+
+logger = logging.getLogger(__name__)
+
+def _statuses(name: str, default: str) -> frozenset:
+    return frozenset(value.strip().lower() for value in os.getenv(name, default).split(",") if value.strip())
+
+# Statuses that mean work has not started, and statuses that mean it is finished.
+ANALYTICS_TODO_STATUSES = _statuses("ANALYTICS_TODO_STATUSES", "open")
+ANALYTICS_DONE_STATUSES = _statuses("ANALYTICS_DONE_STATUSES", "done,closed")
+ANALYTICS_BATCH_SIZE = int(os.getenv("ANALYTICS_BATCH_SIZE", "5000"))
+# History younger than this is left for the next run, so rows written by
+# transactions that are still open when the watermark moves are not skipped.
+# The watermark stops at the first young row; rows after it wait with it.
+ANALYTICS_SETTLE_SECONDS = float(os.getenv("ANALYTICS_SETTLE_SECONDS", "60"))
+ANALYTICS_MAX_RANGE_DAYS = int(os.getenv("ANALYTICS_MAX_RANGE_DAYS", "366"))
+
+WATERMARK = "ticket_history"
+PROJECT_WIDE = 0
+FLOW_FIELDS = ("status", "column_id")
+
+LEAD_TIME = "lead_time"
+CYCLE_TIME = "cycle_time"
+THROUGHPUT = "throughput"
+COLUMN_DWELL = "column_dwell"
+
+QUANTILES = {"p50": 0.5, "p85": 0.85, "p95": 0.95}
+
+
+class Digest:
+    """Mergeable histogram of durations in seconds with log-spaced buckets.
+
+    Bucket bounds grow by GROWTH, so a quantile read from the digest is within
+    GROWTH - 1 of the exact value, and digests for different days combine by
+    adding counts.
+    """
+
+    GROWTH = 1.05
+
+    def __init__(self, counts: dict = None):
+        self.counts = defaultdict(int, counts or {})
+
+    @classmethod
+    def loads(cls, raw: str):
+        return cls({int(index): count for index, count in json.loads(raw).items()} if raw else None)
+
+    def dumps(self):
+        if not self.counts:
+            return None
+        return json.dumps({str(index): count for index, count in sorted(self.counts.items())}, separators=(",", ":"))
+
+    def add(self, seconds: float):
+        index = 0 if seconds < 1 else 1 + int(math.log(seconds, self.GROWTH))
+        self.counts[index] += 1
+
+    def merge(self, other: "Digest"):
+        for index, count in other.counts.items():
+            self.counts[index] += count
+
+    def quantile(self, q: float):
+        total = sum(self.counts.values())
+        if not total:
+            return None
+        rank = max(1, math.ceil(q * total))
+        seen = 0
+        for index in sorted(self.counts):
+            seen += self.counts[index]
+            if seen >= rank:
+                # Geometric midpoint of the bucket [GROWTH^(i-1), GROWTH^i).
+                return 0.0 if index == 0 else self.GROWTH ** (index - 0.5)
+        return None
+
+
+class _Buckets:
+    def __init__(self):
+        self.values = {}
+
+    def add(self, project_id: int, column_id: int, moment: datetime, metric: str, seconds: float = None):
+        key = (project_id, column_id, moment.date(), metric)
+        bucket = self.values.get(key)
+        if bucket is None:
+            bucket = self.values[key] = {"count": 0, "total_seconds": 0.0, "digest": Digest()}
+        bucket["count"] += 1
+        if seconds is not None:
+            bucket["total_seconds"] += seconds
+            bucket["digest"].add(seconds)
+
+
+def _as_utc(moment: datetime) -> datetime:
+    # SQLite hands back naive UTC timestamps.
+    return moment if moment.tzinfo is not None else moment.replace(tzinfo=timezone.utc)
+
+def _seconds(start: datetime, end: datetime) -> float:
+    return max((end - start).total_seconds(), 0.0)
+
+def _replay(state: models.TicketFlowState, row, buckets: _Buckets):
+    at = row.changed_at
+    if row.field_changed == "column_id":
+        if row.old_value is not None and state.column_id is not None and state.column_entered_at is not None:
+            buckets.add(state.project_id, state.column_id, at, COLUMN_DWELL, _seconds(state.column_entered_at, at))
+        state.column_id = int(row.new_value) if row.new_value is not None else None
+        state.column_entered_at = at
+        return
+
+    status = (row.new_value or "").lower()
+    state.status = row.new_value
+    if state.created_at is None:
+        state.created_at = at
+    if state.started_at is None and status not in ANALYTICS_TODO_STATUSES:
+        state.started_at = at
+    if status in ANALYTICS_DONE_STATUSES:
+        if state.done_at is None:
+            state.done_at = at
+            lead = _seconds(state.created_at, at)
+            cycle = _seconds(state.started_at, at)
+            for column_id in {PROJECT_WIDE, state.column_id} - {None}:
+                buckets.add(state.project_id, column_id, at, LEAD_TIME, lead)
+                buckets.add(state.project_id, column_id, at, CYCLE_TIME, cycle)
+                buckets.add(state.project_id, column_id, at, THROUGHPUT)
+    elif state.done_at is not None:
+        # Reopened; completing it again counts as another completion.
+        state.done_at = None
+
+def _write_buckets(db: Session, buckets: _Buckets):
+    keys = list(buckets.values)
+    existing = {}
+    for start in range(0, len(keys), 500):
+        chunk = keys[start:start + 500]
+        for bucket in db.execute(
+            select(models.FlowBucket).where(
+                tuple_(
+                    models.FlowBucket.project_id, models.FlowBucket.column_id,
+                    models.FlowBucket.day, models.FlowBucket.metric,
+                ).in_(chunk)
+            )
+        ).scalars():
+            existing[(bucket.project_id, bucket.column_id, bucket.day, bucket.metric)] = bucket
+    for key, values in buckets.values.items():
+        bucket = existing.get(key)
+        if bucket is None:
+            project_id, column_id, day, metric = key
+            db.add(models.FlowBucket(
+                project_id=project_id, column_id=column_id, day=day, metric=metric,
+                count=values["count"], total_seconds=values["total_seconds"], digest=values["digest"].dumps(),
+            ))
+            continue
+        digest = Digest.loads(bucket.digest)
+        digest.merge(values["digest"])
+        bucket.count += values["count"]
+        bucket.total_seconds += values["total_seconds"]
+        bucket.digest = digest.dumps()
+
+def process_batch(db: Session, limit: int = ANALYTICS_BATCH_SIZE) -> int:
+    """Roll up the next `limit` status/column history rows past the watermark.
+
+    Per-ticket flow state carries what replay needs between runs (creation,
+    start and completion times, current column), so each history row is read
+    once. State, buckets and the watermark change in the caller's
+    transaction, which makes a committed batch count exactly once.
+    """
+    watermark = db.get(models.AnalyticsWatermark, WATERMARK, with_for_update=True)
+    if watermark is None:
+        watermark = models.AnalyticsWatermark(name=WATERMARK, last_id=0)
+        db.add(watermark)
+
+    cutoff = datetime.now(timezone.utc) - timedelta(seconds=ANALYTICS_SETTLE_SECONDS)
+    rows = db.execute(
+        select(
+            models.TicketHistory.id, models.TicketHistory.ticket_id, models.TicketHistory.field_changed,
+            models.TicketHistory.old_value, models.TicketHistory.new_value, models.TicketHistory.changed_at,
+        )
+        .where(
+            models.TicketHistory.id > watermark.last_id,
+            models.TicketHistory.field_changed.in_(FLOW_FIELDS),
+        )
+        .order_by(models.TicketHistory.id)
+        .limit(limit)
+    ).all()
+    # The watermark may only pass a contiguous run of settled rows; skipping a
+    # young row to reach older ones behind it would lose it for good.
+    history = []
+    for row in rows:
+        if _as_utc(row.changed_at) > cutoff:
+            break
+        history.append(row)
+    if not history:
+        return 0
+
+    ticket_ids = {row.ticket_id for row in history}
+    states = {
+        state.ticket_id: state
+        for state in db.execute(
+            select(models.TicketFlowState).where(models.TicketFlowState.ticket_id.in_(ticket_ids))
+        ).scalars()
+    }
+    for ticket_id, project_id, created_at in db.execute(
+        select(models.Ticket.id, models.Ticket.project_id, models.Ticket.created_at).where(models.Ticket.id.in_(ticket_ids))
+    ):
+        if project_id is None:
+            continue
+        state = states.get(ticket_id)
+        if state is None:
+            state = states[ticket_id] = models.TicketFlowState(ticket_id=ticket_id, project_id=project_id, created_at=created_at)
+            db.add(state)
+        else:
+            state.project_id = project_id
+
+    buckets = _Buckets()
+    for row in history:
+        state = states.get(row.ticket_id)
+        # Tickets deleted before their first rollup have nothing to attribute to.
+        if state is not None:
+            _replay(state, row, buckets)
+    _write_buckets(db, buckets)
+    watermark.last_id = history[-1].id
+    return len(history)
+
+def run(batch_size: int = ANALYTICS_BATCH_SIZE) -> int:
+    """Process batches until the backlog is drained; returns rows processed."""
+    total = 0
+    while True:
+        db = SessionLocal()
+        try:
+            processed = process_batch(db, batch_size)
+            db.commit()
+        except Exception:
+            db.rollback()
+            raise
+        finally:
+            db.close()
+        total += processed
+        if processed < batch_size:
+            return total
+
+def _stats(count: int, total_seconds: float, digest: Digest) -> dict:
+    return {
+        "count": count,
+        "mean_seconds": total_seconds / count if count else None,
+        **{f"{name}_seconds": digest.quantile(q) for name, q in QUANTILES.items()},
+    }
+
+def _week(day: date) -> date:
+    return day - timedelta(days=day.weekday())
+
+def flow_summary(db: Session, project_id: int, start: date, end: date) -> dict:
+    """Lead/cycle time, weekly throughput and per-column flow over [start, end]."""
+    totals = defaultdict(lambda: {"count": 0, "total_seconds": 0.0, "digest": Digest()})
+    weekly = defaultdict(int)
+    for bucket in db.execute(
+        select(models.FlowBucket).where(
+            models.FlowBucket.project_id == project_id,
+            models.FlowBucket.day >= start,
+            models.FlowBucket.day <= end,
+        )
+    ).scalars():
+        total = totals[(bucket.column_id, bucket.metric)]
+        total["count"] += bucket.count
+        total["total_seconds"] += bucket.total_seconds
+        total["digest"].merge(Digest.loads(bucket.digest))
+        if bucket.column_id == PROJECT_WIDE and bucket.metric == THROUGHPUT:
+            weekly[_week(bucket.day)] += bucket.count
+
+    def stats(column_id, metric):
+        total = totals.get((column_id, metric))
+        return _stats(total["count"], total["total_seconds"], total["digest"]) if total else _stats(0, 0.0, Digest())
+
+    weeks = []
+    week = _week(start)
+    while week <= end:
+        weeks.append({"week_start": week, "count": weekly.get(week, 0)})
+        week += timedelta(days=7)
+
+    column_ids = sorted({column_id for column_id, _ in totals} - {PROJECT_WIDE})
+    return {
+        "project_id": project_id,
+        "start": start,
+        "end": end,
+        "lead_time": stats(PROJECT_WIDE, LEAD_TIME),
+        "cycle_time": stats(PROJECT_WIDE, CYCLE_TIME),
+        "throughput": weeks,
+        "columns": [
+            {
+                "column_id": column_id,
+                "dwell": stats(column_id, COLUMN_DWELL),
+                "completed": stats(column_id, THROUGHPUT)["count"],
+                "cycle_time": stats(column_id, CYCLE_TIME),
+            }
+            for column_id in column_ids
+        ],
+    }
+
+def main():
+    parser = argparse.ArgumentParser(description="Roll up ticket history into flow analytics buckets.")
+    parser.add_argument("--batch-size", type=int, default=ANALYTICS_BATCH_SIZE)
+    parser.add_argument("--interval", type=float, default=0, help="Keep running, polling every N seconds")
+    args = parser.parse_args()
+    logging.basicConfig(level=logging.INFO)
+    while True:
+        logger.info("Rolled up %d history rows", run(args.batch_size))
+        if not args.interval:
+            return
+        time.sleep(args.interval)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,112 @@
+"""Compare response serialization paths for large ticket and project lists.
+
+Run from the repository root:
+
+    python -m backend.benchmarks.bench_serialization --tickets 5000 --projects 500
+
+"baseline" mirrors what a response_model route does with ORM instances:
+validate each object from attributes, then encode it. "fast" is the path
+used by the list endpoints in serialization.py.
+"""
+import argparse
+import os
+import time
+from datetime import datetime
+
+os.environ.setdefault("DATABASE_URL", "sqlite://")
+
+from fastapi.encoders import jsonable_encoder
+from sqlalchemy import create_engine, select
+from sqlalchemy.orm import Session, selectinload
+import json
+
+from backend import models, ranking, schemas, serialization
+
+
+def _seed(db: Session, tickets: int, projects: int):
+    now = datetime.utcnow()
+    users = [
+        models.User(username=f"user{i}", email=f"user{i}@example.com", hashed_password="x", role="Developer", created_at=now)
+        for i in range(20)
+    ]
+    db.add_all(users)
+    project_rows = []
+    for i in range(projects):
+        project = models.Project(name=f"Project {i}", description="Benchmark project", created_at=now)
+        project.users = users[i % 10:i % 10 + 5]
+        project_rows.append(project)
+    db.add_all(project_rows)
+    db.flush()
+    board = models.Board(name="Board", project_id=project_rows[0].id, created_at=now)
+    db.add(board)
+    db.flush()
+    column = models.Column(name="To Do", board_id=board.id, rank=ranking.between(None, None))
+    db.add(column)
+    db.flush()
+    db.add_all(
+        models.Ticket(
+            title=f"Ticket {i}", description="Lorem ipsum dolor sit amet " * 4, status="Open", priority="Medium",
+            owner_id=users[i % 20].id, column_id=column.id, project_id=board.project_id, rank=rank, version=i,
+            created_at=now,
+        )
+        for i, rank in enumerate(ranking.spread(tickets))
+    )
+    db.commit()
+
+
+def _time(label: str, fn, repeat: int):
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - start)
+    print(f"  {label:<10} {best * 1000:9.1f} ms")
+    return best
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--tickets", type=int, default=5000)
+    parser.add_argument("--projects", type=int, default=500)
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    engine = create_engine("sqlite://")
+    models.Base.metadata.create_all(engine)
+    with Session(engine) as db:
+        _seed(db, args.tickets, args.projects)
+
+    def baseline(schema, load):
+        def run():
+            with Session(engine) as db:
+                objects = load(db)
+                json.dumps(jsonable_encoder([schema.model_validate(obj) for obj in objects])).encode()
+        return run
+
+    load_tickets = lambda db: db.execute(select(models.Ticket).order_by(models.Ticket.id)).scalars().all()
+    load_projects = lambda db: db.execute(
+        select(models.Project).options(selectinload(models.Project.users)).order_by(models.Project.id)
+    ).scalars().all()
+
+    def fast_tickets():
+        with Session(engine) as db:
+            rows = serialization.select_rows(db, schemas.Ticket, models.Ticket, select(models.Ticket).order_by(models.Ticket.id))
+            serialization.dumps(rows)
+
+    def fast_projects():
+        with Session(engine) as db:
+            serialization.dumps(serialization.dump_objects(schemas.Project, load_projects(db)))
+
+    print(f"schemas.Ticket x {args.tickets} (orjson: {serialization.orjson is not None})")
+    slow = _time("baseline", baseline(schemas.Ticket, load_tickets), args.repeat)
+    fast = _time("fast", fast_tickets, args.repeat)
+    print(f"  speedup    {slow / fast:9.1f}x")
+
+    print(f"schemas.Project x {args.projects} (5 members each)")
+    slow = _time("baseline", baseline(schemas.Project, load_projects), args.repeat)
+    fast = _time("fast", fast_projects, args.repeat)
+    print(f"  speedup    {slow / fast:9.1f}x")
+
+
+if __name__ == "__main__":
+    main()
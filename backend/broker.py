@@ -0,0 +1,152 @@
+from abc import ABC, abstractmethod
+from collections import OrderedDict
+from dotenv import load_dotenv
+import asyncio
+import json
+import logging
+import os
+import uuid
+from .metrics import Counter
+
+load_dotenv()
+
+logger = logging.getLogger(__name__)
+
+REDIS_URL = os.getenv("REDIS_URL")
+WS_BROKER = os.getenv("WS_BROKER", "redis" if REDIS_URL else "memory")
+WS_BROKER_CHANNEL = os.getenv("WS_BROKER_CHANNEL", "ticketing:events")
+WS_BROKER_BATCH_MS = float(os.getenv("WS_BROKER_BATCH_MS", "10"))
+WS_BROKER_BATCH_SIZE = int(os.getenv("WS_BROKER_BATCH_SIZE", "200"))
+WS_BROKER_DEDUP_WINDOW = int(os.getenv("WS_BROKER_DEDUP_WINDOW", "10000"))
+
+broker_published_total = Counter("broker_published_total", "Envelopes published to the broker")
+broker_batches_total = Counter("broker_batches_total", "Batches written to the broker")
+broker_duplicates_total = Counter("broker_duplicates_total", "Received envelopes skipped as duplicates")
+
+
+class Broker(ABC):
+    """Carries (topic, message) pairs between workers.
+
+    publish() must be called from the event loop thread. deliver(topic,
+    message) is invoked once per envelope on every worker, including the one
+    that published it.
+    """
+
+    def __init__(self):
+        self.deliver = None
+
+    async def start(self, deliver):
+        self.deliver = deliver
+
+    @abstractmethod
+    def publish(self, topic: str, message: str):
+        """Send `message` to every worker subscribed through this broker."""
+
+    async def stop(self):
+        pass
+
+
+class InMemoryBroker(Broker):
+    """Single-process broker for development and tests."""
+
+    def publish(self, topic: str, message: str):
+        broker_published_total.inc()
+        if self.deliver is not None:
+            self.deliver(topic, message)
+
+
+class RedisBroker(Broker):
+    """Redis pub/sub broker that batches on publish and deduplicates on receive.
+
+    Envelopes are delivered locally as soon as they are published and sent to
+    Redis in batches; the copy that comes back through the subscription is
+    recognised by its id and skipped, as is any redelivered duplicate.
+    """
+
+    def __init__(self, url: str = REDIS_URL, channel: str = WS_BROKER_CHANNEL):
+        super().__init__()
+        self.url = url
+        self.channel = channel
+        self._redis = None
+        self._pending = []
+        self._flush_handle = None
+        self._receiver = None
+        self._seen = OrderedDict()
+
+    async def start(self, deliver):
+        import redis.asyncio as redis
+
+        await super().start(deliver)
+        self._redis = redis.from_url(self.url)
+        self._receiver = asyncio.create_task(self._receive())
+
+    def _remember(self, envelope_id: str) -> bool:
+        if envelope_id in self._seen:
+            return False
+        self._seen[envelope_id] = None
+        if len(self._seen) > WS_BROKER_DEDUP_WINDOW:
+            self._seen.popitem(last=False)
+        return True
+
+    def publish(self, topic: str, message: str):
+        envelope = {"id": uuid.uuid4().hex, "topic": topic, "message": message}
+        self._remember(envelope["id"])
+        broker_published_total.inc()
+        if self.deliver is not None:
+            self.deliver(topic, message)
+        self._pending.append(envelope)
+        if len(self._pending) >= WS_BROKER_BATCH_SIZE:
+            self._schedule_flush(0)
+        elif self._flush_handle is None:
+            self._schedule_flush(WS_BROKER_BATCH_MS / 1000)
+
+    def _schedule_flush(self, delay: float):
+        if self._flush_handle is not None:
+            self._flush_handle.cancel()
+        loop = asyncio.get_running_loop()
+        self._flush_handle = loop.call_later(delay, lambda: asyncio.create_task(self._flush()))
+
+    async def _flush(self):
+        self._flush_handle = None
+        batch, self._pending = self._pending, []
+        if not batch or self._redis is None:
+            return
+        try:
+            await self._redis.publish(self.channel, json.dumps(batch, separators=(",", ":")))
+            broker_batches_total.inc()
+        except Exception:
+            logger.exception("Failed to publish %d events to Redis", len(batch))
+
+    async def _receive(self):
+        while True:
+            try:
+                pubsub = self._redis.pubsub()
+                await pubsub.subscribe(self.channel)
+                async for item in pubsub.listen():
+                    if item.get("type") != "message":
+                        continue
+                    for envelope in json.loads(item["data"]):
+                        if not self._remember(envelope["id"]):
+                            broker_duplicates_total.inc()
+                            continue
+                        self.deliver(envelope["topic"], envelope["message"])
+            except asyncio.CancelledError:
+                raise
+            except Exception:
+                logger.exception("Redis subscription failed; reconnecting")
+                await asyncio.sleep(1)
+
+    async def stop(self):
+        if self._flush_handle is not None:
+            self._flush_handle.cancel()
+        await self._flush()
+        if self._receiver is not None:
+            self._receiver.cancel()
+        if self._redis is not None:
+            await self._redis.close()
+
+
+def create_broker() -> Broker:
+    if WS_BROKER == "redis" and REDIS_URL:
+        return RedisBroker()
+    return InMemoryBroker()
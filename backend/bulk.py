@@ -0,0 +1,227 @@
+from collections import defaultdict
+from sqlalchemy import insert, select, update
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Session
+from . import models, permissions, aggregates, events, history, ranking, versioning, search
+
+# Ticket attributes a bulk item may set.
+ITEM_FIELDS = ("title", "description", "status", "priority", "owner_id", "column_id")
+CARD_FIELDS = ("title", "status", "priority", "owner_id", "column_id")
+# Attributes an update may change but not clear.
+REQUIRED_FIELDS = ("title", "status", "priority", "column_id")
+
+def apply_ticket_batch(db: Session, user: models.User, items: list):
+    """Apply create/update/move items in the caller's transaction.
+
+    Uses a fixed number of statements regardless of batch size: one lookup
+    for the referenced tickets, one for the referenced columns, one
+    membership probe per distinct project, then executemany INSERT/UPDATE
+    for tickets, history and tombstones. Returns (results, batches) where
+    batches maps project_id -> (version, change events) for publishing
+    after commit.
+
+    The batch is written in a savepoint. If a row still violates a
+    constraint (say, an owner_id that does not exist), the savepoint is
+    rolled back and the items are applied one savepoint each, so only the
+    offending items fail.
+    """
+    try:
+        with db.begin_nested():
+            return _apply(db, user, items)
+    except IntegrityError:
+        pass
+
+    results = []
+    batches = {}
+    for index, item in enumerate(items):
+        try:
+            with db.begin_nested():
+                (result,), item_batches = _apply(db, user, [item])
+        except IntegrityError:
+            result, item_batches = {"ok": False, "error": "Conflicts with existing data"}, {}
+        results.append({**result, "index": index})
+        for project_id, (version, changes) in item_batches.items():
+            previous_version, previous_changes = batches.get(project_id, (version, []))
+            batches[project_id] = (max(version, previous_version), previous_changes + changes)
+    return results, batches
+
+def _apply(db: Session, user: models.User, items: list):
+    results = [None] * len(items)
+
+    ticket_ids = {item.id for item in items if item.op != "create" and item.id is not None}
+    state = {}
+    if ticket_ids:
+        for row in db.execute(
+            select(models.Ticket.id, models.Ticket.project_id, *(getattr(models.Ticket, f) for f in ITEM_FIELDS))
+            .where(models.Ticket.id.in_(ticket_ids))
+        ).mappings():
+            state[row["id"]] = dict(row)
+
+    column_ids = {item.column_id for item in items if item.column_id is not None}
+    column_ids |= {ticket["column_id"] for ticket in state.values() if ticket["column_id"] is not None}
+    columns = {}
+    if column_ids:
+        columns = {
+            row.id: row
+            for row in db.execute(
+                select(models.Column.id, models.Column.board_id, models.Board.project_id)
+                .join(models.Board, models.Board.id == models.Column.board_id)
+                .where(models.Column.id.in_(column_ids))
+            )
+        }
+
+    project_ids = {ticket["project_id"] for ticket in state.values()} | {column.project_id for column in columns.values()}
+    allowed = {pid for pid in project_ids if pid is not None and permissions.is_project_member(db, pid, user.id)}
+
+    original = {ticket_id: dict(ticket) for ticket_id, ticket in state.items()}
+    creates = []
+    changed = defaultdict(dict)
+    history_rows = defaultdict(list)
+
+    for index, item in enumerate(items):
+        fields = item.model_dump(exclude_unset=True, include=set(ITEM_FIELDS))
+        if item.op == "move":
+            fields = {"column_id": item.column_id} if item.column_id is not None else {}
+            if not fields:
+                results[index] = {"index": index, "ok": False, "error": "column_id is required to move a ticket"}
+                continue
+
+        if item.op == "create":
+            column = columns.get(item.column_id)
+            if not item.title or column is None:
+                results[index] = {"index": index, "ok": False, "error": "title and an existing column_id are required"}
+                continue
+            if column.project_id not in allowed:
+                results[index] = {"index": index, "ok": False, "error": "Not authorized to create tickets in this project"}
+                continue
+            row = {
+                "title": item.title,
+                "description": item.description,
+                "status": item.status or "open",
+                "priority": item.priority or "medium",
+                "owner_id": item.owner_id if item.owner_id is not None else user.id,
+                "column_id": column.id,
+                "project_id": column.project_id,
+            }
+            creates.append((index, row))
+            continue
+
+        cleared = [field for field in REQUIRED_FIELDS if field in fields and fields[field] is None]
+        if cleared:
+            results[index] = {"index": index, "ok": False, "error": f"{', '.join(cleared)} cannot be null"}
+            continue
+
+        ticket = state.get(item.id)
+        if ticket is None:
+            results[index] = {"index": index, "ok": False, "error": "Ticket not found"}
+            continue
+        if ticket["project_id"] not in allowed:
+            results[index] = {"index": index, "ok": False, "error": "Not authorized to update this ticket"}
+            continue
+        if fields.get("column_id") is not None and fields["column_id"] != ticket["column_id"]:
+            column = columns.get(fields["column_id"])
+            if column is None:
+                results[index] = {"index": index, "ok": False, "error": "Column not found"}
+                continue
+            if column.project_id not in allowed:
+                results[index] = {"index": index, "ok": False, "error": "Not authorized to move tickets into this project"}
+                continue
+            fields["project_id"] = column.project_id
+
+        diff = {key: value for key, value in fields.items() if ticket.get(key) != value}
+        history_rows[item.id].extend(history.diff(ticket, diff))
+        ticket.update(diff)
+        changed[item.id].update(diff)
+        results[index] = {"index": index, "ok": True, "id": item.id}
+
+    # Reserve one version per stamped ticket, plus one per tombstone left behind.
+    needed = defaultdict(int)
+    for _, row in creates:
+        needed[row["project_id"]] += 1
+    for ticket_id in changed:
+        needed[state[ticket_id]["project_id"]] += 1
+        if state[ticket_id]["project_id"] != original[ticket_id]["project_id"]:
+            needed[original[ticket_id]["project_id"]] += 1
+    next_version = {}
+    top_version = {}
+    for project_id, amount in needed.items():
+        top_version[project_id] = versioning.bump_project_version(db, project_id, amount)
+        next_version[project_id] = top_version[project_id] - amount + 1
+
+    def take_version(project_id):
+        version = next_version[project_id]
+        next_version[project_id] += 1
+        return version
+
+    # Created and re-columned tickets go to the end of their column, in item
+    # order; the version bumps above hold the project locks this relies on.
+    ranking.append_ranks(db, models.Ticket, models.Ticket.column_id, [row for _, row in creates] + [
+        diff for diff in changed.values() if diff.get("column_id") is not None
+    ])
+
+    batches = defaultdict(list)
+    new_ids = []
+
+    if creates:
+        for _, row in creates:
+            row["version"] = take_version(row["project_id"])
+        new_ids = db.execute(
+            insert(models.Ticket).returning(models.Ticket.id, sort_by_parameter_order=True),
+            [row for _, row in creates],
+        ).scalars().all()
+        for (index, row), ticket_id in zip(creates, new_ids):
+            results[index] = {"index": index, "ok": True, "id": ticket_id}
+            history_rows[ticket_id].extend(history.diff({}, row))
+            batches[row["project_id"]].append({
+                "type": events.TICKET_CREATED, "ticket_id": ticket_id, "version": row["version"],
+                "board_id": columns[row["column_id"]].board_id,
+                "fields": {field: row[field] for field in CARD_FIELDS},
+            })
+
+    update_rows = []
+    tombstones = []
+    for ticket_id, diff in changed.items():
+        if not diff:
+            continue
+        ticket, before = state[ticket_id], original[ticket_id]
+        version = take_version(ticket["project_id"])
+        update_rows.append({"id": ticket_id, **diff, "version": version})
+        board = columns.get(ticket["column_id"])
+        previous_board = columns.get(before["column_id"])
+        board_id = board.board_id if board is not None else None
+        previous_board_id = previous_board.board_id if previous_board is not None else None
+        if ticket["project_id"] != before["project_id"]:
+            old_version = take_version(before["project_id"])
+            tombstones.append({"project_id": before["project_id"], "ticket_id": ticket_id, "version": old_version})
+            batches[before["project_id"]].append({
+                "type": events.TICKET_DELETED, "ticket_id": ticket_id, "version": old_version,
+                "board_id": previous_board_id, "fields": {},
+            })
+            batches[ticket["project_id"]].append({
+                "type": events.TICKET_CREATED, "ticket_id": ticket_id, "version": version,
+                "board_id": board_id, "fields": {field: ticket[field] for field in CARD_FIELDS},
+            })
+        else:
+            batches[ticket["project_id"]].append({
+                "type": events.TICKET_UPDATED, "ticket_id": ticket_id, "version": version,
+                "board_id": board_id, "previous_board_id": previous_board_id,
+                "fields": {key: value for key, value in diff.items() if key != "project_id"},
+            })
+
+    if update_rows:
+        db.execute(update(models.Ticket), update_rows)
+    counts = aggregates.deltas()
+    for _, row in creates:
+        counts.update(aggregates.deltas(after=row))
+    for ticket_id, diff in changed.items():
+        if diff:
+            counts.update(aggregates.deltas(original[ticket_id], state[ticket_id]))
+    aggregates.apply(db, counts)
+    if tombstones:
+        db.execute(insert(models.TicketTombstone), tombstones)
+    history.record_many(db, user.id, [(ticket_id, rows) for ticket_id, rows in history_rows.items() if rows])
+
+    reindex = list(new_ids) + [ticket_id for ticket_id, diff in changed.items() if "title" in diff or "description" in diff]
+    search.reindex_tickets(db, reindex)
+
+    return results, {project_id: (top_version[project_id], changes) for project_id, changes in batches.items()}
@@ -0,0 +1,64 @@
+import threading
+import time
+from collections import OrderedDict
+from .metrics import Callback
+
+# Caches constructed with a name, exported below at scrape time.
+NAMED_CACHES = {}
+
+def _cache_stat(field: str):
+    return lambda: {(name,): cache.stats()[field] for name, cache in NAMED_CACHES.items()}
+
+Callback("cache_hits_total", "Lookups that found a live entry", "counter", _cache_stat("hits"), ("cache",))
+Callback("cache_misses_total", "Lookups that found no entry or an expired one", "counter", _cache_stat("misses"), ("cache",))
+Callback("cache_entries", "Entries currently held", "gauge", _cache_stat("size"), ("cache",))
+
+
+class TTLCache:
+    """Thread-safe LRU cache whose entries also expire after a TTL."""
+
+    def __init__(self, max_size: int = 1024, ttl: float = 60.0, name: str = None):
+        self.max_size = max_size
+        self.ttl = ttl
+        self.hits = 0
+        self.misses = 0
+        self._data = OrderedDict()
+        self._lock = threading.Lock()
+        if name is not None:
+            NAMED_CACHES[name] = self
+
+    def get(self, key, default=None):
+        now = time.monotonic()
+        with self._lock:
+            entry = self._data.get(key)
+            if entry is None or entry[0] <= now:
+                if entry is not None:
+                    del self._data[key]
+                self.misses += 1
+                return default
+            self._data.move_to_end(key)
+            self.hits += 1
+            return entry[1]
+
+    def set(self, key, value, ttl: float = None):
+        expires_at = time.monotonic() + (self.ttl if ttl is None else min(ttl, self.ttl))
+        with self._lock:
+            self._data[key] = (expires_at, value)
+            self._data.move_to_end(key)
+            while len(self._data) > self.max_size:
+                self._data.popitem(last=False)
+
+    def pop(self, key, default=None):
+        with self._lock:
+            entry = self._data.pop(key, None)
+        return default if entry is None else entry[1]
+
+    def clear(self):
+        with self._lock:
+            self._data.clear()
+
+    def __len__(self):
+        return len(self._data)
+
+    def stats(self) -> dict:
+        return {"size": len(self._data), "hits": self.hits, "misses": self.misses}
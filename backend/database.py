@@ -1,14 +1,230 @@
-from sqlalchemy import create_engine
+from sqlalchemy import create_engine, event, exc
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import AsyncAdaptedQueuePool, QueuePool
+from starlette.concurrency import run_in_threadpool
+from contextvars import ContextVar
 from dotenv import load_dotenv
+import logging
 import os
+import time
+from .metrics import Counter, Gauge, Histogram
 
 load_dotenv()
 
+logger = logging.getLogger(__name__)
+
+def _env_flag(name: str, default: str) -> bool:
+    return os.getenv(name, default).lower() in ("1", "true", "yes")
+
 DATABASE_URL = os.getenv("DATABASE_URL")
 
-engine = create_engine(DATABASE_URL)
+DB_POOL_SIZE = int(os.getenv("DB_POOL_SIZE", "10"))
+DB_MAX_OVERFLOW = int(os.getenv("DB_MAX_OVERFLOW", "20"))
+DB_POOL_TIMEOUT = float(os.getenv("DB_POOL_TIMEOUT", "10"))
+DB_POOL_RECYCLE = int(os.getenv("DB_POOL_RECYCLE", "1800"))
+DB_POOL_PRE_PING = _env_flag("DB_POOL_PRE_PING", "true")
+DB_STATEMENT_TIMEOUT_MS = int(os.getenv("DB_STATEMENT_TIMEOUT_MS", "0"))
+DB_SLOW_QUERY_SECONDS = float(os.getenv("DB_SLOW_QUERY_SECONDS", "0.5"))
+
+db_pool_checkout_wait_seconds = Histogram(
+    "db_pool_checkout_wait_seconds", "Time spent waiting for a pooled connection", ("engine",)
+)
+db_pool_in_use = Gauge("db_pool_connections_in_use", "Connections currently checked out", ("engine",))
+db_pool_overflow = Gauge("db_pool_overflow_connections", "Connections open beyond pool_size", ("engine",))
+db_pool_timeouts_total = Counter("db_pool_timeouts_total", "Checkouts that gave up waiting for a connection", ("engine",))
+db_query_duration_seconds = Histogram("db_query_duration_seconds", "Statement execution time", ("engine",))
+db_slow_queries_total = Counter("db_slow_queries_total", "Statements slower than DB_SLOW_QUERY_SECONDS", ("engine",))
+
+# [statement count, seconds] for the current request, set by
+# instrumentation.MetricsMiddleware. Threadpool handlers run in a copy of the
+# request's context, which still holds the same list.
+request_query_stats = ContextVar("request_query_stats", default=None)
+
+
+class _TimedCheckoutMixin:
+    engine_label = "sync"
+
+    def _do_get(self):
+        start = time.perf_counter()
+        try:
+            return super()._do_get()
+        except exc.TimeoutError:
+            db_pool_timeouts_total.inc(engine=self.engine_label)
+            raise
+        finally:
+            db_pool_checkout_wait_seconds.observe(time.perf_counter() - start, engine=self.engine_label)
+
+class InstrumentedQueuePool(_TimedCheckoutMixin, QueuePool):
+    pass
+
+class InstrumentedAsyncQueuePool(_TimedCheckoutMixin, AsyncAdaptedQueuePool):
+    engine_label = "async"
+
+
+def instrument_engine(sync_engine, label: str):
+    pool = sync_engine.pool
+
+    def record_pool_usage(*args):
+        if isinstance(pool, QueuePool):
+            db_pool_in_use.set(pool.checkedout(), engine=label)
+            db_pool_overflow.set(max(pool.overflow(), 0), engine=label)
+
+    event.listen(pool, "checkout", record_pool_usage)
+    event.listen(pool, "checkin", record_pool_usage)
+
+    @event.listens_for(sync_engine, "before_cursor_execute")
+    def start_timer(conn, cursor, statement, parameters, context, executemany):
+        conn.info.setdefault("query_start_time", []).append(time.perf_counter())
+
+    @event.listens_for(sync_engine, "after_cursor_execute")
+    def stop_timer(conn, cursor, statement, parameters, context, executemany):
+        elapsed = time.perf_counter() - conn.info["query_start_time"].pop()
+        db_query_duration_seconds.observe(elapsed, engine=label)
+        stats = request_query_stats.get()
+        if stats is not None:
+            stats[0] += 1
+            stats[1] += elapsed
+        if elapsed >= DB_SLOW_QUERY_SECONDS:
+            db_slow_queries_total.inc(engine=label)
+            logger.warning("Slow query (%.3fs): %s", elapsed, statement)
+
+    @event.listens_for(sync_engine, "handle_error")
+    def discard_timer(context):
+        timers = context.connection.info.get("query_start_time") if context.connection is not None else None
+        if timers:
+            timers.pop()
+
+
+def enable_sqlite_foreign_keys(sync_engine):
+    # SQLite ignores foreign keys (and so ON DELETE CASCADE) unless every
+    # connection opts in.
+    @event.listens_for(sync_engine, "connect")
+    def set_pragma(dbapi_connection, connection_record):
+        cursor = dbapi_connection.cursor()
+        cursor.execute("PRAGMA foreign_keys=ON")
+        cursor.close()
+
+
+def create_db_engine(url: str, use_async: bool = False):
+    kwargs = {"pool_pre_ping": DB_POOL_PRE_PING, "pool_recycle": DB_POOL_RECYCLE}
+    if not url.startswith("sqlite"):
+        kwargs.update(
+            poolclass=InstrumentedAsyncQueuePool if use_async else InstrumentedQueuePool,
+            pool_size=DB_POOL_SIZE,
+            max_overflow=DB_MAX_OVERFLOW,
+            pool_timeout=DB_POOL_TIMEOUT,
+        )
+        if DB_STATEMENT_TIMEOUT_MS and url.startswith("postgresql"):
+            if use_async:
+                kwargs["connect_args"] = {"server_settings": {"statement_timeout": str(DB_STATEMENT_TIMEOUT_MS)}}
+            else:
+                kwargs["connect_args"] = {"options": f"-c statement_timeout={DB_STATEMENT_TIMEOUT_MS}"}
+
+    if use_async:
+        db_engine = create_async_engine(url, **kwargs)
+        instrument_engine(db_engine.sync_engine, "async")
+    else:
+        db_engine = create_engine(url, **kwargs)
+        instrument_engine(db_engine, "sync")
+    if url.startswith("sqlite"):
+        enable_sqlite_foreign_keys(db_engine.sync_engine if use_async else db_engine)
+    return db_engine
+
+engine = create_db_engine(DATABASE_URL)
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 
 Base = declarative_base()
+
+# Async drivers used when ASYNC_DATABASE_URL is not given explicitly.
+_ASYNC_DRIVERS = {
+    "postgresql": "postgresql+asyncpg",
+    "postgresql+psycopg2": "postgresql+asyncpg",
+    "sqlite": "sqlite+aiosqlite",
+}
+
+def _async_url(url: str):
+    scheme, _, rest = (url or "").partition("://")
+    driver = _ASYNC_DRIVERS.get(scheme)
+    return f"{driver}://{rest}" if driver else None
+
+ASYNC_DATABASE_URL = os.getenv("ASYNC_DATABASE_URL") or _async_url(DATABASE_URL)
+USE_ASYNC_DB = _env_flag("USE_ASYNC_DB", "true")
+
+async_engine = None
+AsyncSessionLocal = None
+if USE_ASYNC_DB and ASYNC_DATABASE_URL:
+    try:
+        async_engine = create_db_engine(ASYNC_DATABASE_URL, use_async=True)
+        AsyncSessionLocal = async_sessionmaker(async_engine, autoflush=False, expire_on_commit=False)
+    except ImportError:
+        # The async driver is not installed; get_async_db falls back to the sync engine.
+        async_engine = None
+
+
+class SyncSessionAdapter:
+    """Exposes a sync Session through the AsyncSession methods the routers use.
+
+    Every database call runs in the threadpool, so async handlers keep the
+    event loop free even when no async driver is available (e.g. SQLite tests).
+    """
+
+    def __init__(self, session):
+        self.sync_session = session
+
+    async def execute(self, statement, params=None, **kwargs):
+        return await run_in_threadpool(self.sync_session.execute, statement, params, **kwargs)
+
+    async def scalar(self, statement, params=None, **kwargs):
+        return await run_in_threadpool(self.sync_session.scalar, statement, params, **kwargs)
+
+    async def scalars(self, statement, params=None, **kwargs):
+        return await run_in_threadpool(self.sync_session.scalars, statement, params, **kwargs)
+
+    async def get(self, entity, ident, **kwargs):
+        return await run_in_threadpool(self.sync_session.get, entity, ident, **kwargs)
+
+    async def merge(self, instance, load=True, **kwargs):
+        return await run_in_threadpool(self.sync_session.merge, instance, load=load, **kwargs)
+
+    def add(self, instance):
+        self.sync_session.add(instance)
+
+    async def delete(self, instance):
+        await run_in_threadpool(self.sync_session.delete, instance)
+
+    async def flush(self):
+        await run_in_threadpool(self.sync_session.flush)
+
+    async def refresh(self, instance, attribute_names=None):
+        await run_in_threadpool(self.sync_session.refresh, instance, attribute_names)
+
+    async def commit(self):
+        await run_in_threadpool(self.sync_session.commit)
+
+    async def rollback(self):
+        await run_in_threadpool(self.sync_session.rollback)
+
+    async def close(self):
+        await run_in_threadpool(self.sync_session.close)
+
+
+def get_db():
+    db = SessionLocal()
+    try:
+        yield db
+    finally:
+        # close() rolls back anything uncommitted and returns the connection to the pool.
+        db.close()
+
+async def get_async_db():
+    if AsyncSessionLocal is not None:
+        async with AsyncSessionLocal() as db:
+            yield db
+        return
+    db = SyncSessionAdapter(SessionLocal(expire_on_commit=False))
+    try:
+        yield db
+    finally:
+        await db.close()
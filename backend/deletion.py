@@ -0,0 +1,178 @@
+from datetime import datetime, timedelta, timezone
+from dotenv import load_dotenv
+from sqlalchemy import delete, func, or_, select, update
+from sqlalchemy.orm import Session
+import argparse
+import logging
+import os
+from . import models, aggregates, search as ticket_search
+from .database import SessionLocal
+
+load_dotenv()
+
+logger = logging.getLogger(__name__)
+
+PROJECT_PURGE_CHUNK_SIZE = int(os.getenv("PROJECT_PURGE_CHUNK_SIZE", "1000"))
+# A running purge refreshes updated_at with every chunk; one silent for
+# longer than this is assumed dead and may be taken over.
+PROJECT_PURGE_LEASE_SECONDS = float(os.getenv("PROJECT_PURGE_LEASE_SECONDS", "300"))
+
+PENDING = "pending"
+RUNNING = "running"
+DONE = "done"
+FAILED = "failed"
+
+
+def _member_ids(db: Session, project_id: int) -> list:
+    return db.execute(
+        select(models.project_users.c.user_id).where(models.project_users.c.project_id == project_id)
+    ).scalars().all()
+
+def delete_side_tables(db: Session, project_id: int):
+    # Analytics and import bookkeeping carry no foreign keys, so the database
+    # cascade does not reach them.
+    db.execute(delete(models.TicketFlowState).where(models.TicketFlowState.project_id == project_id))
+    db.execute(delete(models.FlowBucket).where(models.FlowBucket.project_id == project_id))
+    db.execute(delete(models.ImportCheckpoint).where(models.ImportCheckpoint.project_id == project_id))
+
+def delete_project_now(db: Session, project_id: int) -> tuple:
+    """Delete a project in the caller's transaction, relying on ON DELETE CASCADE.
+
+    Returns (member ids, ticket ids) so the caller can drop cached
+    memberships and fallback search entries once it has committed.
+    """
+    member_ids = _member_ids(db, project_id)
+    ticket_ids = db.execute(select(models.Ticket.id).where(models.Ticket.project_id == project_id)).scalars().all()
+    delete_side_tables(db, project_id)
+    db.execute(delete(models.Project).where(models.Project.id == project_id))
+    return member_ids, ticket_ids
+
+def mark_project_deleted(db: Session, project_id: int, user_id: int) -> tuple:
+    """Hide a project immediately and queue its rows for purge_project.
+
+    Memberships and open invitations go now, so the project disappears from
+    every member's reads; the rest is purged in chunks later. Returns the
+    deletion job and the former member ids, whose cached memberships the
+    caller invalidates after committing.
+    """
+    member_ids = _member_ids(db, project_id)
+    db.execute(models.project_users.delete().where(models.project_users.c.project_id == project_id))
+    db.execute(delete(models.Invitation).where(models.Invitation.project_id == project_id))
+    db.execute(
+        update(models.Project)
+        .where(models.Project.id == project_id)
+        .values(deleted_at=func.now(), version=models.Project.version + 1)
+    )
+    job = models.ProjectDeletion(
+        project_id=project_id,
+        requested_by_id=user_id,
+        status=PENDING,
+        total_tickets=aggregates.read(db, project_id)["total"],
+        deleted_tickets=0,
+    )
+    db.add(job)
+    return job, member_ids
+
+def _claim(db: Session, project_id: int) -> bool:
+    # Conditional UPDATE so two workers never purge the same project at once.
+    stale = datetime.now(timezone.utc) - timedelta(seconds=PROJECT_PURGE_LEASE_SECONDS)
+    claimed = db.execute(
+        update(models.ProjectDeletion)
+        .where(
+            models.ProjectDeletion.project_id == project_id,
+            or_(
+                models.ProjectDeletion.status.in_([PENDING, FAILED]),
+                (models.ProjectDeletion.status == RUNNING) & (models.ProjectDeletion.updated_at < stale),
+            ),
+        )
+        .values(status=RUNNING, error=None)
+        .execution_options(synchronize_session=False)
+    ).rowcount == 1
+    db.commit()
+    return claimed
+
+def _delete_chunk(db: Session, model, key, condition, chunk_size: int) -> list:
+    ids = db.execute(select(key).where(condition).limit(chunk_size)).scalars().all()
+    if ids:
+        db.execute(delete(model).where(key.in_(ids)))
+    return ids
+
+def _progress(db: Session, project_id: int, **values):
+    db.execute(
+        update(models.ProjectDeletion)
+        .where(models.ProjectDeletion.project_id == project_id)
+        .values(**values)
+        .execution_options(synchronize_session=False)
+    )
+
+def purge_project(project_id: int, chunk_size: int = PROJECT_PURGE_CHUNK_SIZE) -> bool:
+    """Delete a project marked by mark_project_deleted, one short transaction per chunk.
+
+    Tickets go first, `chunk_size` at a time, taking their comments and
+    history with them through the database cascade; progress is committed
+    with each chunk, so an interrupted purge resumes where it stopped.
+    Returns False when another worker holds the job.
+    """
+    db = SessionLocal()
+    try:
+        if not _claim(db, project_id):
+            return False
+        while True:
+            ticket_ids = _delete_chunk(
+                db, models.Ticket, models.Ticket.id, models.Ticket.project_id == project_id, chunk_size
+            )
+            _progress(db, project_id, deleted_tickets=models.ProjectDeletion.deleted_tickets + len(ticket_ids))
+            db.commit()
+            for ticket_id in ticket_ids:
+                ticket_search.remove_ticket(db, ticket_id)
+            if len(ticket_ids) < chunk_size:
+                break
+        for model, key in (
+            (models.TicketTombstone, models.TicketTombstone.id),
+            (models.TicketFlowState, models.TicketFlowState.ticket_id),
+        ):
+            while len(_delete_chunk(db, model, key, model.project_id == project_id, chunk_size)) == chunk_size:
+                _progress(db, project_id, status=RUNNING)
+                db.commit()
+        delete_side_tables(db, project_id)
+        # Boards, columns, aggregates and what is left cascade from here.
+        db.execute(delete(models.Project).where(models.Project.id == project_id))
+        _progress(db, project_id, status=DONE, finished_at=func.now())
+        db.commit()
+        return True
+    except Exception as error:
+        db.rollback()
+        logger.exception("Purging project %d failed", project_id)
+        _progress(db, project_id, status=FAILED, error=str(error))
+        db.commit()
+        return False
+    finally:
+        db.close()
+
+def resume_pending(chunk_size: int = PROJECT_PURGE_CHUNK_SIZE) -> int:
+    """Run every unfinished deletion this process can claim; returns how many completed."""
+    db = SessionLocal()
+    try:
+        project_ids = db.execute(
+            select(models.ProjectDeletion.project_id)
+            .where(models.ProjectDeletion.status.in_([PENDING, RUNNING, FAILED]))
+            .order_by(models.ProjectDeletion.created_at)
+        ).scalars().all()
+    finally:
+        db.close()
+    return sum(purge_project(project_id, chunk_size) for project_id in project_ids)
+
+def main():
+    parser = argparse.ArgumentParser(description="Purge projects queued for asynchronous deletion.")
+    parser.add_argument("project_id", type=int, nargs="?", help="Purge one project (default: every unfinished job)")
+    parser.add_argument("--chunk-size", type=int, default=PROJECT_PURGE_CHUNK_SIZE)
+    args = parser.parse_args()
+    logging.basicConfig(level=logging.INFO)
+    if args.project_id is not None:
+        logger.info("Purged project %d: %s", args.project_id, purge_project(args.project_id, args.chunk_size))
+    else:
+        logger.info("Purged %d projects", resume_pending(args.chunk_size))
+
+
+if __name__ == "__main__":
+    main()
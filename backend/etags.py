@@ -0,0 +1,30 @@
+from fastapi import Request, Response, status
+import hashlib
+
+CACHE_CONTROL = "private, no-cache"
+
+def make_etag(*parts, query: str = None) -> str:
+    """Strong ETag for a representation identified by `parts`.
+
+    `parts` should carry the version counter(s) the representation depends on;
+    `query` folds in request parameters that change the response body.
+    """
+    tag = "-".join(str(part) for part in parts)
+    if query:
+        tag += "-" + hashlib.blake2b(query.encode(), digest_size=8).hexdigest()
+    return f'"{tag}"'
+
+def _matches(header: str, etag: str) -> bool:
+    if not header:
+        return False
+    candidates = [candidate.strip() for candidate in header.split(",")]
+    # Weak comparison is what If-None-Match specifies.
+    return "*" in candidates or any(candidate.removeprefix("W/") == etag for candidate in candidates)
+
+def not_modified(request: Request, response: Response, etag: str):
+    """Set validators on the response; return a 304 if the client copy is current."""
+    if _matches(request.headers.get("if-none-match"), etag):
+        return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers={"ETag": etag, "Cache-Control": CACHE_CONTROL})
+    response.headers["ETag"] = etag
+    response.headers["Cache-Control"] = CACHE_CONTROL
+    return None
@@ -0,0 +1,105 @@
+from dotenv import load_dotenv
+import json
+import os
+from .realtime import board_topic, manager, project_topic
+
+load_dotenv()
+
+EVENT_COALESCE_MS = float(os.getenv("EVENT_COALESCE_MS", "100"))
+
+TICKET_CREATED = "ticket.created"
+TICKET_UPDATED = "ticket.updated"
+TICKET_DELETED = "ticket.deleted"
+TICKET_COMMENTED = "ticket.commented"
+TICKETS_BATCH = "tickets.batch"
+
+def _merge(pending: dict, event: dict):
+    if event["type"] == TICKET_DELETED:
+        pending["type"] = TICKET_DELETED
+        pending["fields"] = {}
+    elif pending["type"] == TICKET_DELETED:
+        return
+    elif pending["type"] != TICKET_CREATED and pending["type"] != event["type"]:
+        pending["type"] = TICKET_UPDATED
+    if pending["type"] != TICKET_DELETED:
+        pending["fields"].update(event["fields"])
+    pending["version"] = max(pending["version"], event["version"])
+    pending["boards"].update(event["boards"])
+    if event["board_id"] is not None:
+        pending["board_id"] = event["board_id"]
+
+
+class TicketEventPublisher:
+    """Coalesces ticket change events and publishes them over the WebSocket manager.
+
+    Events for the same ticket that arrive within EVENT_COALESCE_MS are merged
+    into one delta carrying the union of changed fields and the latest
+    version. Clients that missed events catch up from a version via
+    versioning.changes_since.
+    """
+
+    def __init__(self, connection_manager=manager):
+        self.manager = connection_manager
+        self._loop = None
+        self._pending = {}
+        self._flush_handle = None
+
+    def bind(self, loop):
+        # A flush scheduled on a previous loop will never run; start clean.
+        self._loop = loop
+        self._pending = {}
+        self._flush_handle = None
+
+    def ticket_changed(self, event_type: str, project_id: int, ticket_id: int, version: int,
+                       board_id: int = None, fields: dict = None, previous_board_id: int = None):
+        """Queue an event after commit; safe to call from threadpool workers."""
+        if self._loop is None:
+            return
+        event = {
+            "type": event_type,
+            "project_id": project_id,
+            "board_id": board_id,
+            "ticket_id": ticket_id,
+            "version": version,
+            "fields": dict(fields or {}),
+            "boards": {b for b in (board_id, previous_board_id) if b is not None},
+        }
+        self._loop.call_soon_threadsafe(self._enqueue, event)
+
+    def tickets_changed(self, project_id: int, version: int, changes: list):
+        """Publish many ticket changes of one project as a single batched event."""
+        if self._loop is None or not changes:
+            return
+        self._loop.call_soon_threadsafe(self._publish_batch, project_id, version, changes)
+
+    def _publish_batch(self, project_id: int, version: int, changes: list):
+        by_board = {}
+        for change in changes:
+            for board_id in {change.get("board_id"), change.pop("previous_board_id", None)} - {None}:
+                by_board.setdefault(board_id, []).append(change)
+        batch = {"type": TICKETS_BATCH, "project_id": project_id, "version": version}
+        self.manager.publish(project_topic(project_id), json.dumps({**batch, "events": changes}, separators=(",", ":"), default=str))
+        for board_id, board_changes in by_board.items():
+            self.manager.publish(board_topic(board_id), json.dumps({**batch, "events": board_changes}, separators=(",", ":"), default=str))
+
+    def _enqueue(self, event: dict):
+        key = (event["project_id"], event["ticket_id"])
+        pending = self._pending.get(key)
+        if pending is None:
+            self._pending[key] = event
+        else:
+            _merge(pending, event)
+        if self._flush_handle is None:
+            self._flush_handle = self._loop.call_later(EVENT_COALESCE_MS / 1000, self._flush)
+
+    def _flush(self):
+        self._flush_handle = None
+        events, self._pending = self._pending, {}
+        for event in events.values():
+            boards = event.pop("boards")
+            message = json.dumps(event, separators=(",", ":"), default=str)
+            self.manager.publish(project_topic(event["project_id"]), message)
+            for board_id in boards:
+                self.manager.publish(board_topic(board_id), message)
+
+publisher = TicketEventPublisher()
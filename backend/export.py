@@ -0,0 +1,145 @@
+from collections import defaultdict
+from dotenv import load_dotenv
+from sqlalchemy import select
+from sqlalchemy.orm import Session
+import argparse
+import csv
+import io
+import os
+import sys
+import zlib
+from . import models
+from .database import SessionLocal
+from .serialization import dumps
+
+load_dotenv()
+
+EXPORT_BATCH_SIZE = int(os.getenv("EXPORT_BATCH_SIZE", "1000"))
+FORMATS = ("ndjson", "csv")
+MEDIA_TYPES = {"ndjson": "application/x-ndjson", "csv": "text/csv"}
+
+TICKET_COLUMNS = (
+    "id", "title", "description", "status", "priority", "owner_id", "column_id", "project_id",
+    "rank", "version", "created_at", "updated_at",
+)
+COMMENT_COLUMNS = ("id", "ticket_id", "author_id", "content", "created_at", "updated_at")
+HISTORY_COLUMNS = ("id", "ticket_id", "field_changed", "old_value", "new_value", "changed_by_id", "changed_at")
+
+# CSV cannot nest, so every record is one row tagged with its type; ticket_id
+# ties comments and history to their ticket.
+CSV_HEADER = ("record_type", "ticket_id", "id") + tuple(
+    dict.fromkeys(
+        name for name in TICKET_COLUMNS + COMMENT_COLUMNS + HISTORY_COLUMNS if name not in ("id", "ticket_id")
+    )
+)
+
+def _columns(model, names):
+    return [getattr(model, name) for name in names]
+
+def _children(db: Session, model, names, ticket_ids: list) -> dict:
+    grouped = defaultdict(list)
+    for row in db.execute(
+        select(*_columns(model, names)).where(model.ticket_id.in_(ticket_ids)).order_by(model.ticket_id, model.id)
+    ).mappings():
+        grouped[row["ticket_id"]].append(dict(row))
+    return grouped
+
+def iter_batches(db: Session, project_id: int, batch_size: int = EXPORT_BATCH_SIZE):
+    """Yield lists of ticket dicts with their comments and history attached.
+
+    Tickets come from a server-side cursor in `batch_size` partitions; each
+    partition costs one IN query for comments and one for history, so memory
+    holds a single batch at a time however large the project is.
+    """
+    result = db.execute(
+        select(*_columns(models.Ticket, TICKET_COLUMNS))
+        .where(models.Ticket.project_id == project_id)
+        .order_by(models.Ticket.id)
+        .execution_options(yield_per=batch_size)
+    ).mappings()
+    for partition in result.partitions():
+        tickets = [dict(row) for row in partition]
+        ticket_ids = [ticket["id"] for ticket in tickets]
+        comments = _children(db, models.Comment, COMMENT_COLUMNS, ticket_ids)
+        history = _children(db, models.TicketHistory, HISTORY_COLUMNS, ticket_ids)
+        for ticket in tickets:
+            ticket["comments"] = comments.get(ticket["id"], [])
+            ticket["history"] = history.get(ticket["id"], [])
+        yield tickets
+
+def _ndjson(tickets: list) -> bytes:
+    return b"".join(dumps(ticket) + b"\n" for ticket in tickets)
+
+def _csv_row(record_type: str, ticket_id: int, record: dict) -> list:
+    values = []
+    for name in CSV_HEADER:
+        if name == "record_type":
+            values.append(record_type)
+        elif name == "ticket_id":
+            values.append(ticket_id)
+        else:
+            value = record.get(name)
+            values.append("" if value is None else value.isoformat() if hasattr(value, "isoformat") else value)
+    return values
+
+def _csv(tickets: list, header: bool) -> bytes:
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    if header:
+        writer.writerow(CSV_HEADER)
+    for ticket in tickets:
+        writer.writerow(_csv_row("ticket", ticket["id"], ticket))
+        for comment in ticket["comments"]:
+            writer.writerow(_csv_row("comment", ticket["id"], comment))
+        for entry in ticket["history"]:
+            writer.writerow(_csv_row("history", ticket["id"], entry))
+    return buffer.getvalue().encode()
+
+def iter_export(db: Session, project_id: int, format: str = "ndjson", compress: bool = False,
+                batch_size: int = EXPORT_BATCH_SIZE):
+    """Yield the encoded export one batch at a time, gzip-compressed on the fly if asked."""
+    compressor = zlib.compressobj(wbits=16 + zlib.MAX_WBITS) if compress else None
+    first = True
+    for tickets in iter_batches(db, project_id, batch_size):
+        chunk = _csv(tickets, header=first) if format == "csv" else _ndjson(tickets)
+        first = False
+        if compressor is not None:
+            chunk = compressor.compress(chunk)
+        if chunk:
+            yield chunk
+    if format == "csv" and first:
+        header = _csv([], header=True)
+        yield compressor.compress(header) if compressor is not None else header
+    if compressor is not None:
+        yield compressor.flush()
+
+def stream_export(project_id: int, format: str, compress: bool):
+    # For StreamingResponse: runs after the request's session has closed.
+    db = SessionLocal()
+    try:
+        yield from iter_export(db, project_id, format, compress)
+    finally:
+        db.close()
+
+def main():
+    parser = argparse.ArgumentParser(description="Export a project's tickets with comments and history.")
+    parser.add_argument("project_id", type=int)
+    parser.add_argument("--format", choices=FORMATS, default="ndjson")
+    parser.add_argument("--gzip", action="store_true")
+    parser.add_argument("--batch-size", type=int, default=EXPORT_BATCH_SIZE)
+    parser.add_argument("-o", "--output", help="Output file (default: stdout)")
+    args = parser.parse_args()
+
+    output = open(args.output, "wb") if args.output else sys.stdout.buffer
+    db = SessionLocal()
+    try:
+        for chunk in iter_export(db, args.project_id, args.format, args.gzip, args.batch_size):
+            output.write(chunk)
+    finally:
+        db.close()
+        if args.output:
+            output.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,100 @@
+from concurrent.futures import ProcessPoolExecutor
+from fastapi import HTTPException, status
+from passlib.context import CryptContext
+from dotenv import load_dotenv
+import asyncio
+import multiprocessing
+import os
+import time
+from .metrics import Counter, Gauge, Histogram
+
+load_dotenv()
+
+# Raising BCRYPT_ROUNDS marks older hashes as deprecated; they are upgraded
+# transparently on the user's next successful login.
+BCRYPT_ROUNDS = int(os.getenv("BCRYPT_ROUNDS", "12"))
+HASH_POOL_WORKERS = int(os.getenv("HASH_POOL_WORKERS", str(os.cpu_count() or 1)))
+HASH_QUEUE_LIMIT = int(os.getenv("HASH_QUEUE_LIMIT", str(HASH_POOL_WORKERS * 8)))
+
+pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto", bcrypt__rounds=BCRYPT_ROUNDS)
+
+hash_queue_depth = Gauge("password_hash_queue_depth", "Password hash jobs queued or running")
+hash_queue_wait_seconds = Histogram("password_hash_queue_wait_seconds", "Time hash jobs wait for a pool worker")
+hash_duration_seconds = Histogram("password_hash_duration_seconds", "CPU time of a single hash or verify", ("operation",))
+hash_rejected_total = Counter("password_hash_rejected_total", "Hash jobs rejected because the pool was saturated")
+hash_rehashed_total = Counter("password_rehashed_total", "Hashes upgraded on login after a cost change")
+
+# Worker-side functions; they run in the pool processes and must stay picklable.
+
+def _hash(password: str):
+    return pwd_context.hash(password)
+
+def _verify_and_update(password: str, hashed_password: str):
+    return pwd_context.verify_and_update(password, hashed_password)
+
+def _timed(fn, *args):
+    started_at = time.time()
+    start = time.perf_counter()
+    result = fn(*args)
+    return started_at, time.perf_counter() - start, result
+
+
+class PasswordHasher:
+    """Runs bcrypt in a bounded process pool off the event loop.
+
+    At most queue_limit jobs may be queued or running; beyond that callers
+    get an immediate 503 instead of waiting behind a login storm.
+    """
+
+    def __init__(self, workers: int = HASH_POOL_WORKERS, queue_limit: int = HASH_QUEUE_LIMIT):
+        self.workers = workers
+        self.queue_limit = queue_limit
+        self._pending = 0
+        self._executor = None
+
+    def _get_executor(self) -> ProcessPoolExecutor:
+        if self._executor is None:
+            # spawn avoids forking a process that is already running threads.
+            self._executor = ProcessPoolExecutor(
+                max_workers=self.workers, mp_context=multiprocessing.get_context("spawn")
+            )
+        return self._executor
+
+    async def _run(self, operation: str, fn, *args):
+        if self._pending >= self.queue_limit:
+            hash_rejected_total.inc()
+            raise HTTPException(
+                status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+                detail="Server is busy, please retry shortly",
+                headers={"Retry-After": "1"},
+            )
+        self._pending += 1
+        hash_queue_depth.set(self._pending)
+        submitted_at = time.time()
+        try:
+            started_at, elapsed, result = await asyncio.wrap_future(
+                self._get_executor().submit(_timed, fn, *args)
+            )
+        finally:
+            self._pending -= 1
+            hash_queue_depth.set(self._pending)
+        hash_queue_wait_seconds.observe(max(started_at - submitted_at, 0.0))
+        hash_duration_seconds.observe(elapsed, operation=operation)
+        return result
+
+    async def hash(self, password: str) -> str:
+        return await self._run("hash", _hash, password)
+
+    async def verify_and_update(self, password: str, hashed_password: str):
+        """Return (valid, new_hash); new_hash is set when the stored hash needs upgrading."""
+        valid, new_hash = await self._run("verify", _verify_and_update, password, hashed_password)
+        if valid and new_hash:
+            hash_rehashed_total.inc()
+        return valid, new_hash
+
+    def shutdown(self):
+        if self._executor is not None:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+            self._executor = None
+
+hasher = PasswordHasher()
@@ -0,0 +1,39 @@
+from sqlalchemy import insert
+from sqlalchemy.orm import Session
+from . import models
+
+# Ticket fields whose changes are recorded; project_id is derived from column_id.
+TRACKED_FIELDS = ("title", "description", "status", "priority", "owner_id", "column_id")
+
+def _as_text(value):
+    return None if value is None else str(value)
+
+def diff(old: dict, new: dict) -> list:
+    return [
+        (field, old.get(field), new[field])
+        for field in TRACKED_FIELDS
+        if field in new and old.get(field) != new[field]
+    ]
+
+def rows(user_id: int, changes_by_ticket: list) -> list:
+    """History rows for [(ticket_id, [(field, old, new), ...]), ...]."""
+    return [
+        {
+            "ticket_id": ticket_id,
+            "field_changed": field,
+            "old_value": _as_text(old_value),
+            "new_value": _as_text(new_value),
+            "changed_by_id": user_id,
+        }
+        for ticket_id, changes in changes_by_ticket
+        for field, old_value, new_value in changes
+    ]
+
+def record_many(db: Session, user_id: int, changes_by_ticket: list):
+    """Insert history for [(ticket_id, [(field, old, new), ...]), ...] in one executemany."""
+    history_rows = rows(user_id, changes_by_ticket)
+    if history_rows:
+        db.execute(insert(models.TicketHistory), history_rows)
+
+def record(db: Session, ticket_id: int, user_id: int, changes: list):
+    record_many(db, user_id, [(ticket_id, changes)])
@@ -0,0 +1,355 @@
+from dotenv import load_dotenv
+from sqlalchemy import insert, select, text
+from sqlalchemy.orm import Session
+import argparse
+import csv
+import gzip
+import io
+import json
+import logging
+import os
+import sys
+import time
+from . import models, aggregates, history, ranking, versioning, search
+from .database import SessionLocal
+
+load_dotenv()
+
+logger = logging.getLogger(__name__)
+
+IMPORT_BATCH_SIZE = int(os.getenv("IMPORT_BATCH_SIZE", "5000"))
+FORMATS = ("csv", "ndjson")
+
+
+class RowError(ValueError):
+    """A single input record that cannot be imported; reported and skipped."""
+
+
+def detect_format(path: str) -> str:
+    name = path[:-3] if path.endswith(".gz") else path
+    if name.endswith(".csv"):
+        return "csv"
+    if name.endswith((".ndjson", ".jsonl", ".json")):
+        return "ndjson"
+    raise ValueError(f"Cannot tell the format of {path}; pass --format")
+
+def read_records(path: str, format: str):
+    """Yield (position, record, error) for each input record, streaming the file.
+
+    Positions are 1-based record numbers (CSV data rows or NDJSON lines) and
+    are what checkpoints store.
+    """
+    opener = gzip.open if path.endswith(".gz") else open
+    with opener(path, "rt", newline="", encoding="utf-8") as handle:
+        if format == "csv":
+            for position, row in enumerate(csv.DictReader(handle), 1):
+                yield position, {key: value for key, value in row.items() if key and value != ""}, None
+            return
+        for position, line in enumerate(handle, 1):
+            if not line.strip():
+                continue
+            try:
+                record = json.loads(line)
+            except ValueError as error:
+                yield position, None, f"Invalid JSON: {error}"
+                continue
+            if not isinstance(record, dict):
+                yield position, None, "Expected a JSON object"
+                continue
+            yield position, record, None
+
+
+def _int(value, field: str) -> int:
+    try:
+        return int(value)
+    except (TypeError, ValueError):
+        raise RowError(f"{field} must be an integer")
+
+class Lookups:
+    """Columns of the target project and all users, loaded once per import."""
+
+    def __init__(self, db: Session, project_id: int):
+        self.column_ids = set()
+        self.columns_by_name = {}
+        names = {}
+        for column_id, column_name, board_name in db.execute(
+            select(models.Column.id, models.Column.name, models.Board.name)
+            .join(models.Board, models.Board.id == models.Column.board_id)
+            .where(models.Board.project_id == project_id)
+        ):
+            self.column_ids.add(column_id)
+            self.columns_by_name[(board_name, column_name)] = column_id
+            names.setdefault(column_name, set()).add(column_id)
+        # A bare column name is accepted only when it is unique in the project.
+        self.columns_by_bare_name = {name: next(iter(ids)) for name, ids in names.items() if len(ids) == 1}
+
+        self.user_ids = set()
+        self.users = {}
+        for user_id, username, email in db.execute(select(models.User.id, models.User.username, models.User.email)):
+            self.user_ids.add(user_id)
+            self.users[username] = user_id
+            self.users[email] = user_id
+
+    def column(self, record: dict) -> int:
+        if record.get("column_id") is not None:
+            column_id = _int(record["column_id"], "column_id")
+            if column_id not in self.column_ids:
+                raise RowError(f"Column {column_id} is not in this project")
+            return column_id
+        name = record.get("column")
+        if not name:
+            raise RowError("column or column_id is required")
+        if record.get("board"):
+            column_id = self.columns_by_name.get((record["board"], name))
+        else:
+            column_id = self.columns_by_bare_name.get(name)
+        if column_id is None:
+            raise RowError(f"Unknown or ambiguous column {name!r}")
+        return column_id
+
+    def user(self, record: dict, role: str):
+        if record.get(f"{role}_id") is not None:
+            user_id = _int(record[f"{role}_id"], f"{role}_id")
+            if user_id not in self.user_ids:
+                raise RowError(f"Unknown {role} id {user_id}")
+            return user_id
+        name = record.get(role)
+        if not name:
+            return None
+        if name not in self.users:
+            raise RowError(f"Unknown {role} {name!r}")
+        return self.users[name]
+
+    def ticket(self, record: dict) -> dict:
+        title = (record.get("title") or "").strip()
+        if not title:
+            raise RowError("title is required")
+        return {
+            "title": title,
+            "description": record.get("description"),
+            "status": record.get("status") or "open",
+            "priority": record.get("priority") or "medium",
+            "owner_id": self.user(record, "owner"),
+            "column_id": self.column(record),
+        }
+
+    def comment(self, record: dict) -> dict:
+        content = record.get("content")
+        if not content:
+            raise RowError("comment content is required")
+        author_id = self.user(record, "author")
+        if author_id is None:
+            raise RowError("comment author or author_id is required")
+        return {"author_id": author_id, "content": content}
+
+
+class _ExecutemanyWriter:
+    def __init__(self, db: Session):
+        self.db = db
+
+    def insert_tickets(self, rows: list) -> list:
+        return self.db.execute(
+            insert(models.Ticket).returning(models.Ticket.id, sort_by_parameter_order=True), rows
+        ).scalars().all()
+
+    def insert(self, model, rows: list):
+        if rows:
+            self.db.execute(insert(model), rows)
+
+
+def _copy_value(value) -> str:
+    if value is None:
+        return "\\N"
+    return str(value).replace("\\", "\\\\").replace("\t", "\\t").replace("\n", "\\n").replace("\r", "\\r")
+
+class _CopyWriter(_ExecutemanyWriter):
+    """COPY FROM STDIN over the session's psycopg2 connection.
+
+    COPY cannot return generated keys, so ticket ids are drawn from the
+    sequence up front and written explicitly.
+    """
+
+    def _copy(self, table: str, columns: list, rows: list):
+        buffer = io.StringIO()
+        for row in rows:
+            buffer.write("\t".join(_copy_value(row[column]) for column in columns))
+            buffer.write("\n")
+        buffer.seek(0)
+        cursor = self.db.connection().connection.cursor()
+        try:
+            cursor.copy_expert(f"COPY {table} ({', '.join(columns)}) FROM STDIN", buffer)
+        finally:
+            cursor.close()
+
+    def insert_tickets(self, rows: list) -> list:
+        ids = self.db.execute(
+            text("SELECT nextval(pg_get_serial_sequence('tickets', 'id')) FROM generate_series(1, :count)"),
+            {"count": len(rows)},
+        ).scalars().all()
+        for ticket_id, row in zip(ids, rows):
+            row["id"] = ticket_id
+        self._copy(models.Ticket.__tablename__, list(rows[0]), rows)
+        return ids
+
+    def insert(self, model, rows: list):
+        if rows:
+            self._copy(model.__tablename__, list(rows[0]), rows)
+
+def _writer(db: Session, use_copy: bool = None):
+    dialect = db.get_bind().dialect
+    if use_copy is None:
+        use_copy = dialect.name == "postgresql" and dialect.driver == "psycopg2"
+    return _CopyWriter(db) if use_copy else _ExecutemanyWriter(db)
+
+
+def _write_batch(db: Session, writer, project_id: int, user_id, batch: list) -> int:
+    """Insert one batch of (ticket row, [comment rows]) with its derived data."""
+    count = len(batch)
+    top = versioning.bump_project_version(db, project_id, count)
+    tickets = []
+    for offset, (row, _) in enumerate(batch):
+        tickets.append({**row, "project_id": project_id, "version": top - count + 1 + offset})
+    ranking.append_ranks(db, models.Ticket, models.Ticket.column_id, tickets)
+    ticket_ids = writer.insert_tickets(tickets)
+
+    changes = []
+    comments = []
+    counts = aggregates.deltas()
+    for ticket_id, ticket, (_, ticket_comments) in zip(ticket_ids, tickets, batch):
+        changes.append((ticket_id, history.diff({}, ticket)))
+        comments.extend({"ticket_id": ticket_id, **comment} for comment in ticket_comments)
+        counts.update(aggregates.deltas(after=ticket))
+    writer.insert(models.TicketHistory, history.rows(user_id, changes))
+    writer.insert(models.Comment, comments)
+    aggregates.apply(db, counts)
+    if db.get_bind().dialect.name == "postgresql":
+        # The in-process fallback index of running servers is not updated;
+        # on SQLite they pick imported tickets up when they next load it.
+        search.reindex_tickets(db, ticket_ids)
+    return count
+
+def import_file(path: str, project_id: int, format: str = None, job: str = None, user_id: int = None,
+                batch_size: int = IMPORT_BATCH_SIZE, use_copy: bool = None, errors=None) -> dict:
+    """Stream `path` into `project_id` in committed batches; resumable by `job`.
+
+    Each batch's tickets, comments, history, counters and the job's
+    checkpoint commit together, so rerunning a failed job continues after the
+    last committed record. Batches only end at ticket records, which keeps
+    CSV comment rows in the same batch as the ticket they follow. Rejected
+    records are written to `errors` as NDJSON and counted, not retried.
+    Returns the job's totals.
+    """
+    format = format or detect_format(path)
+    job = job or f"{os.path.abspath(path)}:{project_id}"
+    db = SessionLocal()
+    try:
+        if db.get(models.Project, project_id) is None:
+            raise ValueError(f"Project {project_id} not found")
+        checkpoint = db.get(models.ImportCheckpoint, job)
+        if checkpoint is None:
+            checkpoint = models.ImportCheckpoint(job=job, project_id=project_id, position=0, imported=0, failed=0)
+            db.add(checkpoint)
+            db.commit()
+        elif checkpoint.project_id != project_id:
+            raise ValueError(f"Job {job!r} belongs to project {checkpoint.project_id}")
+        if checkpoint.position:
+            logger.info("Resuming %s after record %d", job, checkpoint.position)
+
+        lookups = Lookups(db, project_id)
+        writer = _writer(db, use_copy)
+        batch = []
+        parent = None
+        failed = 0
+        last_position = checkpoint.position
+        started = time.monotonic()
+
+        def reject(position, message):
+            nonlocal failed
+            failed += 1
+            if errors is not None:
+                errors.write(json.dumps({"job": job, "position": position, "error": message}) + "\n")
+
+        def flush():
+            nonlocal batch, failed
+            try:
+                imported = _write_batch(db, writer, project_id, user_id, batch) if batch else 0
+                checkpoint.position = last_position
+                checkpoint.imported += imported
+                checkpoint.failed += failed
+                db.commit()
+            except Exception:
+                db.rollback()
+                raise
+            batch, failed = [], 0
+            elapsed = time.monotonic() - started
+            logger.info(
+                "%s: %d imported, %d failed, at record %d (%.0f tickets/s)",
+                job, checkpoint.imported, checkpoint.failed, checkpoint.position,
+                checkpoint.imported / elapsed if elapsed else 0,
+            )
+
+        for position, record, error in read_records(path, format):
+            if position <= checkpoint.position:
+                continue
+            try:
+                if error is not None:
+                    raise RowError(error)
+                record_type = record.get("record_type", "ticket")
+                if record_type == "comment":
+                    if parent is None:
+                        raise RowError("Comment does not follow an imported ticket")
+                    parent[1].append(lookups.comment(record))
+                elif record_type == "ticket":
+                    parent = None
+                    if len(batch) >= batch_size:
+                        flush()
+                    parent = (lookups.ticket(record), [lookups.comment(comment) for comment in record.get("comments") or ()])
+                    batch.append(parent)
+                elif record_type != "history":
+                    # History is regenerated as creation history on import.
+                    raise RowError(f"Unknown record_type {record_type!r}")
+            except RowError as row_error:
+                reject(position, str(row_error))
+            last_position = position
+        flush()
+        return {"job": job, "position": checkpoint.position, "imported": checkpoint.imported, "failed": checkpoint.failed}
+    finally:
+        db.close()
+
+def main():
+    parser = argparse.ArgumentParser(description="Bulk import tickets and comments from CSV or NDJSON.")
+    parser.add_argument("path", help="Input file; .gz is decompressed on the fly")
+    parser.add_argument("project_id", type=int)
+    parser.add_argument("--format", choices=FORMATS)
+    parser.add_argument("--job", help="Checkpoint name; defaults to the file path and project")
+    parser.add_argument("--user", help="Username recorded as the author of import history")
+    parser.add_argument("--batch-size", type=int, default=IMPORT_BATCH_SIZE)
+    parser.add_argument("--no-copy", action="store_true", help="Use executemany even on Postgres")
+    parser.add_argument("--errors", help="Write rejected records to this NDJSON file (default: stderr)")
+    args = parser.parse_args()
+    logging.basicConfig(level=logging.INFO)
+
+    user_id = None
+    if args.user:
+        db = SessionLocal()
+        try:
+            user_id = db.execute(select(models.User.id).where(models.User.username == args.user)).scalar()
+        finally:
+            db.close()
+        if user_id is None:
+            parser.error(f"Unknown user {args.user!r}")
+
+    errors = open(args.errors, "a", encoding="utf-8") if args.errors else sys.stderr
+    try:
+        totals = import_file(
+            args.path, args.project_id, args.format, args.job, user_id, args.batch_size,
+            False if args.no_copy else None, errors,
+        )
+    finally:
+        if args.errors:
+            errors.close()
+    print(f"{totals['imported']} imported, {totals['failed']} failed")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,92 @@
+from dotenv import load_dotenv
+import hmac
+import logging
+import os
+import time
+from .database import request_query_stats
+from .metrics import Counter, Gauge, Histogram
+
+load_dotenv()
+
+logger = logging.getLogger(__name__)
+
+# When set, GET /api/metrics requires "Authorization: Bearer <token>".
+METRICS_TOKEN = os.getenv("METRICS_TOKEN")
+# Requests issuing at least this many statements are logged; usually an N+1.
+REQUEST_QUERY_WARN_COUNT = int(os.getenv("REQUEST_QUERY_WARN_COUNT", "100"))
+
+UNMATCHED_ROUTE = "unmatched"
+QUERY_COUNT_BUCKETS = (1, 2, 5, 10, 25, 50, 100, 250, 500, 1000)
+
+http_requests_total = Counter("http_requests_total", "Completed HTTP requests", ("method", "route", "status"))
+http_request_duration_seconds = Histogram(
+    "http_request_duration_seconds", "Time until the last response byte was sent", ("method", "route")
+)
+http_requests_in_flight = Gauge("http_requests_in_flight", "HTTP requests currently being handled")
+http_request_db_queries = Histogram(
+    "http_request_db_queries", "Statements executed per request", ("method", "route"), buckets=QUERY_COUNT_BUCKETS
+)
+http_request_db_seconds = Histogram(
+    "http_request_db_seconds", "Statement execution time per request", ("method", "route")
+)
+
+
+class MetricsMiddleware:
+    """ASGI middleware recording latency, status and database work per route.
+
+    Routes are labelled by their path template (/api/tickets/{ticket_id}),
+    so label sets stay bounded. Timing stops when the response is complete,
+    before any background tasks the handler scheduled.
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        start = time.perf_counter()
+        stats = [0, 0.0]
+        token = request_query_stats.set(stats)
+        status_code = 500
+        finished = False
+
+        def finish():
+            nonlocal finished
+            if finished:
+                return
+            finished = True
+            elapsed = time.perf_counter() - start
+            http_requests_in_flight.dec()
+            # The router stores the matched route in the scope.
+            route = getattr(scope.get("route"), "path", UNMATCHED_ROUTE)
+            method = scope["method"]
+            http_requests_total.inc(method=method, route=route, status=status_code)
+            http_request_duration_seconds.observe(elapsed, method=method, route=route)
+            http_request_db_queries.observe(stats[0], method=method, route=route)
+            http_request_db_seconds.observe(stats[1], method=method, route=route)
+            if stats[0] >= REQUEST_QUERY_WARN_COUNT:
+                logger.warning("%s %s ran %d queries (%.3fs in the database)", method, route, stats[0], stats[1])
+
+        async def send_and_record(message):
+            nonlocal status_code
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+            await send(message)
+            if message["type"] == "http.response.body" and not message.get("more_body", False):
+                finish()
+
+        http_requests_in_flight.inc()
+        try:
+            await self.app(scope, receive, send_and_record)
+        finally:
+            finish()
+            request_query_stats.reset(token)
+
+
+def metrics_authorized(authorization: str) -> bool:
+    if not METRICS_TOKEN:
+        return True
+    return hmac.compare_digest(authorization or "", f"Bearer {METRICS_TOKEN}")
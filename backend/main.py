@@ -1,10 +1,18 @@
-from fastapi import FastAPI, Request, status, WebSocket, WebSocketDisconnect
+from fastapi import FastAPI, HTTPException, Request, status, WebSocket, WebSocketDisconnect
 from fastapi.exceptions import RequestValidationError
-from fastapi.responses import JSONResponse
+from fastapi.responses import JSONResponse, PlainTextResponse
 from fastapi.middleware.cors import CORSMiddleware
-from typing import List
-from .database import engine, Base
-from .routers import authentication, projects, tickets, boards, password_reset, profile, invitations, settings
+from sqlalchemy import select
+from starlette.concurrency import run_in_threadpool
+import asyncio
+import json
+from . import deletion, events, metrics, models, permissions, schemas, security, versioning
+from .database import engine, Base, SessionLocal
+from .hashing import hasher
+from .instrumentation import MetricsMiddleware, metrics_authorized
+from .pagination import NEXT_CURSOR_HEADER
+from .realtime import board_topic, manager, project_topic
+from .routers import authentication, projects, tickets, boards, password_reset, profile, invitations, settings, analytics, exports
 
 # Create all database tables
 Base.metadata.create_all(bind=engine)
@@ -22,8 +30,24 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=[NEXT_CURSOR_HEADER, "ETag"],
 )
 
+# Added last so it wraps everything else, CORS preflights included.
+app.add_middleware(MetricsMiddleware)
+
+@app.on_event("startup")
+async def start_realtime():
+    events.publisher.bind(asyncio.get_running_loop())
+    await manager.start()
+    # Pick up project deletions interrupted by a restart.
+    asyncio.get_running_loop().run_in_executor(None, deletion.resume_pending)
+
+@app.on_event("shutdown")
+async def shutdown_background_services():
+    await manager.stop()
+    hasher.shutdown()
+
 # Exception handler for validation errors
 @app.exception_handler(RequestValidationError)
 async def validation_exception_handler(request: Request, exc: RequestValidationError):
@@ -32,32 +56,87 @@ async def validation_exception_handler(request: Request, exc: RequestValidationE
         content={"detail": exc.errors(), "body": exc.body},
     )
 
-# WebSocket Connection Manager
-class ConnectionManager:
-    def __init__(self):
-        self.active_connections: List[WebSocket] = []
+# WebSocket endpoint: clients authenticate with ?token= and subscribe to
+# project/board topics they are members of.
+RESUME_BATCH_SIZE = 500
 
-    async def connect(self, websocket: WebSocket):
-        await websocket.accept()
-        self.active_connections.append(websocket)
+def _authenticate_socket(token: str):
+    db = SessionLocal()
+    try:
+        return security.get_current_user(token, db).id
+    except HTTPException:
+        return None
+    finally:
+        db.close()
 
-    def disconnect(self, websocket: WebSocket):
-        self.active_connections.remove(websocket)
+def _authorized_topics(user_id: int, project_ids: list, board_ids: list) -> list:
+    db = SessionLocal()
+    try:
+        topics = [project_topic(pid) for pid in project_ids if permissions.is_project_member(db, pid, user_id)]
+        for board_id in board_ids:
+            pid = db.execute(select(models.Board.project_id).where(models.Board.id == board_id)).scalar()
+            if pid is not None and permissions.is_project_member(db, pid, user_id):
+                topics.append(board_topic(board_id))
+        return topics
+    finally:
+        db.close()
 
-    async def broadcast(self, message: str):
-        for connection in self.active_connections:
-            await connection.send_text(message)
+def _resume_message(user_id: int, project_id: int, since: int) -> str:
+    db = SessionLocal()
+    try:
+        if not permissions.is_project_member(db, project_id, user_id):
+            return None
+        changes = versioning.changes_since(db, project_id, since, RESUME_BATCH_SIZE)
+        payload = schemas.TicketChanges.model_validate(changes).model_dump(mode="json")
+        return json.dumps({"type": "resume", "project_id": project_id, **payload}, separators=(",", ":"))
+    finally:
+        db.close()
 
-manager = ConnectionManager()
+def _ids(value) -> list:
+    values = value if isinstance(value, list) else [value]
+    return [v for v in values if isinstance(v, int)]
 
 @app.websocket("/ws")
-async def websocket_endpoint(websocket: WebSocket):
+async def websocket_endpoint(websocket: WebSocket, token: str = None, project_id: int = None, board_id: int = None):
+    user_id = await run_in_threadpool(_authenticate_socket, token) if token else None
+    if user_id is None:
+        await websocket.close(code=status.WS_1008_POLICY_VIOLATION)
+        return
+
     await manager.connect(websocket)
     try:
+        initial = await run_in_threadpool(_authorized_topics, user_id, _ids(project_id), _ids(board_id))
+        for topic in initial:
+            manager.subscribe(websocket, topic)
         while True:
             data = await websocket.receive_text()
-            await manager.broadcast(f"Message text was: {data}")
-    except WebSocketDisconnect:
+            manager.touch(websocket)
+            try:
+                message = json.loads(data)
+            except ValueError:
+                continue
+            if not isinstance(message, dict):
+                continue
+            if message.get("action") == "resume":
+                # Catch up from the last version the client saw; repeat with the
+                # returned version while has_more is true.
+                if isinstance(message.get("project_id"), int) and isinstance(message.get("since"), int):
+                    reply = await run_in_threadpool(_resume_message, user_id, message["project_id"], message["since"])
+                    if reply is not None:
+                        manager.send(websocket, reply)
+                continue
+            if message.get("action") not in ("subscribe", "unsubscribe"):
+                continue
+            project_ids, board_ids = _ids(message.get("project_id")), _ids(message.get("board_id"))
+            if message["action"] == "subscribe":
+                for topic in await run_in_threadpool(_authorized_topics, user_id, project_ids, board_ids):
+                    manager.subscribe(websocket, topic)
+            else:
+                for topic in [project_topic(pid) for pid in project_ids] + [board_topic(bid) for bid in board_ids]:
+                    manager.unsubscribe(websocket, topic)
+    except (WebSocketDisconnect, RuntimeError):
+        pass
+    finally:
         manager.disconnect(websocket)
 
 # Include API routers
@@ -69,7 +148,15 @@ app.include_router(password_reset.router, prefix="/api", tags=["Password Reset"]
 app.include_router(profile.router, prefix="/api", tags=["Profile"])
 app.include_router(invitations.router, prefix="/api", tags=["Invitations"])
 app.include_router(settings.router, prefix="/api", tags=["Settings"])
+app.include_router(analytics.router, prefix="/api", tags=["Analytics"])
+app.include_router(exports.router, prefix="/api", tags=["Export"])
 
 @app.get("/api/health", tags=["Health"])
 async def health_check():
     return {"status": "ok"}
+
+@app.get("/api/metrics", tags=["Health"], include_in_schema=False)
+async def prometheus_metrics(request: Request):
+    if not metrics_authorized(request.headers.get("authorization")):
+        raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Invalid metrics token")
+    return PlainTextResponse(metrics.render(), media_type=metrics.CONTENT_TYPE)
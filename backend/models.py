@@ -1,11 +1,15 @@
-from sqlalchemy import Column, Integer, String, DateTime, ForeignKey, Table, Text
+from sqlalchemy import Column, Integer, String, Date, DateTime, Float, ForeignKey, Table, Text, Index
+from sqlalchemy.dialects.postgresql import TSVECTOR
 from sqlalchemy.orm import relationship
 from sqlalchemy.sql import func
 from .database import Base
 
+# Rank keys must compare bytewise, whatever the database's default collation.
+RANK_TYPE = String().with_variant(String(collation="C"), "postgresql")
+
 # Association table for Project and User many-to-many relationship
 project_users = Table('project_users', Base.metadata,
-    Column('project_id', Integer, ForeignKey('projects.id'), primary_key=True),
+    Column('project_id', Integer, ForeignKey('projects.id', ondelete='CASCADE'), primary_key=True),
     Column('user_id', Integer, ForeignKey('users.id'), primary_key=True)
 )
 
@@ -30,35 +34,29 @@ class Project(Base):
     id = Column(Integer, primary_key=True, index=True)
     name = Column(String, index=True, nullable=False)
     description = Column(Text)
+    # Bumped by versioning.bump_project_version on every change to the project
+    # or its members, boards, columns and tickets; read endpoints derive ETags from it.
+    version = Column(Integer, nullable=False, default=0, server_default="0")
+    # Set when an asynchronous deletion starts; deletion.py purges the rows.
+    deleted_at = Column(DateTime(timezone=True))
     created_at = Column(DateTime(timezone=True), server_default=func.now())
     updated_at = Column(DateTime(timezone=True), onupdate=func.now())
 
-    users = relationship("User", secondary=project_users, back_populates="projects")
-    boards = relationship("Board", back_populates="project", cascade="all, delete-orphan")
+    users = relationship("User", secondary=project_users, back_populates="projects", passive_deletes=True)
+    boards = relationship("Board", back_populates="project", cascade="all, delete-orphan", passive_deletes=True)
+    aggregates = relationship("TicketAggregate", cascade="all, delete-orphan", passive_deletes=True)
 
 class Board(Base):
     __tablename__ = "boards"
 
     id = Column(Integer, primary_key=True, index=True)
     name = Column(String, index=True, nullable=False)
-    project_id = Column(Integer, ForeignKey("projects.id"), nullable=False)
+    project_id = Column(Integer, ForeignKey("projects.id", ondelete="CASCADE"), nullable=False)
     created_at = Column(DateTime(timezone=True), server_default=func.now())
     updated_at = Column(DateTime(timezone=True), onupdate=func.now())
 
     project = relationship("Project", back_populates="boards")
-    columns = relationship("Column", back_populates="board", cascade="all, delete-orphan")
-
-class Column(Base):
-    __tablename__ = "columns"
-
-    id = Column(Integer, primary_key=True, index=True)
-    name = Column(String, index=True, nullable=False)
-    board_id = Column(Integer, ForeignKey("boards.id"), nullable=False)
-    created_at = Column(DateTime(timezone=True), server_default=func.now())
-    updated_at = Column(DateTime(timezone=True), onupdate=func.now())
-
-    board = relationship("Board", back_populates="columns")
-    tickets = relationship("Ticket", back_populates="column", cascade="all, delete-orphan")
+    columns = relationship("Column", back_populates="board", cascade="all, delete-orphan", passive_deletes=True)
 
 class Ticket(Base):
     __tablename__ = "tickets"
@@ -69,21 +67,123 @@ class Ticket(Base):
     status = Column(String, default="open")
     priority = Column(String, default="medium")
     owner_id = Column(Integer, ForeignKey("users.id"))
-    column_id = Column(Integer, ForeignKey("columns.id"))
+    column_id = Column(Integer, ForeignKey("columns.id", ondelete="CASCADE"))
+    # Position within the column; see ranking.py.
+    rank = Column(RANK_TYPE, nullable=False)
+    # Denormalized from column.board.project_id; the tickets router keeps it in
+    # step with column_id so list and authorization queries stay on one table.
+    project_id = Column(Integer, ForeignKey("projects.id", ondelete="CASCADE"), nullable=False)
+    # Project version at this ticket's last change; see versioning.py.
+    version = Column(Integer, nullable=False, default=0, server_default="0")
     created_at = Column(DateTime(timezone=True), server_default=func.now())
     updated_at = Column(DateTime(timezone=True), onupdate=func.now())
+    # Maintained by search.reindex_ticket; unused outside Postgres.
+    search_vector = Column(Text().with_variant(TSVECTOR(), "postgresql"))
 
     owner = relationship("User", back_populates="tickets")
     column = relationship("Column", back_populates="tickets")
-    comments = relationship("Comment", back_populates="ticket", cascade="all, delete-orphan")
-    history = relationship("TicketHistory", back_populates="ticket", cascade="all, delete-orphan")
+    comments = relationship("Comment", back_populates="ticket", cascade="all, delete-orphan", passive_deletes=True)
+    history = relationship("TicketHistory", back_populates="ticket", cascade="all, delete-orphan", passive_deletes=True)
+
+    __table_args__ = (
+        Index("ix_tickets_search_vector", "search_vector", postgresql_using="gin"),
+        # Ordered column reads; also serves plain column_id lookups.
+        Index("ix_tickets_column_id_rank", "column_id", "rank"),
+        Index("ix_tickets_project_id_id", "project_id", "id"),
+        Index("ix_tickets_project_id_status_id", "project_id", "status", "id"),
+        Index("ix_tickets_project_id_priority_id", "project_id", "priority", "id"),
+        Index("ix_tickets_project_id_owner_id_id", "project_id", "owner_id", "id"),
+        Index("ix_tickets_project_id_version", "project_id", "version"),
+    )
+
+class TicketTombstone(Base):
+    __tablename__ = "ticket_tombstones"
+
+    id = Column(Integer, primary_key=True, index=True)
+    ticket_id = Column(Integer, nullable=False)
+    project_id = Column(Integer, ForeignKey("projects.id", ondelete="CASCADE"), nullable=False)
+    version = Column(Integer, nullable=False)
+    deleted_at = Column(DateTime(timezone=True), server_default=func.now())
+
+    __table_args__ = (
+        Index("ix_ticket_tombstones_project_id_version", "project_id", "version"),
+    )
+
+# Ticket count per (project, dimension, value), maintained by aggregates.py.
+class TicketAggregate(Base):
+    __tablename__ = "ticket_aggregates"
+
+    project_id = Column(Integer, ForeignKey("projects.id", ondelete="CASCADE"), primary_key=True)
+    dimension = Column(String, primary_key=True)
+    value = Column(String, primary_key=True)
+    count = Column(Integer, nullable=False, default=0, server_default="0")
+
+# Flow analytics rollups, maintained by analytics.py. They carry no foreign
+# keys so history replay never depends on tickets or columns still existing.
+class AnalyticsWatermark(Base):
+    __tablename__ = "analytics_watermarks"
+
+    name = Column(String, primary_key=True)
+    last_id = Column(Integer, nullable=False, default=0)
+    updated_at = Column(DateTime(timezone=True), server_default=func.now(), onupdate=func.now())
+
+class TicketFlowState(Base):
+    __tablename__ = "ticket_flow_states"
+
+    ticket_id = Column(Integer, primary_key=True)
+    project_id = Column(Integer, nullable=False, index=True)
+    status = Column(String)
+    column_id = Column(Integer)
+    created_at = Column(DateTime(timezone=True))
+    started_at = Column(DateTime(timezone=True))
+    done_at = Column(DateTime(timezone=True))
+    column_entered_at = Column(DateTime(timezone=True))
+
+class FlowBucket(Base):
+    __tablename__ = "flow_buckets"
+
+    project_id = Column(Integer, primary_key=True)
+    # 0 for project-wide buckets.
+    column_id = Column(Integer, primary_key=True)
+    day = Column(Date, primary_key=True)
+    metric = Column(String, primary_key=True)
+    count = Column(Integer, nullable=False, default=0)
+    total_seconds = Column(Float, nullable=False, default=0)
+    # JSON histogram digest of durations; see analytics.Digest.
+    digest = Column(Text)
+
+# Progress of a resumable bulk import, committed with each batch; see importer.py.
+class ImportCheckpoint(Base):
+    __tablename__ = "import_checkpoints"
+
+    job = Column(String, primary_key=True)
+    project_id = Column(Integer, nullable=False)
+    position = Column(Integer, nullable=False, default=0)
+    imported = Column(Integer, nullable=False, default=0)
+    failed = Column(Integer, nullable=False, default=0)
+    updated_at = Column(DateTime(timezone=True), server_default=func.now(), onupdate=func.now())
+
+# Progress of an asynchronous project deletion. No foreign key, so the row
+# outlives the project it reports on.
+class ProjectDeletion(Base):
+    __tablename__ = "project_deletions"
+
+    project_id = Column(Integer, primary_key=True)
+    requested_by_id = Column(Integer)
+    status = Column(String, nullable=False, default="pending", index=True)  # pending, running, done, failed
+    total_tickets = Column(Integer, nullable=False, default=0)
+    deleted_tickets = Column(Integer, nullable=False, default=0)
+    error = Column(Text)
+    created_at = Column(DateTime(timezone=True), server_default=func.now())
+    updated_at = Column(DateTime(timezone=True), server_default=func.now(), onupdate=func.now())
+    finished_at = Column(DateTime(timezone=True))
 
 class Comment(Base):
     __tablename__ = "comments"
 
     id = Column(Integer, primary_key=True, index=True)
     content = Column(Text, nullable=False)
-    ticket_id = Column(Integer, ForeignKey("tickets.id"), nullable=False)
+    ticket_id = Column(Integer, ForeignKey("tickets.id", ondelete="CASCADE"), nullable=False)
     author_id = Column(Integer, ForeignKey("users.id"), nullable=False)
     created_at = Column(DateTime(timezone=True), server_default=func.now())
     updated_at = Column(DateTime(timezone=True), onupdate=func.now())
@@ -95,7 +195,7 @@ class TicketHistory(Base):
     __tablename__ = "ticket_history"
 
     id = Column(Integer, primary_key=True, index=True)
-    ticket_id = Column(Integer, ForeignKey("tickets.id"), nullable=False)
+    ticket_id = Column(Integer, ForeignKey("tickets.id", ondelete="CASCADE"), nullable=False)
     field_changed = Column(String, nullable=False)
     old_value = Column(String)
     new_value = Column(String)
@@ -105,14 +205,37 @@ class TicketHistory(Base):
     ticket = relationship("Ticket", back_populates="history")
     changed_by = relationship("User")
 
+    __table_args__ = (
+        Index("ix_ticket_history_ticket_id_id", "ticket_id", "id"),
+    )
+
 class Invitation(Base):
     __tablename__ = "invitations"
 
     id = Column(Integer, primary_key=True, index=True)
     email = Column(String, nullable=False)
-    project_id = Column(Integer, ForeignKey("projects.id"), nullable=False)
+    project_id = Column(Integer, ForeignKey("projects.id", ondelete="CASCADE"), nullable=False)
     token = Column(String, nullable=False, unique=True)
     expires_at = Column(DateTime(timezone=True), nullable=False)
     created_at = Column(DateTime(timezone=True), server_default=func.now())
 
-    project = relationship("Project")
\ No newline at end of file
+    project = relationship("Project")
+
+# Defined last: the class name shadows sqlalchemy's Column for the rest of the module.
+class Column(Base):
+    __tablename__ = "columns"
+
+    id = Column(Integer, primary_key=True, index=True)
+    name = Column(String, index=True, nullable=False)
+    board_id = Column(Integer, ForeignKey("boards.id", ondelete="CASCADE"), nullable=False)
+    # Position within the board; see ranking.py.
+    rank = Column(RANK_TYPE, nullable=False)
+    created_at = Column(DateTime(timezone=True), server_default=func.now())
+    updated_at = Column(DateTime(timezone=True), onupdate=func.now())
+
+    board = relationship("Board", back_populates="columns")
+    tickets = relationship("Ticket", back_populates="column", cascade="all, delete-orphan", passive_deletes=True)
+
+    __table_args__ = (
+        Index("ix_columns_board_id_rank", "board_id", "rank"),
+    )
@@ -0,0 +1,94 @@
+from fastapi import HTTPException, status
+from sqlalchemy import select
+from sqlalchemy.orm import Session
+from dotenv import load_dotenv
+import os
+from . import models
+from .cache import TTLCache
+from .realtime import manager
+
+load_dotenv()
+
+MEMBERSHIP_CACHE_TTL_SECONDS = float(os.getenv("MEMBERSHIP_CACHE_TTL_SECONDS", "30"))
+MEMBERSHIP_CACHE_MAX_SIZE = int(os.getenv("MEMBERSHIP_CACHE_MAX_SIZE", "50000"))
+
+# (project_id, user_id) -> bool. Both positive and negative answers are cached;
+# membership changes must call invalidate_membership, which reaches every
+# worker through the realtime broker.
+membership_cache = TTLCache(max_size=MEMBERSHIP_CACHE_MAX_SIZE, ttl=MEMBERSHIP_CACHE_TTL_SECONDS, name="membership")
+MEMBERSHIP_TOPIC = "internal:membership"
+
+def _membership_probe(project_id: int, user_id: int):
+    # Single probe on the (project_id, user_id) primary key of project_users.
+    return select(models.project_users.c.user_id).where(
+        models.project_users.c.project_id == project_id,
+        models.project_users.c.user_id == user_id,
+    )
+
+def _ensure(member: bool, user: models.User, detail: str, roles, status_code: int):
+    if not member or (roles is not None and user.role not in roles):
+        raise HTTPException(status_code=status_code, detail=detail)
+
+def is_project_member(db: Session, project_id: int, user_id: int) -> bool:
+    key = (project_id, user_id)
+    member = membership_cache.get(key)
+    if member is None:
+        member = db.execute(_membership_probe(project_id, user_id)).first() is not None
+        membership_cache.set(key, member)
+    return member
+
+async def is_project_member_async(db, project_id: int, user_id: int) -> bool:
+    key = (project_id, user_id)
+    member = membership_cache.get(key)
+    if member is None:
+        member = (await db.execute(_membership_probe(project_id, user_id))).first() is not None
+        membership_cache.set(key, member)
+    return member
+
+def ensure_project_member(
+    db: Session,
+    project_id: int,
+    user: models.User,
+    detail: str,
+    roles: list = None,
+    status_code: int = status.HTTP_403_FORBIDDEN,
+):
+    _ensure(is_project_member(db, project_id, user.id), user, detail, roles, status_code)
+
+async def ensure_project_member_async(
+    db,
+    project_id: int,
+    user: models.User,
+    detail: str,
+    roles: list = None,
+    status_code: int = status.HTTP_403_FORBIDDEN,
+):
+    _ensure(await is_project_member_async(db, project_id, user.id), user, detail, roles, status_code)
+
+def add_project_member(db: Session, project_id: int, user_id: int):
+    db.execute(models.project_users.insert().values(project_id=project_id, user_id=user_id))
+
+async def add_project_member_async(db, project_id: int, user_id: int):
+    await db.execute(models.project_users.insert().values(project_id=project_id, user_id=user_id))
+
+def remove_project_member(db: Session, project_id: int, user_id: int):
+    db.execute(
+        models.project_users.delete().where(
+            models.project_users.c.project_id == project_id,
+            models.project_users.c.user_id == user_id,
+        )
+    )
+
+def _drop_membership(message: str):
+    project_id, user_id = message.split(":")
+    membership_cache.pop((int(project_id), int(user_id)))
+
+manager.on(MEMBERSHIP_TOPIC, _drop_membership)
+
+def invalidate_membership(project_id: int, user_id: int):
+    """Drop a cached membership here at once and on other workers via the broker.
+
+    Call after committing; safe from threadpool workers.
+    """
+    membership_cache.pop((project_id, user_id))
+    manager.publish_threadsafe(MEMBERSHIP_TOPIC, f"{project_id}:{user_id}")
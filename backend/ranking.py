@@ -0,0 +1,195 @@
+from dotenv import load_dotenv
+from sqlalchemy import func, select, update
+from sqlalchemy.orm import Session
+from typing import Optional
+import argparse
+import logging
+import os
+from . import models, events, versioning
+from .database import SessionLocal
+
+load_dotenv()
+
+logger = logging.getLogger(__name__)
+
+# Keys longer than this are spread out again by rebalance_column/rebalance_board.
+RANK_REBALANCE_LENGTH = int(os.getenv("RANK_REBALANCE_LENGTH", "24"))
+
+# Ranks are base-36 strings compared bytewise (COLLATE "C" on Postgres). The
+# first WIDTH digits act as an integer head that appends and prepends step by
+# STEP, so adding to either end keeps keys short; placing between two
+# neighbours takes the midpoint string, which grows by about one digit per
+# five inserts at the same spot. Keys never end in "0", which leaves room
+# below every key.
+DIGITS = "0123456789abcdefghijklmnopqrstuvwxyz"
+BASE = len(DIGITS)
+WIDTH = 6
+STEP = BASE ** 2
+
+
+def _encode(head: int) -> str:
+    digits = []
+    for _ in range(WIDTH):
+        head, digit = divmod(head, BASE)
+        digits.append(DIGITS[digit])
+    return "".join(reversed(digits)).rstrip("0")
+
+def _head(rank: str) -> int:
+    return int(rank[:WIDTH].ljust(WIDTH, "0"), BASE)
+
+def _midpoint(low: str, high: Optional[str]) -> str:
+    if high is not None:
+        shared = 0
+        while shared < len(high) and (low[shared] if shared < len(low) else "0") == high[shared]:
+            shared += 1
+        if shared:
+            return high[:shared] + _midpoint(low[shared:], high[shared:])
+    low_digit = DIGITS.index(low[0]) if low else 0
+    high_digit = DIGITS.index(high[0]) if high is not None else BASE
+    if high_digit - low_digit > 1:
+        return DIGITS[(low_digit + high_digit) // 2]
+    if high is not None and len(high) > 1:
+        return high[0]
+    return DIGITS[low_digit] + _midpoint(low[1:], None)
+
+def between(low: Optional[str], high: Optional[str]) -> str:
+    """A key sorting after `low` and before `high`; None means unbounded."""
+    if low is not None and high is not None and low >= high:
+        raise ValueError("Neighbours are out of order")
+    if low is not None and high is None:
+        head = _head(low) + STEP
+        if head < BASE ** WIDTH:
+            return _encode(head)
+    if low is None and high is not None:
+        head = _head(high) - STEP
+        if head > 0:
+            return _encode(head)
+    return _midpoint(low or "", high)
+
+def spread(count: int) -> list:
+    """`count` ascending keys spaced evenly over the head range."""
+    step = max(BASE ** WIDTH // (count + 1), 1)
+    return [_encode((index + 1) * step) for index in range(count)]
+
+def needs_rebalance(rank: str) -> bool:
+    return len(rank) > RANK_REBALANCE_LENGTH
+
+
+def place(db: Session, model, scope, scope_id: int, after_id: int = None, before_id: int = None,
+          exclude_id: int = None) -> str:
+    """Rank for an item landing after `after_id` and before `before_id` within `scope_id`.
+
+    `scope` is the grouping column (Ticket.column_id or Column.board_id).
+    With neither neighbour the item goes to the end. Each lookup is a probe
+    on the (scope, rank) index. Callers hold the project row lock (see
+    versioning.bump_project_version) so concurrent placements in a project
+    never compute the same key.
+    """
+    siblings = select(model.rank).where(scope == scope_id)
+    if exclude_id is not None:
+        siblings = siblings.where(model.id != exclude_id)
+
+    def rank_of(item_id):
+        rank = db.execute(siblings.where(model.id == item_id)).scalar()
+        if rank is None:
+            raise ValueError(f"{model.__name__} {item_id} is not a neighbour at the target position")
+        return rank
+
+    low = rank_of(after_id) if after_id is not None else None
+    high = rank_of(before_id) if before_id is not None else None
+    if after_id is None and before_id is None:
+        low = db.execute(siblings.with_only_columns(func.max(model.rank))).scalar()
+    elif before_id is None:
+        high = db.execute(siblings.with_only_columns(func.min(model.rank)).where(model.rank > low)).scalar()
+    elif after_id is None:
+        low = db.execute(siblings.with_only_columns(func.max(model.rank)).where(model.rank < high)).scalar()
+    return between(low, high)
+
+def append_ranks(db: Session, model, scope, rows: list):
+    """Set row["rank"] to follow the current last item of each row's scope, in list order."""
+    scope_ids = {row[scope.key] for row in rows}
+    last = dict(
+        db.execute(select(scope, func.max(model.rank)).where(scope.in_(scope_ids)).group_by(scope)).all()
+    ) if scope_ids else {}
+    for row in rows:
+        row["rank"] = last[row[scope.key]] = between(last.get(row[scope.key]), None)
+
+
+def _respread(db: Session, model, scope, scope_id: int) -> list:
+    ids = db.execute(select(model.id).where(scope == scope_id).order_by(model.rank, model.id)).scalars().all()
+    return [{"id": item_id, "rank": rank} for item_id, rank in zip(ids, spread(len(ids)))]
+
+def rebalance_column(column_id: int) -> int:
+    """Re-spread the ranks of a column's tickets; returns how many were rewritten."""
+    db = SessionLocal()
+    try:
+        location = db.execute(
+            select(models.Board.id, models.Board.project_id)
+            .join(models.Column, models.Column.board_id == models.Board.id)
+            .where(models.Column.id == column_id)
+        ).first()
+        if location is None:
+            return 0
+        # Lock the project first so no move computes a key from the old ranks.
+        versioning.bump_project_version(db, location.project_id)
+        rows = _respread(db, models.Ticket, models.Ticket.column_id, column_id)
+        if not rows:
+            db.commit()
+            return 0
+        top = versioning.bump_project_version(db, location.project_id, len(rows))
+        for offset, row in enumerate(rows):
+            row["version"] = top - len(rows) + 1 + offset
+        db.execute(update(models.Ticket), rows)
+        db.commit()
+        events.publisher.tickets_changed(location.project_id, top, [
+            {"type": events.TICKET_UPDATED, "ticket_id": row["id"], "version": row["version"],
+             "board_id": location.id, "fields": {"rank": row["rank"]}}
+            for row in rows
+        ])
+        return len(rows)
+    except Exception:
+        db.rollback()
+        raise
+    finally:
+        db.close()
+
+def rebalance_board(board_id: int) -> int:
+    """Re-spread the ranks of a board's columns; returns how many were rewritten."""
+    db = SessionLocal()
+    try:
+        project_id = db.execute(select(models.Board.project_id).where(models.Board.id == board_id)).scalar()
+        if project_id is None:
+            return 0
+        versioning.bump_project_version(db, project_id)
+        rows = _respread(db, models.Column, models.Column.board_id, board_id)
+        if rows:
+            db.execute(update(models.Column), rows)
+        db.commit()
+        return len(rows)
+    except Exception:
+        db.rollback()
+        raise
+    finally:
+        db.close()
+
+def _overgrown(model, scope) -> list:
+    db = SessionLocal()
+    try:
+        return db.execute(
+            select(scope).group_by(scope).having(func.max(func.length(model.rank)) > RANK_REBALANCE_LENGTH)
+        ).scalars().all()
+    finally:
+        db.close()
+
+def main():
+    parser = argparse.ArgumentParser(description="Rebalance ticket and column ranks whose keys have grown long.")
+    parser.parse_args()
+    logging.basicConfig(level=logging.INFO)
+    for column_id in _overgrown(models.Ticket, models.Ticket.column_id):
+        logger.info("Column %d: rebalanced %d tickets", column_id, rebalance_column(column_id))
+    for board_id in _overgrown(models.Column, models.Column.board_id):
+        logger.info("Board %d: rebalanced %d columns", board_id, rebalance_board(board_id))
+
+
+if __name__ == "__main__":
+    main()
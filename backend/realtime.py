@@ -0,0 +1,214 @@
+from collections import defaultdict
+from fastapi import WebSocket
+from dotenv import load_dotenv
+import asyncio
+import contextlib
+import logging
+import os
+import time
+from .broker import Broker, create_broker
+from .metrics import Counter, Gauge
+
+load_dotenv()
+
+logger = logging.getLogger(__name__)
+
+WS_QUEUE_SIZE = int(os.getenv("WS_QUEUE_SIZE", "256"))
+# "drop_oldest" keeps slow clients connected but lossy; "disconnect" closes them.
+WS_SLOW_CONSUMER_POLICY = os.getenv("WS_SLOW_CONSUMER_POLICY", "drop_oldest")
+WS_SEND_TIMEOUT_SECONDS = float(os.getenv("WS_SEND_TIMEOUT_SECONDS", "10"))
+WS_PING_INTERVAL_SECONDS = float(os.getenv("WS_PING_INTERVAL_SECONDS", "20"))
+# A connection is alive while it sends us anything or while our writes to it
+# (pings included) complete, so listen-only clients need not answer pings.
+WS_IDLE_TIMEOUT_SECONDS = float(os.getenv("WS_IDLE_TIMEOUT_SECONDS", "60"))
+
+PING_MESSAGE = '{"type":"ping"}'
+BROADCAST_TOPIC = "*"
+
+ws_connections = Gauge("ws_connections", "Open WebSocket connections")
+ws_queued_messages = Gauge("ws_queued_messages", "Messages waiting in per-connection outbound queues")
+ws_messages_sent_total = Counter("ws_messages_sent_total", "Messages written to WebSocket clients")
+ws_messages_dropped_total = Counter("ws_messages_dropped_total", "Messages dropped for slow consumers", ("reason",))
+ws_disconnects_total = Counter("ws_disconnects_total", "Connections closed by the server", ("reason",))
+
+def project_topic(project_id: int) -> str:
+    return f"project:{project_id}"
+
+def board_topic(board_id: int) -> str:
+    return f"board:{board_id}"
+
+
+class Subscriber:
+    __slots__ = ("websocket", "queue", "topics", "writer", "last_seen", "closing")
+
+    def __init__(self, websocket: WebSocket):
+        self.websocket = websocket
+        self.queue = asyncio.Queue(maxsize=WS_QUEUE_SIZE)
+        self.topics = set()
+        self.writer = None
+        self.last_seen = time.monotonic()
+        self.closing = False
+
+
+class ConnectionManager:
+    """Topic-based fan-out where every connection has its own queue and writer.
+
+    publish() never awaits a socket: it hands the message to the broker, which
+    calls _deliver on every worker, and _deliver only enqueues, so one slow or
+    dead client cannot delay delivery to the others. Topics registered with
+    on() are consumed by the workers themselves and never reach sockets.
+    """
+
+    def __init__(self, broker: Broker = None):
+        self.broker = broker or create_broker()
+        self.subscribers = {}
+        self.topics = defaultdict(set)
+        self.handlers = {}
+        self._heartbeat = None
+        self._loop = None
+
+    async def start(self):
+        self._loop = asyncio.get_running_loop()
+        await self.broker.start(self._deliver)
+
+    async def stop(self):
+        self._loop = None
+        await self.broker.stop()
+
+    async def connect(self, websocket: WebSocket) -> Subscriber:
+        await websocket.accept()
+        subscriber = Subscriber(websocket)
+        subscriber.writer = asyncio.create_task(self._write(subscriber))
+        self.subscribers[websocket] = subscriber
+        ws_connections.set(len(self.subscribers))
+        if self._heartbeat is None or self._heartbeat.done():
+            self._heartbeat = asyncio.create_task(self._ping_loop())
+        return subscriber
+
+    def disconnect(self, websocket: WebSocket):
+        subscriber = self.subscribers.pop(websocket, None)
+        if subscriber is None:
+            return
+        for topic in subscriber.topics:
+            members = self.topics.get(topic)
+            if members is not None:
+                members.discard(subscriber)
+                if not members:
+                    del self.topics[topic]
+        ws_queued_messages.dec(subscriber.queue.qsize())
+        if subscriber.writer is not None and subscriber.writer is not asyncio.current_task():
+            subscriber.writer.cancel()
+        ws_connections.set(len(self.subscribers))
+
+    def subscribe(self, websocket: WebSocket, topic: str):
+        subscriber = self.subscribers.get(websocket)
+        if subscriber is not None:
+            subscriber.topics.add(topic)
+            self.topics[topic].add(subscriber)
+
+    def unsubscribe(self, websocket: WebSocket, topic: str):
+        subscriber = self.subscribers.get(websocket)
+        if subscriber is not None and topic in subscriber.topics:
+            subscriber.topics.discard(topic)
+            members = self.topics[topic]
+            members.discard(subscriber)
+            if not members:
+                del self.topics[topic]
+
+    def touch(self, websocket: WebSocket):
+        subscriber = self.subscribers.get(websocket)
+        if subscriber is not None:
+            subscriber.last_seen = time.monotonic()
+
+    def on(self, topic: str, handler):
+        """Call handler(message) on every worker for each message published to `topic`."""
+        self.handlers[topic] = handler
+
+    def publish(self, topic: str, message: str):
+        self.broker.publish(topic, message)
+
+    def publish_threadsafe(self, topic: str, message: str):
+        """publish() from any thread; a no-op before start()."""
+        if self._loop is None:
+            return
+        try:
+            running = asyncio.get_running_loop()
+        except RuntimeError:
+            running = None
+        if running is self._loop:
+            self.publish(topic, message)
+        else:
+            self._loop.call_soon_threadsafe(self.publish, topic, message)
+
+    def send(self, websocket: WebSocket, message: str):
+        subscriber = self.subscribers.get(websocket)
+        if subscriber is not None:
+            self._offer(subscriber, message)
+
+    async def broadcast(self, message: str):
+        self.broker.publish(BROADCAST_TOPIC, message)
+
+    def _deliver(self, topic: str, message: str):
+        handler = self.handlers.get(topic)
+        if handler is not None:
+            handler(message)
+            return
+        targets = self.subscribers.values() if topic == BROADCAST_TOPIC else self.topics.get(topic, ())
+        for subscriber in list(targets):
+            self._offer(subscriber, message)
+
+    def _offer(self, subscriber: Subscriber, message: str):
+        if subscriber.closing:
+            return
+        try:
+            subscriber.queue.put_nowait(message)
+            ws_queued_messages.inc()
+            return
+        except asyncio.QueueFull:
+            pass
+        if WS_SLOW_CONSUMER_POLICY == "disconnect":
+            ws_messages_dropped_total.inc(subscriber.queue.qsize() + 1, reason="disconnected")
+            self._close(subscriber, "slow_consumer")
+            return
+        subscriber.queue.get_nowait()
+        subscriber.queue.put_nowait(message)
+        ws_messages_dropped_total.inc(reason="queue_full")
+
+    def _close(self, subscriber: Subscriber, reason: str):
+        if subscriber.closing:
+            return
+        subscriber.closing = True
+        ws_disconnects_total.inc(reason=reason)
+        self.disconnect(subscriber.websocket)
+        asyncio.create_task(self._close_socket(subscriber.websocket))
+
+    async def _close_socket(self, websocket: WebSocket):
+        with contextlib.suppress(Exception):
+            await websocket.close(code=1013)
+
+    async def _write(self, subscriber: Subscriber):
+        try:
+            while True:
+                message = await subscriber.queue.get()
+                ws_queued_messages.dec()
+                await asyncio.wait_for(subscriber.websocket.send_text(message), WS_SEND_TIMEOUT_SECONDS)
+                subscriber.last_seen = time.monotonic()
+                ws_messages_sent_total.inc()
+        except asyncio.CancelledError:
+            raise
+        except asyncio.TimeoutError:
+            self._close(subscriber, "send_timeout")
+        except Exception:
+            self._close(subscriber, "send_error")
+
+    async def _ping_loop(self):
+        while self.subscribers:
+            await asyncio.sleep(WS_PING_INTERVAL_SECONDS)
+            now = time.monotonic()
+            for subscriber in list(self.subscribers.values()):
+                if now - subscriber.last_seen > WS_IDLE_TIMEOUT_SECONDS:
+                    self._close(subscriber, "idle_timeout")
+                else:
+                    self._offer(subscriber, PING_MESSAGE)
+
+manager = ConnectionManager()
@@ -0,0 +1,28 @@
+from fastapi import APIRouter, Depends, HTTPException, status
+from datetime import date, timedelta
+from sqlalchemy.orm import Session
+from .. import models, schemas, security, permissions, versioning, analytics
+from ..database import get_db
+
+router = APIRouter()
+
+@router.get("/projects/{project_id}/analytics/flow", response_model=schemas.ProjectFlow)
+def get_project_flow(
+    project_id: int,
+    start: date = None,
+    end: date = None,
+    db: Session = Depends(get_db),
+    current_user: models.User = Depends(security.get_current_user)
+):
+    if versioning.current_version(db, project_id) is None:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Project not found")
+    permissions.ensure_project_member(db, project_id, current_user, "Not authorized to view analytics for this project")
+
+    end = end or date.today()
+    start = start or end - timedelta(days=89)
+    if start > end or (end - start).days >= analytics.ANALYTICS_MAX_RANGE_DAYS:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"start must not be after end and the range is limited to {analytics.ANALYTICS_MAX_RANGE_DAYS} days",
+        )
+    return analytics.flow_summary(db, project_id, start, end)
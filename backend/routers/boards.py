@@ -1,7 +1,8 @@
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, BackgroundTasks, Depends, HTTPException, Query, Request, Response, status
+from sqlalchemy import select
 from sqlalchemy.orm import Session
 from typing import List
-from .. import models, schemas, security
+from .. import models, schemas, security, permissions, aggregates, etags, ranking, serialization, versioning, search as ticket_search
 from ..database import get_db
 
 router = APIRouter()
@@ -15,11 +16,11 @@ def create_board(
     db_project = db.query(models.Project).filter(models.Project.id == board.project_id).first()
     if not db_project:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Project not found")
-    if current_user not in db_project.users:
-        raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="Not authorized to create boards in this project")
+    permissions.ensure_project_member(db, db_project.id, current_user, "Not authorized to create boards in this project")
 
-    db_board = models.Board(**board.dict())
+    db_board = models.Board(**board.model_dump())
     db.add(db_board)
+    versioning.bump_project_version(db, db_project.id)
     db.commit()
     db.refresh(db_board)
     return db_board
@@ -27,16 +28,90 @@ def create_board(
 @router.get("/projects/{project_id}/boards", response_model=List[schemas.Board])
 def get_boards(
     project_id: int, 
+    request: Request,
+    response: Response,
     db: Session = Depends(get_db), 
-    current_user: models.User = Depends(security.get_current_user)
+    current_user: models.User = Depends(security.get_current_user),
+    fields: str = None
 ):
-    db_project = db.query(models.Project).filter(models.Project.id == project_id).first()
-    if not db_project:
+    version = versioning.current_version(db, project_id)
+    if version is None:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Project not found")
-    if current_user not in db_project.users:
-        raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="Not authorized to view boards in this project")
+    permissions.ensure_project_member(db, project_id, current_user, "Not authorized to view boards in this project")
+    columns = serialization.sparse_columns(schemas.Board, models.Board, fields)
+    cached = etags.not_modified(
+        request, response, etags.make_etag("boards", project_id, version, query=request.url.query)
+    )
+    if cached is not None:
+        return cached
+
+    rows = serialization.select_rows(
+        db, schemas.Board, models.Board,
+        select(models.Board).where(models.Board.project_id == project_id).order_by(models.Board.id),
+        columns,
+    )
+    return serialization.json_response(rows, response)
 
-    return db_project.boards
+@router.get("/boards/{board_id}/snapshot", response_model=schemas.BoardSnapshot)
+def get_board_snapshot(
+    board_id: int,
+    request: Request,
+    response: Response,
+    since_version: int = Query(None, ge=0),
+    db: Session = Depends(get_db),
+    current_user: models.User = Depends(security.get_current_user)
+):
+    # Board, columns and ticket cards in a fixed number of queries. The project
+    # version is read first, so a card changed concurrently is at worst sent
+    # again on the next delta rather than missed.
+    board = db.execute(
+        select(models.Board.id, models.Board.name, models.Board.project_id, models.Project.version)
+        .join(models.Project, models.Project.id == models.Board.project_id)
+        .where(models.Board.id == board_id)
+    ).first()
+    if not board:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Board not found")
+    permissions.ensure_project_member(db, board.project_id, current_user, "Not authorized to view boards in this project")
+    cached = etags.not_modified(
+        request, response, etags.make_etag("snapshot", board_id, board.version, query=request.url.query)
+    )
+    if cached is not None:
+        return cached
+
+    columns = db.execute(
+        select(models.Column.id, models.Column.name, models.Column.rank)
+        .where(models.Column.board_id == board_id)
+        .order_by(models.Column.rank, models.Column.id)
+    ).all()
+    board_tickets = select(models.Ticket.id).join(models.Column).where(models.Column.board_id == board_id)
+    cards = (
+        select(
+            models.Ticket.id, models.Ticket.title, models.Ticket.status, models.Ticket.priority,
+            models.Ticket.owner_id, models.Ticket.column_id, models.Ticket.rank, models.Ticket.version,
+        )
+        .join(models.Column)
+        .where(models.Column.board_id == board_id)
+        .order_by(models.Ticket.column_id, models.Ticket.rank, models.Ticket.id)
+    )
+    if since_version is not None:
+        cards = cards.where(models.Ticket.version > since_version)
+
+    tickets_by_column = {column.id: [] for column in columns}
+    for card in db.execute(cards).mappings():
+        tickets_by_column.setdefault(card["column_id"], []).append(card)
+
+    return {
+        "id": board.id,
+        "name": board.name,
+        "project_id": board.project_id,
+        "version": board.version,
+        "since_version": since_version,
+        "columns": [
+            {"id": column.id, "name": column.name, "rank": column.rank, "tickets": tickets_by_column[column.id]}
+            for column in columns
+        ],
+        "ticket_ids": db.execute(board_tickets).scalars().all() if since_version is not None else None,
+    }
 
 @router.post("/columns", response_model=schemas.Column, status_code=status.HTTP_201_CREATED)
 def create_column(
@@ -47,12 +122,12 @@ def create_column(
     db_board = db.query(models.Board).filter(models.Board.id == column.board_id).first()
     if not db_board:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Board not found")
-    
-    db_project = db_board.project
-    if current_user not in db_project.users:
-        raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="Not authorized to create columns in this project")
 
-    db_column = models.Column(**column.dict())
+    permissions.ensure_project_member(db, db_board.project_id, current_user, "Not authorized to create columns in this project")
+
+    db_column = models.Column(**column.model_dump())
+    versioning.bump_project_version(db, db_board.project_id)
+    db_column.rank = ranking.place(db, models.Column, models.Column.board_id, db_board.id)
     db.add(db_column)
     db.commit()
     db.refresh(db_column)
@@ -69,17 +144,47 @@ def update_column(
     if not db_column:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Column not found")
 
-    db_project = db_column.board.project
-    if current_user not in db_project.users:
-        raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="Not authorized to update columns in this project")
+    permissions.ensure_project_member(db, db_column.board.project_id, current_user, "Not authorized to update columns in this project")
 
-    update_data = column.dict(exclude_unset=True)
+    update_data = column.model_dump(exclude_unset=True)
     for key, value in update_data.items():
         setattr(db_column, key, value)
     
     db.add(db_column)
+    versioning.bump_project_version(db, db_column.board.project_id)
+    db.commit()
+    db.refresh(db_column)
+    return db_column
+
+@router.post("/columns/{column_id}/move", response_model=schemas.Column)
+def move_column(
+    column_id: int,
+    move: schemas.RankMove,
+    background_tasks: BackgroundTasks,
+    db: Session = Depends(get_db),
+    current_user: models.User = Depends(security.get_current_user)
+):
+    db_column = db.query(models.Column).filter(models.Column.id == column_id).first()
+    if not db_column:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Column not found")
+
+    project_id = db_column.board.project_id
+    permissions.ensure_project_member(db, project_id, current_user, "Not authorized to update columns in this project")
+
+    # Bumping first takes the project row lock, so concurrent moves on this
+    # board read each other's ranks. Only the moved column's row changes.
+    versioning.bump_project_version(db, project_id)
+    try:
+        db_column.rank = ranking.place(
+            db, models.Column, models.Column.board_id, db_column.board_id,
+            move.after_id, move.before_id, exclude_id=column_id,
+        )
+    except ValueError as error:
+        raise HTTPException(status_code=status.HTTP_409_CONFLICT, detail=str(error))
     db.commit()
     db.refresh(db_column)
+    if ranking.needs_rebalance(db_column.rank):
+        background_tasks.add_task(ranking.rebalance_board, db_column.board_id)
     return db_column
 
 @router.delete("/columns/{column_id}", status_code=status.HTTP_204_NO_CONTENT)
@@ -92,10 +197,23 @@ def delete_column(
     if not db_column:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Column not found")
 
-    db_project = db_column.board.project
-    if current_user not in db_project.users:
-        raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="Not authorized to delete columns in this project")
+    project_id = db_column.board.project_id
+    permissions.ensure_project_member(db, project_id, current_user, "Not authorized to delete columns in this project")
 
+    # Tickets go with the column; tombstone them so delta readers drop them too.
+    tickets = db.execute(
+        select(models.Ticket.id, models.Ticket.project_id, *(getattr(models.Ticket, a) for a in aggregates.DIMENSIONS.values()))
+        .where(models.Ticket.column_id == column_id)
+    ).mappings().all()
+    ticket_ids = [ticket["id"] for ticket in tickets]
+    version = versioning.bump_project_version(db, project_id)
+    counts = aggregates.deltas()
+    for ticket in tickets:
+        versioning.record_tombstone(db, project_id, ticket["id"], version)
+        counts.update(aggregates.deltas(before=ticket))
+    aggregates.apply(db, counts)
     db.delete(db_column)
     db.commit()
+    for ticket_id in ticket_ids:
+        ticket_search.remove_ticket(db, ticket_id)
     return
\ No newline at end of file
@@ -0,0 +1,27 @@
+from fastapi import APIRouter, Depends, HTTPException, Query, status
+from fastapi.responses import StreamingResponse
+from sqlalchemy.orm import Session
+from .. import models, security, permissions, versioning, export
+from ..database import get_db
+
+router = APIRouter()
+
+@router.get("/projects/{project_id}/export")
+def export_project(
+    project_id: int,
+    format: str = Query("ndjson", pattern="^(ndjson|csv)$"),
+    gzip: bool = False,
+    db: Session = Depends(get_db),
+    current_user: models.User = Depends(security.get_current_user)
+):
+    if versioning.current_version(db, project_id) is None:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Project not found")
+    permissions.ensure_project_member(db, project_id, current_user, "Not authorized to export this project", roles=["Admin", "Team Lead"])
+
+    filename = f"project-{project_id}.{format}" + (".gz" if gzip else "")
+    headers = {"Content-Disposition": f'attachment; filename="{filename}"'}
+    return StreamingResponse(
+        export.stream_export(project_id, format, gzip),
+        media_type="application/gzip" if gzip else export.MEDIA_TYPES[format],
+        headers=headers,
+    )
@@ -1,13 +1,15 @@
 from fastapi import APIRouter, Depends, HTTPException
-from sqlalchemy.orm import Session
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
 from .. import models, schemas, security
-from ..database import get_db
+from ..database import get_async_db
+from ..hashing import hasher
 
 router = APIRouter()
 
 @router.post("/request-password-reset", status_code=200)
-async def request_password_reset(user_email: schemas.UserEmail, db: Session = Depends(get_db)):
-    user = db.query(models.User).filter(models.User.email == user_email.email).first()
+async def request_password_reset(user_email: schemas.UserEmail, db: AsyncSession = Depends(get_async_db)):
+    user = (await db.execute(select(models.User).where(models.User.email == user_email.email))).scalars().first()
     if not user:
         raise HTTPException(status_code=404, detail="User not found")
     # In a real application, you would send an email with a password reset link
@@ -16,13 +18,14 @@ async def request_password_reset(user_email: schemas.UserEmail, db: Session = De
     return {"reset_token": token}
 
 @router.post("/reset-password", status_code=200)
-async def reset_password(password_reset: schemas.PasswordReset, db: Session = Depends(get_db)):
+async def reset_password(password_reset: schemas.PasswordReset, db: AsyncSession = Depends(get_async_db)):
     user_email = security.verify_token(password_reset.token)
     if not user_email:
         raise HTTPException(status_code=400, detail="Invalid token")
-    user = db.query(models.User).filter(models.User.email == user_email).first()
+    user = (await db.execute(select(models.User).where(models.User.email == user_email))).scalars().first()
     if not user:
         raise HTTPException(status_code=404, detail="User not found")
-    user.hashed_password = security.get_password_hash(password_reset.new_password)
-    db.commit()
+    user.hashed_password = await hasher.hash(password_reset.new_password)
+    await db.commit()
+    security.invalidate_user(user.id)
     return {"message": "Password updated successfully"}
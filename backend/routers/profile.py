@@ -1,18 +1,20 @@
-from fastapi import APIRouter, Depends, HTTPException
-from sqlalchemy.orm import Session
-from .. import models, schemas, security
-from ..database import get_db
+from fastapi import APIRouter, Depends
+from sqlalchemy.ext.asyncio import AsyncSession
+from .. import models, schemas, security, versioning
+from ..database import get_async_db
 
 router = APIRouter()
 
 @router.get("/profile", response_model=schemas.User)
-async def get_user_profile(db: Session = Depends(get_db), current_user: models.User = Depends(security.get_current_user)):
+async def get_user_profile(current_user: models.User = Depends(security.get_current_user_async)):
     return current_user
 
 @router.put("/profile", response_model=schemas.User)
-async def update_user_profile(user_update: schemas.UserUpdate, db: Session = Depends(get_db), current_user: models.User = Depends(security.get_current_user)):
-    for key, value in user_update.dict(exclude_unset=True).items():
+async def update_user_profile(user_update: schemas.UserUpdate, db: AsyncSession = Depends(get_async_db), current_user: models.User = Depends(security.get_current_user_async)):
+    for key, value in user_update.model_dump(exclude_unset=True).items():
         setattr(current_user, key, value)
-    db.commit()
-    db.refresh(current_user)
+    await versioning.touch_user_projects_async(db, current_user.id)
+    await db.commit()
+    security.invalidate_user(current_user.id)
+    await db.refresh(current_user)
     return current_user
@@ -1,7 +1,8 @@
-from fastapi import APIRouter, Depends, HTTPException, status
-from sqlalchemy.orm import Session
+from fastapi import APIRouter, BackgroundTasks, Depends, HTTPException, Query, Request, Response, status
+from sqlalchemy import func, select
+from sqlalchemy.orm import Session, selectinload
 from typing import List
-from .. import models, schemas, security
+from .. import models, schemas, security, permissions, deletion, etags, pagination, serialization, versioning, search as ticket_search
 from ..database import get_db
 
 router = APIRouter()
@@ -12,32 +13,100 @@ def create_project(
     db: Session = Depends(get_db), 
     current_user: models.User = Depends(security.get_current_user)
 ):
-    db_project = models.Project(**project.dict())
+    db_project = models.Project(**project.model_dump())
     db_project.users.append(current_user)
     db.add(db_project)
     db.commit()
+    permissions.invalidate_membership(db_project.id, current_user.id)
     db.refresh(db_project)
     return db_project
 
-@router.get("/projects", response_model=List[schemas.Project])
+@router.get("/projects", response_model=List[schemas.ProjectSummary])
 def get_projects(
+    response: Response,
     db: Session = Depends(get_db), 
     current_user: models.User = Depends(security.get_current_user)
 ):
-    return current_user.projects
+    # One query: member counts come from a correlated count on the
+    # project_users primary key instead of loading every member list.
+    member_count = (
+        select(func.count())
+        .where(models.project_users.c.project_id == models.Project.id)
+        .correlate(models.Project)
+        .scalar_subquery()
+    )
+    query = (
+        select(
+            models.Project.id, models.Project.name, models.Project.description,
+            models.Project.created_at, models.Project.updated_at, member_count.label("member_count"),
+        )
+        .join(models.project_users, models.project_users.c.project_id == models.Project.id)
+        .where(models.project_users.c.user_id == current_user.id)
+        .order_by(models.Project.id)
+    )
+    return serialization.json_response([dict(row) for row in db.execute(query).mappings()], response)
 
 @router.get("/projects/{project_id}", response_model=schemas.Project)
 def get_project(
     project_id: int, 
+    request: Request,
+    response: Response,
     db: Session = Depends(get_db), 
-    current_user: models.User = Depends(security.get_current_user)
+    current_user: models.User = Depends(security.get_current_user),
+    fields: str = None
 ):
-    db_project = db.query(models.Project).filter(models.Project.id == project_id).first()
-    if not db_project:
+    version = versioning.current_version(db, project_id)
+    if version is None:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Project not found")
-    if current_user not in db_project.users:
-        raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="Not authorized to access this project")
-    return db_project
+    permissions.ensure_project_member(db, project_id, current_user, "Not authorized to access this project")
+    cached = etags.not_modified(
+        request, response, etags.make_etag("project", project_id, version, query=request.url.query)
+    )
+    if cached is not None:
+        return cached
+    if fields:
+        # Sparse reads cover the project's own columns; members are paged
+        # through /projects/{id}/users.
+        columns = serialization.sparse_columns(schemas.Project, models.Project, fields)
+        rows = serialization.select_rows(
+            db, schemas.Project, models.Project, select(models.Project).where(models.Project.id == project_id), columns
+        )
+        return serialization.json_response(rows[0], response)
+    return db.execute(
+        select(models.Project).options(selectinload(models.Project.users)).where(models.Project.id == project_id)
+    ).scalar_one()
+
+@router.get("/projects/{project_id}/users", response_model=List[schemas.User])
+def get_project_users(
+    project_id: int,
+    request: Request,
+    response: Response,
+    db: Session = Depends(get_db),
+    current_user: models.User = Depends(security.get_current_user),
+    cursor: str = None,
+    limit: int = Query(pagination.DEFAULT_PAGE_SIZE, ge=1, le=pagination.MAX_PAGE_SIZE)
+):
+    version = versioning.current_version(db, project_id)
+    if version is None:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Project not found")
+    permissions.ensure_project_member(db, project_id, current_user, "Not authorized to access this project")
+    cached = etags.not_modified(
+        request, response, etags.make_etag("members", project_id, version, query=request.url.query)
+    )
+    if cached is not None:
+        return cached
+
+    query = (
+        select(models.User)
+        .join(models.project_users, models.project_users.c.user_id == models.User.id)
+        .where(models.project_users.c.project_id == project_id)
+        .order_by(models.User.id)
+    )
+    if cursor:
+        query = query.where(models.User.id > pagination.decode_cursor(cursor).get("id", 0))
+    rows = serialization.select_rows(db, schemas.User, models.User, query.limit(limit + 1))
+    rows = pagination.paginate(rows, limit, response, lambda user: {"id": user["id"]})
+    return serialization.json_response(rows, response)
 
 @router.put("/projects/{project_id}", response_model=schemas.Project)
 def update_project(
@@ -49,14 +118,14 @@ def update_project(
     db_project = db.query(models.Project).filter(models.Project.id == project_id).first()
     if not db_project:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Project not found")
-    if current_user not in db_project.users:
-        raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="Not authorized to update this project")
+    permissions.ensure_project_member(db, project_id, current_user, "Not authorized to update this project")
     
-    update_data = project.dict(exclude_unset=True)
+    update_data = project.model_dump(exclude_unset=True)
     for key, value in update_data.items():
         setattr(db_project, key, value)
     
     db.add(db_project)
+    versioning.bump_project_version(db, project_id)
     db.commit()
     db.refresh(db_project)
     return db_project
@@ -64,18 +133,48 @@ def update_project(
 @router.delete("/projects/{project_id}", status_code=status.HTTP_204_NO_CONTENT)
 def delete_project(
     project_id: int, 
+    background_tasks: BackgroundTasks,
+    async_delete: bool = Query(False, alias="async"),
     db: Session = Depends(get_db), 
     current_user: models.User = Depends(security.get_current_user)
 ):
-    db_project = db.query(models.Project).filter(models.Project.id == project_id).first()
-    if not db_project:
+    if versioning.current_version(db, project_id) is None:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Project not found")
-    if current_user not in db_project.users or current_user.role != "Admin":
-        raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="Not authorized to delete this project")
-    
-    db.delete(db_project)
+    permissions.ensure_project_member(db, project_id, current_user, "Not authorized to delete this project", roles=["Admin"])
+
+    if async_delete:
+        # Hide the project now and purge it in chunks after the response;
+        # GET /projects/{id}/deletion reports progress.
+        job, member_ids = deletion.mark_project_deleted(db, project_id, current_user.id)
+        db.commit()
+        for user_id in member_ids:
+            permissions.invalidate_membership(project_id, user_id)
+        background_tasks.add_task(deletion.purge_project, project_id)
+        content = schemas.ProjectDeletion.model_validate(job).model_dump()
+        return serialization.json_response(content, status_code=status.HTTP_202_ACCEPTED)
+
+    # Children go through ON DELETE CASCADE instead of being loaded one by one.
+    member_ids, ticket_ids = deletion.delete_project_now(db, project_id)
     db.commit()
-    return
+    for user_id in member_ids:
+        permissions.invalidate_membership(project_id, user_id)
+    for ticket_id in ticket_ids:
+        ticket_search.remove_ticket(db, ticket_id)
+    return Response(status_code=status.HTTP_204_NO_CONTENT)
+
+@router.get("/projects/{project_id}/deletion", response_model=schemas.ProjectDeletion)
+def get_project_deletion(
+    project_id: int,
+    db: Session = Depends(get_db),
+    current_user: models.User = Depends(security.get_current_user)
+):
+    job = db.get(models.ProjectDeletion, project_id)
+    if job is None:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Project deletion not found")
+    # The project's memberships are already gone, so only the requester and Admins may look.
+    if job.requested_by_id != current_user.id and current_user.role != "Admin":
+        raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="Not authorized to view this deletion")
+    return job
 
 @router.post("/projects/{project_id}/users", response_model=schemas.Project)
 def add_user_to_project(
@@ -87,15 +186,19 @@ def add_user_to_project(
     db_project = db.query(models.Project).filter(models.Project.id == project_id).first()
     if not db_project:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Project not found")
-    if current_user not in db_project.users or current_user.role not in ["Admin", "Team Lead"]:
-        raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="Not authorized to add users to this project")
+    permissions.ensure_project_member(db, project_id, current_user, "Not authorized to add users to this project", roles=["Admin", "Team Lead"])
     
     db_user = db.query(models.User).filter(models.User.id == user_id).first()
     if not db_user:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="User not found")
+
+    if permissions.is_project_member(db, project_id, user_id):
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="User is already a member of this project")
     
-    db_project.users.append(db_user)
+    permissions.add_project_member(db, project_id, user_id)
+    versioning.bump_project_version(db, project_id)
     db.commit()
+    permissions.invalidate_membership(project_id, user_id)
     db.refresh(db_project)
     return db_project
 
@@ -109,17 +212,18 @@ def remove_user_from_project(
     db_project = db.query(models.Project).filter(models.Project.id == project_id).first()
     if not db_project:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Project not found")
-    if current_user not in db_project.users or current_user.role not in ["Admin", "Team Lead"]:
-        raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="Not authorized to remove users from this project")
+    permissions.ensure_project_member(db, project_id, current_user, "Not authorized to remove users from this project", roles=["Admin", "Team Lead"])
 
     db_user = db.query(models.User).filter(models.User.id == user_id).first()
     if not db_user:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="User not found")
 
-    if db_user not in db_project.users:
+    if not permissions.is_project_member(db, project_id, user_id):
         raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="User is not a member of this project")
 
-    db_project.users.remove(db_user)
+    permissions.remove_project_member(db, project_id, user_id)
+    versioning.bump_project_version(db, project_id)
     db.commit()
+    permissions.invalidate_membership(project_id, user_id)
     db.refresh(db_project)
     return db_project
\ No newline at end of file
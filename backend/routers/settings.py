@@ -1,25 +1,41 @@
-from fastapi import APIRouter, Depends, HTTPException
-from sqlalchemy.orm import Session
-from .. import models, schemas, security
-from ..database import get_db
+from fastapi import APIRouter, Depends, HTTPException, Request, Response
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import selectinload
+from .. import models, schemas, security, permissions, etags, versioning
+from ..database import get_async_db
 
 router = APIRouter()
 
+async def _load_project(db: AsyncSession, project_id: int):
+    # Members are loaded eagerly because lazy loads are not allowed on an AsyncSession.
+    return (await db.execute(
+        select(models.Project)
+        .options(selectinload(models.Project.users))
+        .where(models.Project.id == project_id)
+        .execution_options(populate_existing=True)
+    )).scalars().first()
+
 @router.get("/projects/{project_id}/settings", response_model=schemas.Project)
-async def get_project_settings(project_id: int, db: Session = Depends(get_db), current_user: models.User = Depends(security.get_current_user)):
-    project = db.query(models.Project).filter(models.Project.id == project_id).first()
-    if not project or current_user not in project.users:
+async def get_project_settings(project_id: int, request: Request, response: Response, db: AsyncSession = Depends(get_async_db), current_user: models.User = Depends(security.get_current_user_async)):
+    version = await versioning.current_version_async(db, project_id)
+    if version is None:
         raise HTTPException(status_code=404, detail="Project not found")
-    return project
+    await permissions.ensure_project_member_async(db, project_id, current_user, "Project not found", status_code=404)
+    cached = etags.not_modified(request, response, etags.make_etag("settings", project_id, version))
+    if cached is not None:
+        return cached
+    return await _load_project(db, project_id)
 
 @router.put("/projects/{project_id}/settings", response_model=schemas.Project)
-async def update_project_settings(project_id: int, project_update: schemas.ProjectUpdate, db: Session = Depends(get_db), current_user: models.User = Depends(security.get_current_user)):
-    project = db.query(models.Project).filter(models.Project.id == project_id).first()
-    if not project or current_user not in project.users:
+async def update_project_settings(project_id: int, project_update: schemas.ProjectUpdate, db: AsyncSession = Depends(get_async_db), current_user: models.User = Depends(security.get_current_user_async)):
+    project = await db.get(models.Project, project_id)
+    if not project:
         raise HTTPException(status_code=404, detail="Project not found")
+    await permissions.ensure_project_member_async(db, project_id, current_user, "Project not found", status_code=404)
 
-    for key, value in project_update.dict(exclude_unset=True).items():
+    for key, value in project_update.model_dump(exclude_unset=True).items():
         setattr(project, key, value)
-    db.commit()
-    db.refresh(project)
-    return project
+    await versioning.bump_project_version_async(db, project_id)
+    await db.commit()
+    return await _load_project(db, project_id)
@@ -1,11 +1,32 @@
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, BackgroundTasks, Depends, HTTPException, Query, Request, Response, status
+from fastapi.responses import StreamingResponse
+from sqlalchemy import select
 from sqlalchemy.orm import Session
 from typing import List
-from .. import models, schemas, security
-from ..database import get_db
+from .. import models, schemas, security, permissions, pagination, aggregates, bulk, etags, events, history, ranking, serialization, versioning, search as ticket_search
+from ..database import SessionLocal, get_db
 
 router = APIRouter()
 
+STREAM_BATCH_SIZE = 500
+
+def _column_location(db: Session, column_id: int):
+    # (board_id, project_id) of a column in one query, or None if it does not exist.
+    return db.execute(
+        select(models.Board.id.label("board_id"), models.Board.project_id)
+        .join(models.Column, models.Column.board_id == models.Board.id)
+        .where(models.Column.id == column_id)
+    ).first()
+
+def _event_fields(ticket: models.Ticket) -> dict:
+    return {
+        "title": ticket.title,
+        "status": ticket.status,
+        "priority": ticket.priority,
+        "owner_id": ticket.owner_id,
+        "column_id": ticket.column_id,
+    }
+
 @router.post("/tickets", response_model=schemas.Ticket, status_code=status.HTTP_201_CREATED)
 def create_ticket(
     ticket: schemas.TicketCreate, 
@@ -13,65 +34,138 @@ def create_ticket(
     current_user: models.User = Depends(security.get_current_user)
 ):
     # Check if the column exists and if the user is a member of the project
-    db_column = db.query(models.Column).filter(models.Column.id == ticket.column_id).first()
-    if not db_column:
+    location = _column_location(db, ticket.column_id)
+    if location is None:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Column not found")
-    
-    db_project = db_column.board.project
-    if current_user not in db_project.users:
-        raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="Not authorized to create tickets in this project")
 
-    db_ticket = models.Ticket(**ticket.dict(), owner_id=current_user.id)
+    permissions.ensure_project_member(db, location.project_id, current_user, "Not authorized to create tickets in this project")
+
+    db_ticket = models.Ticket(**ticket.model_dump(), owner_id=current_user.id, project_id=location.project_id)
+    db_ticket.version = versioning.bump_project_version(db, location.project_id)
+    db_ticket.rank = ranking.place(db, models.Ticket, models.Ticket.column_id, ticket.column_id)
     db.add(db_ticket)
+    db.flush()
+    history.record(db, db_ticket.id, current_user.id, history.diff({}, _event_fields(db_ticket)))
+    aggregates.ticket_changed(db, after=aggregates.snapshot(db_ticket))
+    ticket_search.reindex_ticket(db, db_ticket.id)
     db.commit()
     db.refresh(db_ticket)
+    events.publisher.ticket_changed(
+        events.TICKET_CREATED, db_ticket.project_id, db_ticket.id, db_ticket.version,
+        board_id=location.board_id, fields=_event_fields(db_ticket),
+    )
     return db_ticket
 
+@router.post("/tickets/bulk", response_model=schemas.TicketBulkResponse)
+def bulk_tickets(
+    request: schemas.TicketBulkRequest,
+    db: Session = Depends(get_db),
+    current_user: models.User = Depends(security.get_current_user)
+):
+    results, batches = bulk.apply_ticket_batch(db, current_user, request.items)
+    db.commit()
+    for project_id, (version, changes) in batches.items():
+        events.publisher.tickets_changed(project_id, version, changes)
+    return {"results": results}
+
 @router.get("/tickets", response_model=List[schemas.Ticket])
 def get_tickets(
     project_id: int, 
+    request: Request,
+    response: Response,
     db: Session = Depends(get_db), 
     current_user: models.User = Depends(security.get_current_user),
     search: str = None,
-    status: str = None,
+    status_filter: str = Query(None, alias="status"),
     priority: str = None,
-    owner_id: int = None
+    owner_id: int = None,
+    cursor: str = None,
+    limit: int = Query(pagination.DEFAULT_PAGE_SIZE, ge=1, le=pagination.MAX_PAGE_SIZE),
+    stream: bool = False,
+    fields: str = None
 ):
     # Check if the user is a member of the project
-    db_project = db.query(models.Project).filter(models.Project.id == project_id).first()
-    if not db_project:
+    version = versioning.current_version(db, project_id)
+    if version is None:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Project not found")
-    if current_user not in db_project.users:
-        raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="Not authorized to view tickets in this project")
+    permissions.ensure_project_member(db, project_id, current_user, "Not authorized to view tickets in this project")
+    columns = serialization.sparse_columns(schemas.Ticket, models.Ticket, fields)
+    etag = etags.make_etag("tickets", project_id, version, query=request.url.query)
+    cached = etags.not_modified(request, response, etag)
+    if cached is not None:
+        return cached
 
-    query = db.query(models.Ticket).join(models.Column).join(models.Board).filter(models.Board.project_id == project_id)
+    query = select(models.Ticket).where(models.Ticket.project_id == project_id)
 
-    if search:
-        query = query.filter(models.Ticket.title.contains(search) | models.Ticket.description.contains(search))
-    if status:
-        query = query.filter(models.Ticket.status == status)
+    if status_filter:
+        query = query.where(models.Ticket.status == status_filter)
     if priority:
-        query = query.filter(models.Ticket.priority == priority)
+        query = query.where(models.Ticket.priority == priority)
     if owner_id:
-        query = query.filter(models.Ticket.owner_id == owner_id)
+        query = query.where(models.Ticket.owner_id == owner_id)
+
+    if stream:
+        if search:
+            query = ticket_search.filter_tickets(db, query, search)
+        return StreamingResponse(
+            _stream_tickets(query.order_by(models.Ticket.id), columns),
+            media_type="application/x-ndjson",
+            headers={"ETag": etag, "Cache-Control": etags.CACHE_CONTROL},
+        )
+
+    if search:
+        # Relevance-ordered results page by position rather than by key.
+        offset = pagination.decode_cursor(cursor).get("offset", 0) if cursor else 0
+        rows = ticket_search.search_tickets(db, query, search, offset, limit + 1, columns=columns)
+        rows = pagination.paginate(rows, limit, response, lambda ticket: {"offset": offset + limit})
+        return serialization.json_response(rows, response)
+
+    query = query.order_by(models.Ticket.id)
 
-    return query.all()
+    if cursor:
+        query = query.where(models.Ticket.id > pagination.decode_cursor(cursor).get("id", 0))
+    rows = serialization.select_rows(db, schemas.Ticket, models.Ticket, query.limit(limit + 1), columns)
+    rows = pagination.paginate(rows, limit, response, lambda ticket: {"id": ticket["id"]})
+    return serialization.json_response(rows, response)
+
+def _stream_tickets(query, columns):
+    # Runs after the request's session is gone, so it owns its own session and
+    # reads through a server-side cursor in STREAM_BATCH_SIZE chunks.
+    db = SessionLocal()
+    try:
+        query = query.with_only_columns(*columns)
+        for row in db.execute(query.execution_options(yield_per=STREAM_BATCH_SIZE)).mappings():
+            yield serialization.dumps(dict(row)) + b"\n"
+    finally:
+        db.close()
 
 @router.get("/tickets/{ticket_id}", response_model=schemas.Ticket)
 def get_ticket(
     ticket_id: int, 
+    request: Request,
+    response: Response,
     db: Session = Depends(get_db), 
-    current_user: models.User = Depends(security.get_current_user)
+    current_user: models.User = Depends(security.get_current_user),
+    fields: str = None
 ):
-    db_ticket = db.query(models.Ticket).filter(models.Ticket.id == ticket_id).first()
-    if not db_ticket:
+    stamp = db.execute(
+        select(models.Ticket.project_id, models.Ticket.version).where(models.Ticket.id == ticket_id)
+    ).first()
+    if not stamp:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Ticket not found")
-    
-    db_project = db_ticket.column.board.project
-    if current_user not in db_project.users:
-        raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="Not authorized to view this ticket")
 
-    return db_ticket
+    permissions.ensure_project_member(db, stamp.project_id, current_user, "Not authorized to view this ticket")
+    columns = serialization.sparse_columns(schemas.Ticket, models.Ticket, fields)
+    cached = etags.not_modified(
+        request, response, etags.make_etag("ticket", ticket_id, stamp.version, query=request.url.query)
+    )
+    if cached is not None:
+        return cached
+
+    rows = serialization.select_rows(
+        db, schemas.Ticket, models.Ticket, select(models.Ticket).where(models.Ticket.id == ticket_id), columns
+    )
+    return serialization.json_response(rows[0], response)
 
 @router.put("/tickets/{ticket_id}", response_model=schemas.Ticket)
 def update_ticket(
@@ -84,17 +178,118 @@ def update_ticket(
     if not db_ticket:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Ticket not found")
 
-    db_project = db_ticket.column.board.project
-    if current_user not in db_project.users:
-        raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="Not authorized to update this ticket")
+    permissions.ensure_project_member(db, db_ticket.project_id, current_user, "Not authorized to update this ticket")
+
+    update_data = ticket.model_dump(exclude_unset=True)
+    cleared = [field for field in bulk.REQUIRED_FIELDS if field in update_data and update_data[field] is None]
+    if cleared:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=f"{', '.join(cleared)} cannot be null")
+    previous_project_id = db_ticket.project_id
+    previous_location = _column_location(db, db_ticket.column_id) if db_ticket.column_id is not None else None
+    location = previous_location
+    if update_data.get("column_id") is not None and update_data["column_id"] != db_ticket.column_id:
+        location = _column_location(db, update_data["column_id"])
+        if location is None:
+            raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Column not found")
+        if location.project_id != db_ticket.project_id:
+            permissions.ensure_project_member(db, location.project_id, current_user, "Not authorized to move tickets into this project")
+            update_data["project_id"] = location.project_id
 
-    update_data = ticket.dict(exclude_unset=True)
-    for key, value in update_data.items():
+    changes = {key: value for key, value in update_data.items() if getattr(db_ticket, key) != value}
+    previous_values = {key: getattr(db_ticket, key) for key in changes}
+    before = aggregates.snapshot(db_ticket)
+    for key, value in changes.items():
         setattr(db_ticket, key, value)
+
+    if changes:
+        aggregates.ticket_changed(db, before, aggregates.snapshot(db_ticket))
+        db_ticket.version = versioning.bump_project_version(db, db_ticket.project_id)
+        if "column_id" in changes:
+            # Lands at the end of its new column; POST /tickets/{id}/move places it precisely.
+            db_ticket.rank = changes["rank"] = ranking.place(
+                db, models.Ticket, models.Ticket.column_id, db_ticket.column_id, exclude_id=db_ticket.id
+            )
+        if db_ticket.project_id != previous_project_id:
+            # The ticket left its old project; record that for delta readers there.
+            old_version = versioning.bump_project_version(db, previous_project_id)
+            versioning.record_tombstone(db, previous_project_id, db_ticket.id, old_version)
     
     db.add(db_ticket)
+    history.record(db, db_ticket.id, current_user.id, history.diff(previous_values, changes))
+    if "title" in changes or "description" in changes:
+        ticket_search.reindex_ticket(db, db_ticket.id)
+    db.commit()
+    db.refresh(db_ticket)
+
+    if changes:
+        board_id = location.board_id if location is not None else None
+        previous_board_id = previous_location.board_id if previous_location is not None else None
+        if db_ticket.project_id != previous_project_id:
+            events.publisher.ticket_changed(
+                events.TICKET_DELETED, previous_project_id, db_ticket.id, old_version, board_id=previous_board_id,
+            )
+            events.publisher.ticket_changed(
+                events.TICKET_CREATED, db_ticket.project_id, db_ticket.id, db_ticket.version,
+                board_id=board_id, fields=_event_fields(db_ticket),
+            )
+        else:
+            changes.pop("project_id", None)
+            events.publisher.ticket_changed(
+                events.TICKET_UPDATED, db_ticket.project_id, db_ticket.id, db_ticket.version,
+                board_id=board_id, fields=changes, previous_board_id=previous_board_id,
+            )
+    return db_ticket
+
+@router.post("/tickets/{ticket_id}/move", response_model=schemas.Ticket)
+def move_ticket(
+    ticket_id: int,
+    move: schemas.TicketMove,
+    background_tasks: BackgroundTasks,
+    db: Session = Depends(get_db),
+    current_user: models.User = Depends(security.get_current_user)
+):
+    db_ticket = db.query(models.Ticket).filter(models.Ticket.id == ticket_id).first()
+    if not db_ticket:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Ticket not found")
+
+    permissions.ensure_project_member(db, db_ticket.project_id, current_user, "Not authorized to update this ticket")
+
+    column_id = move.column_id if move.column_id is not None else db_ticket.column_id
+    previous_location = _column_location(db, db_ticket.column_id) if db_ticket.column_id is not None else None
+    location = _column_location(db, column_id) if column_id is not None else None
+    if location is None:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Column not found")
+    if location.project_id != db_ticket.project_id:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Use PUT /tickets/{ticket_id} to move tickets between projects")
+
+    # Bumping first takes the project row lock, so concurrent moves in this
+    # project read each other's ranks. Only the moved ticket's row changes.
+    db_ticket.version = versioning.bump_project_version(db, db_ticket.project_id)
+    try:
+        rank = ranking.place(
+            db, models.Ticket, models.Ticket.column_id, column_id, move.after_id, move.before_id, exclude_id=ticket_id,
+        )
+    except ValueError as error:
+        raise HTTPException(status_code=status.HTTP_409_CONFLICT, detail=str(error))
+
+    changes = {"rank": rank}
+    if column_id != db_ticket.column_id:
+        changes["column_id"] = column_id
+        before = aggregates.snapshot(db_ticket)
+        history.record(db, ticket_id, current_user.id, history.diff({"column_id": db_ticket.column_id}, changes))
+        db_ticket.column_id = column_id
+        aggregates.ticket_changed(db, before, aggregates.snapshot(db_ticket))
+    db_ticket.rank = rank
     db.commit()
     db.refresh(db_ticket)
+
+    events.publisher.ticket_changed(
+        events.TICKET_UPDATED, db_ticket.project_id, db_ticket.id, db_ticket.version,
+        board_id=location.board_id, fields=changes,
+        previous_board_id=previous_location.board_id if previous_location is not None else None,
+    )
+    if ranking.needs_rebalance(rank):
+        background_tasks.add_task(ranking.rebalance_column, column_id)
     return db_ticket
 
 @router.delete("/tickets/{ticket_id}", status_code=status.HTTP_204_NO_CONTENT)
@@ -107,29 +302,55 @@ def delete_ticket(
     if not db_ticket:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Ticket not found")
 
-    db_project = db_ticket.column.board.project
-    if current_user not in db_project.users or current_user.role not in ["Admin", "Team Lead"]:
-        raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="Not authorized to delete this ticket")
+    permissions.ensure_project_member(db, db_ticket.project_id, current_user, "Not authorized to delete this ticket", roles=["Admin", "Team Lead"])
 
+    project_id = db_ticket.project_id
+    location = _column_location(db, db_ticket.column_id) if db_ticket.column_id is not None else None
+    version = versioning.bump_project_version(db, project_id)
+    versioning.record_tombstone(db, project_id, ticket_id, version)
+    aggregates.ticket_changed(db, before=aggregates.snapshot(db_ticket))
     db.delete(db_ticket)
     db.commit()
+    ticket_search.remove_ticket(db, ticket_id)
+    events.publisher.ticket_changed(
+        events.TICKET_DELETED, project_id, ticket_id, version,
+        board_id=location.board_id if location is not None else None,
+    )
     return
 
 @router.get("/tickets/{ticket_id}/history", response_model=List[schemas.TicketHistory])
 def get_ticket_history(
     ticket_id: int, 
+    response: Response,
     db: Session = Depends(get_db), 
-    current_user: models.User = Depends(security.get_current_user)
+    current_user: models.User = Depends(security.get_current_user),
+    cursor: str = None,
+    limit: int = Query(pagination.DEFAULT_PAGE_SIZE, ge=1, le=pagination.MAX_PAGE_SIZE)
 ):
     db_ticket = db.query(models.Ticket).filter(models.Ticket.id == ticket_id).first()
     if not db_ticket:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Ticket not found")
 
-    db_project = db_ticket.column.board.project
-    if current_user not in db_project.users:
-        raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="Not authorized to view ticket history")
+    permissions.ensure_project_member(db, db_ticket.project_id, current_user, "Not authorized to view ticket history")
 
-    return db_ticket.history
+    # Newest first, keyset-paginated on the (ticket_id, id) index. Ids grow
+    # with every change, so they order a ticket's history without comparing
+    # timestamps, whose stored form varies by backend.
+    query = (
+        select(models.TicketHistory)
+        .where(models.TicketHistory.ticket_id == ticket_id)
+        .order_by(models.TicketHistory.id.desc())
+    )
+    if cursor:
+        position = pagination.decode_cursor(cursor)
+        try:
+            history_id = int(position["id"])
+        except (KeyError, TypeError, ValueError):
+            raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Invalid cursor")
+        query = query.where(models.TicketHistory.id < history_id)
+    rows = serialization.select_rows(db, schemas.TicketHistory, models.TicketHistory, query.limit(limit + 1))
+    rows = pagination.paginate(rows, limit, response, lambda entry: {"id": entry["id"]})
+    return serialization.json_response(rows, response)
 
 @router.post("/tickets/{ticket_id}/comments", response_model=schemas.Comment, status_code=status.HTTP_201_CREATED)
 def create_comment(
@@ -142,12 +363,59 @@ def create_comment(
     if not db_ticket:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Ticket not found")
 
-    db_project = db_ticket.column.board.project
-    if current_user not in db_project.users:
-        raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="Not authorized to comment on this ticket")
+    permissions.ensure_project_member(db, db_ticket.project_id, current_user, "Not authorized to comment on this ticket")
 
-    db_comment = models.Comment(**comment.dict(), author_id=current_user.id)
+    db_comment = models.Comment(**comment.model_dump(), author_id=current_user.id)
+    db_ticket.version = versioning.bump_project_version(db, db_ticket.project_id)
     db.add(db_comment)
+    db.flush()
+    ticket_search.reindex_ticket(db, db_comment.ticket_id)
     db.commit()
     db.refresh(db_comment)
-    return db_comment
\ No newline at end of file
+    location = _column_location(db, db_ticket.column_id) if db_ticket.column_id is not None else None
+    events.publisher.ticket_changed(
+        events.TICKET_COMMENTED, db_ticket.project_id, db_ticket.id, db_ticket.version,
+        board_id=location.board_id if location is not None else None, fields={"comment_id": db_comment.id},
+    )
+    return db_comment
+
+@router.get("/projects/{project_id}/changes", response_model=schemas.TicketChanges)
+def get_ticket_changes(
+    project_id: int,
+    since: int = Query(0, ge=0),
+    limit: int = Query(pagination.DEFAULT_PAGE_SIZE, ge=1, le=pagination.MAX_PAGE_SIZE),
+    db: Session = Depends(get_db),
+    current_user: models.User = Depends(security.get_current_user)
+):
+    permissions.ensure_project_member(db, project_id, current_user, "Not authorized to view tickets in this project")
+    return versioning.changes_since(db, project_id, since, limit)
+
+@router.get("/projects/{project_id}/aggregates", response_model=schemas.TicketAggregates)
+def get_ticket_aggregates(
+    project_id: int,
+    request: Request,
+    response: Response,
+    db: Session = Depends(get_db),
+    current_user: models.User = Depends(security.get_current_user)
+):
+    version = versioning.current_version(db, project_id)
+    if version is None:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Project not found")
+    permissions.ensure_project_member(db, project_id, current_user, "Not authorized to view tickets in this project")
+    cached = etags.not_modified(request, response, etags.make_etag("aggregates", project_id, version))
+    if cached is not None:
+        return cached
+    return aggregates.read(db, project_id)
+
+@router.post("/projects/{project_id}/aggregates/recompute", response_model=schemas.TicketAggregates)
+def recompute_ticket_aggregates(
+    project_id: int,
+    db: Session = Depends(get_db),
+    current_user: models.User = Depends(security.get_current_user)
+):
+    if versioning.current_version(db, project_id) is None:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Project not found")
+    permissions.ensure_project_member(db, project_id, current_user, "Not authorized to recompute aggregates", roles=["Admin", "Team Lead"])
+    aggregates.recompute(db, project_id)
+    db.commit()
+    return aggregates.read(db, project_id)
@@ -1,6 +1,6 @@
-from pydantic import BaseModel
-from typing import List, Optional
-from datetime import datetime
+from pydantic import BaseModel, ConfigDict, Field
+from typing import Dict, List, Literal, Optional
+from datetime import date, datetime
 
 # User Schemas
 class UserBase(BaseModel):
@@ -22,8 +22,7 @@ class User(UserBase):
     created_at: datetime
     updated_at: Optional[datetime] = None
 
-    class Config:
-        orm_mode = True
+    model_config = ConfigDict(from_attributes=True)
 
 # Project Schemas
 class ProjectBase(BaseModel):
@@ -43,8 +42,15 @@ class Project(ProjectBase):
     updated_at: Optional[datetime] = None
     users: List[User] = []
 
-    class Config:
-        orm_mode = True
+    model_config = ConfigDict(from_attributes=True)
+
+class ProjectSummary(ProjectBase):
+    id: int
+    created_at: datetime
+    updated_at: Optional[datetime] = None
+    member_count: int
+
+    model_config = ConfigDict(from_attributes=True)
 
 # Board Schemas
 class BoardBase(BaseModel):
@@ -62,8 +68,7 @@ class Board(BoardBase):
     created_at: datetime
     updated_at: Optional[datetime] = None
 
-    class Config:
-        orm_mode = True
+    model_config = ConfigDict(from_attributes=True)
 
 # Column Schemas
 class ColumnBase(BaseModel):
@@ -78,9 +83,45 @@ class ColumnUpdate(ColumnBase):
 class Column(ColumnBase):
     id: int
     board_id: int
+    rank: str
+
+    model_config = ConfigDict(from_attributes=True)
 
-    class Config:
-        orm_mode = True
+class RankMove(BaseModel):
+    # The item lands right after `after_id` and before `before_id`; give
+    # either or both. With neither it goes to the end.
+    after_id: Optional[int] = None
+    before_id: Optional[int] = None
+
+# Board Snapshot Schemas
+class TicketCard(BaseModel):
+    id: int
+    title: str
+    status: str
+    priority: str
+    owner_id: Optional[int] = None
+    column_id: int
+    rank: str
+    version: int
+
+    model_config = ConfigDict(from_attributes=True)
+
+class ColumnSnapshot(BaseModel):
+    id: int
+    name: str
+    rank: str
+    tickets: List[TicketCard] = []
+
+class BoardSnapshot(BaseModel):
+    id: int
+    name: str
+    project_id: int
+    version: int
+    since_version: Optional[int] = None
+    columns: List[ColumnSnapshot]
+    # Delta mode only: every ticket id currently on the board, so clients can
+    # drop cards that were deleted or moved away.
+    ticket_ids: Optional[List[int]] = None
 
 # Ticket Schemas
 class TicketBase(BaseModel):
@@ -98,17 +139,100 @@ class TicketUpdate(TicketBase):
     owner_id: Optional[int] = None
     column_id: Optional[int] = None
 
+class TicketMove(RankMove):
+    # Target column on the same project's boards; defaults to the current one.
+    column_id: Optional[int] = None
+
 class Ticket(TicketBase):
     id: int
     owner_id: Optional[int] = None
     column_id: int
+    rank: str
+    project_id: Optional[int] = None
     status: str
     priority: str
+    version: int = 0
     created_at: datetime
     updated_at: Optional[datetime] = None
 
-    class Config:
-        orm_mode = True
+    model_config = ConfigDict(from_attributes=True)
+
+class TicketBulkItem(BaseModel):
+    op: Literal["create", "update", "move"]
+    id: Optional[int] = None
+    title: Optional[str] = None
+    description: Optional[str] = None
+    status: Optional[str] = None
+    priority: Optional[str] = None
+    owner_id: Optional[int] = None
+    column_id: Optional[int] = None
+
+class TicketBulkRequest(BaseModel):
+    items: List[TicketBulkItem] = Field(..., min_length=1, max_length=1000)
+
+class TicketBulkResult(BaseModel):
+    index: int
+    ok: bool
+    id: Optional[int] = None
+    error: Optional[str] = None
+
+class TicketBulkResponse(BaseModel):
+    results: List[TicketBulkResult]
+
+class TicketChanges(BaseModel):
+    version: int
+    has_more: bool
+    tickets: List[Ticket]
+    deleted: List[int]
+
+class TicketAggregates(BaseModel):
+    project_id: int
+    total: int
+    # Value -> ticket count; "" is the bucket for unset values.
+    status: Dict[str, int]
+    priority: Dict[str, int]
+    column: Dict[str, int]
+    owner: Dict[str, int]
+
+class ProjectDeletion(BaseModel):
+    project_id: int
+    requested_by_id: Optional[int] = None
+    status: str
+    total_tickets: int
+    deleted_tickets: int
+    error: Optional[str] = None
+    created_at: Optional[datetime] = None
+    updated_at: Optional[datetime] = None
+    finished_at: Optional[datetime] = None
+
+    model_config = ConfigDict(from_attributes=True)
+
+# Flow Analytics Schemas
+class FlowStats(BaseModel):
+    count: int
+    mean_seconds: Optional[float] = None
+    p50_seconds: Optional[float] = None
+    p85_seconds: Optional[float] = None
+    p95_seconds: Optional[float] = None
+
+class ThroughputWeek(BaseModel):
+    week_start: date
+    count: int
+
+class ColumnFlow(BaseModel):
+    column_id: int
+    dwell: FlowStats
+    completed: int
+    cycle_time: FlowStats
+
+class ProjectFlow(BaseModel):
+    project_id: int
+    start: date
+    end: date
+    lead_time: FlowStats
+    cycle_time: FlowStats
+    throughput: List[ThroughputWeek]
+    columns: List[ColumnFlow]
 
 # Comment Schemas
 class CommentBase(BaseModel):
@@ -127,8 +251,7 @@ class Comment(CommentBase):
     created_at: datetime
     updated_at: Optional[datetime] = None
 
-    class Config:
-        orm_mode = True
+    model_config = ConfigDict(from_attributes=True)
 
 # Ticket History Schemas
 class TicketHistoryBase(BaseModel):
@@ -146,8 +269,7 @@ class TicketHistory(TicketHistoryBase):
     changed_by_id: int
     changed_at: datetime
 
-    class Config:
-        orm_mode = True
+    model_config = ConfigDict(from_attributes=True)
 
 # Token Schemas
 class Token(BaseModel):
@@ -178,5 +300,4 @@ class Invitation(InvitationBase):
     token: str
     expires_at: datetime
 
-    class Config:
-        orm_mode = True
\ No newline at end of file
+    model_config = ConfigDict(from_attributes=True)
\ No newline at end of file
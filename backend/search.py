@@ -0,0 +1,204 @@
+from collections import defaultdict
+from sqlalchemy import bindparam, func, select, text
+from sqlalchemy.orm import Session
+from dotenv import load_dotenv
+import bisect
+import os
+import re
+import threading
+from . import models
+
+load_dotenv()
+
+SEARCH_LANGUAGE = os.getenv("SEARCH_LANGUAGE", "english")
+
+_WORD_RE = re.compile(r"\w+", re.UNICODE)
+
+# Field weights, mirrored by the setweight() labels used on Postgres.
+TITLE_WEIGHT = 4.0
+DESCRIPTION_WEIGHT = 2.0
+COMMENT_WEIGHT = 1.0
+
+def tokenize(value: str) -> list:
+    return _WORD_RE.findall(value.lower()) if value else []
+
+def _is_postgres(db: Session) -> bool:
+    return db.get_bind().dialect.name == "postgresql"
+
+def _tsquery(terms: list):
+    # Terms come from tokenize(), so they never contain tsquery operators.
+    return func.to_tsquery(SEARCH_LANGUAGE, " & ".join(f"{term}:*" for term in terms))
+
+_POSTGRES_REINDEX = text(
+    """
+    UPDATE tickets SET search_vector =
+        setweight(to_tsvector(CAST(:language AS regconfig), coalesce(title, '')), 'A') ||
+        setweight(to_tsvector(CAST(:language AS regconfig), coalesce(description, '')), 'B') ||
+        setweight(to_tsvector(CAST(:language AS regconfig), coalesce(
+            (SELECT string_agg(content, ' ') FROM comments WHERE comments.ticket_id = tickets.id), ''
+        )), 'C')
+    WHERE id IN :ticket_ids
+    """
+).bindparams(bindparam("ticket_ids", expanding=True))
+
+class InvertedIndex:
+    """In-process fallback index for databases without native full-text search.
+
+    Built lazily from the database on first use and kept current by the same
+    reindex/remove calls that maintain the Postgres column. It is local to the
+    worker process, so it is meant for SQLite development and tests.
+    """
+
+    def __init__(self):
+        self._postings = defaultdict(dict)
+        self._documents = {}
+        self._vocabulary = []
+        self._loaded = False
+        self._lock = threading.RLock()
+
+    def _weights(self, title, description, comments) -> dict:
+        weights = defaultdict(float)
+        for term in tokenize(title):
+            weights[term] += TITLE_WEIGHT
+        for term in tokenize(description):
+            weights[term] += DESCRIPTION_WEIGHT
+        for content in comments:
+            for term in tokenize(content):
+                weights[term] += COMMENT_WEIGHT
+        return weights
+
+    def _put(self, ticket_id: int, weights: dict):
+        self._drop(ticket_id)
+        for term, weight in weights.items():
+            if term not in self._postings:
+                bisect.insort(self._vocabulary, term)
+            self._postings[term][ticket_id] = weight
+        self._documents[ticket_id] = set(weights)
+
+    def _drop(self, ticket_id: int):
+        for term in self._documents.pop(ticket_id, ()):
+            postings = self._postings[term]
+            postings.pop(ticket_id, None)
+            if not postings:
+                del self._postings[term]
+                del self._vocabulary[bisect.bisect_left(self._vocabulary, term)]
+
+    def _ensure_loaded(self, db: Session):
+        if self._loaded:
+            return
+        comments = defaultdict(list)
+        for ticket_id, content in db.execute(select(models.Comment.ticket_id, models.Comment.content)):
+            comments[ticket_id].append(content)
+        for ticket_id, title, description in db.execute(
+            select(models.Ticket.id, models.Ticket.title, models.Ticket.description)
+        ):
+            self._put(ticket_id, self._weights(title, description, comments.get(ticket_id, ())))
+        self._loaded = True
+
+    def reindex(self, db: Session, ticket_id: int):
+        with self._lock:
+            if not self._loaded:
+                self._ensure_loaded(db)
+                return
+            row = db.execute(
+                select(models.Ticket.title, models.Ticket.description).where(models.Ticket.id == ticket_id)
+            ).first()
+            if row is None:
+                self._drop(ticket_id)
+                return
+            comments = db.execute(
+                select(models.Comment.content).where(models.Comment.ticket_id == ticket_id)
+            ).scalars().all()
+            self._put(ticket_id, self._weights(row.title, row.description, comments))
+
+    def remove(self, ticket_id: int):
+        with self._lock:
+            self._drop(ticket_id)
+
+    def search(self, db: Session, terms: list) -> dict:
+        """Return {ticket_id: score} for tickets matching every term as a prefix."""
+        with self._lock:
+            self._ensure_loaded(db)
+            scores = None
+            for term in terms:
+                matches = defaultdict(float)
+                start = bisect.bisect_left(self._vocabulary, term)
+                for word in self._vocabulary[start:]:
+                    if not word.startswith(term):
+                        break
+                    for ticket_id, weight in self._postings[word].items():
+                        matches[ticket_id] += weight
+                if scores is None:
+                    scores = dict(matches)
+                else:
+                    scores = {ticket_id: score + matches[ticket_id] for ticket_id, score in scores.items() if ticket_id in matches}
+                if not scores:
+                    return {}
+            return scores or {}
+
+fallback_index = InvertedIndex()
+
+def reindex_tickets(db: Session, ticket_ids: list):
+    """Refresh search documents; call inside the mutating transaction."""
+    if not ticket_ids:
+        return
+    if _is_postgres(db):
+        db.execute(_POSTGRES_REINDEX, {"language": SEARCH_LANGUAGE, "ticket_ids": list(ticket_ids)})
+    else:
+        db.flush()
+        for ticket_id in ticket_ids:
+            fallback_index.reindex(db, ticket_id)
+
+def reindex_ticket(db: Session, ticket_id: int):
+    reindex_tickets(db, [ticket_id])
+
+def remove_ticket(db: Session, ticket_id: int):
+    if not _is_postgres(db):
+        fallback_index.remove(ticket_id)
+
+def filter_tickets(db: Session, query, search: str):
+    """Restrict a select(models.Ticket) to tickets matching the search text."""
+    terms = tokenize(search)
+    if not terms:
+        return query
+    if _is_postgres(db):
+        return query.where(models.Ticket.search_vector.op("@@")(_tsquery(terms)))
+    return query.where(models.Ticket.id.in_(list(fallback_index.search(db, terms))))
+
+def _fetch(db: Session, query, columns) -> list:
+    if columns:
+        return [dict(row) for row in db.execute(query.with_only_columns(*columns)).mappings()]
+    return db.execute(query).scalars().all()
+
+def search_tickets(db: Session, query, search: str, offset: int, limit: int, columns: tuple = None) -> list:
+    """Return one page of matching tickets ordered by relevance, then id.
+
+    With `columns` (which must include Ticket.id) only those columns are
+    selected and rows come back as dicts instead of Ticket instances.
+    """
+    terms = tokenize(search)
+    if not terms:
+        return _fetch(db, query.order_by(models.Ticket.id).offset(offset).limit(limit), columns)
+    if _is_postgres(db):
+        tsquery = _tsquery(terms)
+        rank = func.ts_rank(models.Ticket.search_vector, tsquery)
+        return _fetch(
+            db,
+            query.where(models.Ticket.search_vector.op("@@")(tsquery))
+            .order_by(rank.desc(), models.Ticket.id)
+            .offset(offset)
+            .limit(limit),
+            columns,
+        )
+
+    scores = fallback_index.search(db, terms)
+    if not scores:
+        return []
+    ids = db.execute(
+        query.with_only_columns(models.Ticket.id).where(models.Ticket.id.in_(list(scores)))
+    ).scalars().all()
+    ids.sort(key=lambda ticket_id: (-scores[ticket_id], ticket_id))
+    page = ids[offset:offset + limit]
+    rows = _fetch(db, select(models.Ticket).where(models.Ticket.id.in_(page)), columns)
+    tickets = {row["id"] if columns else row.id: row for row in rows}
+    return [tickets[ticket_id] for ticket_id in page]
@@ -1,22 +1,37 @@
 from jose import JWTError, jwt
 from datetime import datetime, timedelta
-from .. import schemas
-from ..database import SessionLocal
-from .. import models
+from .cache import TTLCache
+from .database import get_async_db, get_db
+from .realtime import manager
+from . import models
 from fastapi import Depends, HTTPException
 from fastapi.security import OAuth2PasswordBearer
-from sqlalchemy.orm import Session
+from sqlalchemy import inspect, select
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session, make_transient_to_detached
 from dotenv import load_dotenv
 import os
+import time
 
 load_dotenv()
 
 SECRET_KEY = os.getenv("SECRET_KEY", "a_super_secret_key")
 ALGORITHM = "HS256"
 ACCESS_TOKEN_EXPIRE_MINUTES = 30
+PRINCIPAL_CACHE_TTL_SECONDS = float(os.getenv("PRINCIPAL_CACHE_TTL_SECONDS", "60"))
+PRINCIPAL_CACHE_MAX_SIZE = int(os.getenv("PRINCIPAL_CACHE_MAX_SIZE", "10000"))
 
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl="auth/login")
 
+# Resolved principals keyed by raw token. Entries never outlive the token's
+# own expiry and are ignored once the user is invalidated after they were read.
+principal_cache = TTLCache(max_size=PRINCIPAL_CACHE_MAX_SIZE, ttl=PRINCIPAL_CACHE_TTL_SECONDS, name="principal")
+# user_id -> monotonic time of the last invalidate_user. A marker only has to
+# outlive the principals read before it, so it expires with them (doubled to
+# cover principals whose database read was still in flight).
+user_invalidations = TTLCache(max_size=PRINCIPAL_CACHE_MAX_SIZE, ttl=2 * PRINCIPAL_CACHE_TTL_SECONDS)
+USER_TOPIC = "internal:user"
+
 def create_access_token(data: dict):
     to_encode = data.copy()
     expire = datetime.utcnow() + timedelta(minutes=ACCESS_TOKEN_EXPIRE_MINUTES)
@@ -24,21 +39,86 @@ def create_access_token(data: dict):
     encoded_jwt = jwt.encode(to_encode, SECRET_KEY, algorithm=ALGORITHM)
     return encoded_jwt
 
-def get_current_user(token: str = Depends(oauth2_scheme), db: Session = Depends(SessionLocal)):
-    credentials_exception = HTTPException(
+def verify_token(token: str):
+    try:
+        payload = jwt.decode(token, SECRET_KEY, algorithms=[ALGORITHM])
+    except JWTError:
+        return None
+    return payload.get("sub")
+
+def _mark_invalidated(message: str):
+    user_invalidations.set(int(message), time.monotonic())
+
+manager.on(USER_TOPIC, _mark_invalidated)
+
+def invalidate_user(user_id: int):
+    """Stop serving cached principals of this user here at once and on other workers via the broker.
+
+    Call after committing; safe from threadpool workers.
+    """
+    user_invalidations.set(user_id, time.monotonic())
+    manager.publish_threadsafe(USER_TOPIC, str(user_id))
+
+def _snapshot_user(user: models.User) -> dict:
+    return {attr.key: getattr(user, attr.key) for attr in inspect(models.User).column_attrs}
+
+def _detached_user(columns: dict) -> models.User:
+    # Rebuild the user as a detached instance that merge(load=False) can
+    # attach to the request's session without emitting a SELECT.
+    user = models.User(**columns)
+    make_transient_to_detached(user)
+    return user
+
+def _cached_principal(token: str):
+    cached = principal_cache.get(token)
+    if cached is not None and cached["read_at"] > user_invalidations.get(cached["columns"]["id"], 0):
+        return cached["columns"]
+    return None
+
+def _credentials_exception() -> HTTPException:
+    return HTTPException(
         status_code=401,
         detail="Could not validate credentials",
         headers={"WWW-Authenticate": "Bearer"},
     )
+
+def _decode_token(token: str) -> dict:
+    credentials_exception = _credentials_exception()
     try:
         payload = jwt.decode(token, SECRET_KEY, algorithms=[ALGORITHM])
-        username: str = payload.get("sub")
-        if username is None:
+        if payload.get("sub") is None:
             raise credentials_exception
-        token_data = schemas.TokenData(username=username)
     except JWTError:
         raise credentials_exception
-    user = db.query(models.User).filter(models.User.username == token_data.username).first()
+    return payload
+
+def _remember_principal(token: str, payload: dict, user: models.User, read_at: float):
     if user is None:
-        raise credentials_exception
+        raise _credentials_exception()
+    remaining = payload["exp"] - time.time() if "exp" in payload else PRINCIPAL_CACHE_TTL_SECONDS
+    if remaining > 0:
+        principal_cache.set(token, {"read_at": read_at, "columns": _snapshot_user(user)}, ttl=remaining)
+
+def _user_by_username(username: str):
+    return select(models.User).where(models.User.username == username)
+
+def get_current_user(token: str = Depends(oauth2_scheme), db: Session = Depends(get_db)):
+    columns = _cached_principal(token)
+    if columns is not None:
+        return db.merge(_detached_user(columns), load=False)
+    read_at = time.monotonic()
+    payload = _decode_token(token)
+    user = db.execute(_user_by_username(payload["sub"])).scalars().first()
+    _remember_principal(token, payload, user, read_at)
+    return user
+
+async def get_current_user_async(token: str = Depends(oauth2_scheme), db: AsyncSession = Depends(get_async_db)):
+    """get_current_user for async routes; the user belongs to the route's AsyncSession."""
+    columns = _cached_principal(token)
+    if columns is not None:
+        return await db.merge(_detached_user(columns), load=False)
+    read_at = time.monotonic()
+    payload = _decode_token(token)
+    user = (await db.execute(_user_by_username(payload["sub"]))).scalars().first()
+    _remember_principal(token, payload, user, read_at)
     return user
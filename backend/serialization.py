@@ -0,0 +1,74 @@
+from fastapi import HTTPException, Response, status
+from fastapi.responses import JSONResponse
+from functools import lru_cache
+from pydantic import TypeAdapter
+from typing import List
+import pydantic_core
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover - orjson is optional
+    orjson = None
+
+def dumps(content) -> bytes:
+    """Encode plain Python data (dicts, lists, datetimes) as compact JSON bytes."""
+    if orjson is not None:
+        return orjson.dumps(content)
+    return pydantic_core.to_json(content)
+
+
+class FastJSONResponse(JSONResponse):
+    """JSONResponse that encodes with orjson, or pydantic-core when it is missing."""
+
+    def render(self, content) -> bytes:
+        return dumps(content)
+
+
+@lru_cache(maxsize=None)
+def list_adapter(schema) -> TypeAdapter:
+    return TypeAdapter(List[schema])
+
+@lru_cache(maxsize=None)
+def row_columns(schema, model) -> tuple:
+    """Model columns backing the scalar fields of `schema`, in field order."""
+    columns = model.__table__.columns
+    return tuple(getattr(model, name) for name in schema.model_fields if name in columns)
+
+def sparse_columns(schema, model, fields: str = None) -> tuple:
+    """Columns for a `fields=` query parameter.
+
+    `fields` is a comma-separated subset of the schema's column-backed
+    fields; `id` is always included. Without it every column is returned.
+    """
+    columns = row_columns(schema, model)
+    if not fields:
+        return columns
+    requested = {name.strip() for name in fields.split(",") if name.strip()} | {"id"}
+    unknown = requested - {column.key for column in columns}
+    if unknown:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST, detail=f"Unknown fields: {', '.join(sorted(unknown))}"
+        )
+    return tuple(column for column in columns if column.key in requested)
+
+def select_rows(db, schema, model, query, columns: tuple = None) -> list:
+    """Run `query` for just the columns `schema` needs and return plain dicts.
+
+    Column values come straight from the driver with the types the schema
+    declares, so the rows are encoded without building ORM instances or
+    running validation. `columns` narrows the projection further.
+    """
+    result = db.execute(query.with_only_columns(*(columns or row_columns(schema, model))))
+    return [dict(row) for row in result.mappings()]
+
+def dump_objects(schema, objects) -> list:
+    """Serialize ORM instances (including nested relationships) in one pass
+    through a cached TypeAdapter; the slower path for rows that need it."""
+    adapter = list_adapter(schema)
+    return adapter.dump_python(adapter.validate_python(objects, from_attributes=True), mode="json")
+
+def json_response(content, response: Response = None, status_code: int = 200) -> FastJSONResponse:
+    # Routes that return a Response directly bypass the injected one, so carry
+    # over headers such as ETag and X-Next-Cursor.
+    headers = dict(response.headers) if response is not None else None
+    return FastJSONResponse(content, status_code=status_code, headers=headers)
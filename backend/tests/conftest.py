@@ -0,0 +1,88 @@
+import os
+import tempfile
+
+# Point the app at a throwaway SQLite file before anything imports backend.database.
+_DB_DIR = tempfile.mkdtemp(prefix="ticketing-tests-")
+os.environ["DATABASE_URL"] = f"sqlite:///{_DB_DIR}/test.db"
+os.environ.setdefault("SECRET_KEY", "test-secret")
+os.environ.pop("REDIS_URL", None)
+# Cheap bcrypt cost; the pool's spawned workers inherit it through the environment.
+os.environ["BCRYPT_ROUNDS"] = "5"
+
+import pytest
+from fastapi.testclient import TestClient
+
+from backend import models, permissions, security, search
+from backend.database import Base, SessionLocal, engine
+from backend.main import app
+
+
+@pytest.fixture(autouse=True)
+def fresh_database():
+    Base.metadata.drop_all(bind=engine)
+    Base.metadata.create_all(bind=engine)
+    security.principal_cache.clear()
+    security.user_invalidations.clear()
+    permissions.membership_cache.clear()
+    search.fallback_index = search.InvertedIndex()
+    yield
+
+
+@pytest.fixture
+def client():
+    with TestClient(app) as test_client:
+        yield test_client
+
+
+@pytest.fixture
+def db():
+    session = SessionLocal()
+    try:
+        yield session
+    finally:
+        session.close()
+
+
+@pytest.fixture
+def make_user(db):
+    def make(username: str, role: str = "Developer") -> models.User:
+        user = models.User(username=username, email=f"{username}@example.com", hashed_password="x", role=role)
+        db.add(user)
+        db.commit()
+        db.refresh(user)
+        return user
+    return make
+
+
+def _auth(user: models.User) -> dict:
+    return {"Authorization": f"Bearer {security.create_access_token({'sub': user.username})}"}
+
+
+@pytest.fixture
+def auth():
+    return _auth
+
+
+@pytest.fixture
+def board(client, make_user):
+    """An Admin who owns a project with one board and two columns."""
+    owner = make_user("owner", role="Admin")
+    headers = _auth(owner)
+    project = client.post("/api/projects", json={"name": "Apollo"}, headers=headers).json()
+    board = client.post("/api/boards", json={"name": "Main", "project_id": project["id"]}, headers=headers).json()
+    columns = [
+        client.post("/api/columns", json={"name": name, "board_id": board["id"]}, headers=headers).json()
+        for name in ("To Do", "Done")
+    ]
+    return {"owner": owner, "headers": headers, "project": project, "board": board, "columns": columns}
+
+
+@pytest.fixture
+def create_ticket(client, board):
+    def create(title: str = "Ticket", column: int = 0) -> dict:
+        response = client.post(
+            "/api/tickets", json={"title": title, "column_id": board["columns"][column]["id"]}, headers=board["headers"]
+        )
+        assert response.status_code == 201, response.text
+        return response.json()
+    return create
@@ -0,0 +1,27 @@
+def _aggregates(client, board, path=""):
+    url = f"/api/projects/{board['project']['id']}/aggregates{path}"
+    method = client.post if path else client.get
+    response = method(url, headers=board["headers"])
+    assert response.status_code == 200, response.text
+    return response.json()
+
+
+def test_counters_follow_ticket_changes(client, board, create_ticket):
+    first, second = create_ticket(), create_ticket()
+    client.put(f"/api/tickets/{first['id']}", json={"status": "done"}, headers=board["headers"])
+    client.delete(f"/api/tickets/{second['id']}", headers=board["headers"])
+    client.post("/api/tickets/bulk", json={"items": [
+        {"op": "create", "title": "Bulk", "column_id": board["columns"][0]["id"], "priority": "high"},
+    ]}, headers=board["headers"])
+
+    counts = _aggregates(client, board)
+    assert counts["total"] == 2
+    assert counts["status"] == {"done": 1, "open": 1}
+    assert counts["priority"] == {"medium": 1, "high": 1}
+
+
+def test_recompute_matches_incremental_counts(client, board, create_ticket):
+    for _ in range(3):
+        create_ticket()
+    incremental = _aggregates(client, board)
+    assert _aggregates(client, board, "/recompute") == incremental
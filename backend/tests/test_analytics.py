@@ -0,0 +1,62 @@
+from datetime import date, datetime, timedelta
+
+from sqlalchemy import update
+
+from backend import analytics, models
+
+
+def _ticket(create_ticket, db):
+    # Backdate the history written on creation so it has settled.
+    ticket_id = create_ticket()["id"]
+    db.execute(
+        update(models.TicketHistory)
+        .where(models.TicketHistory.ticket_id == ticket_id)
+        .values(changed_at=datetime.utcnow() - timedelta(hours=4))
+    )
+    db.commit()
+    return ticket_id
+
+
+def _history(db, ticket_id, new_value, age):
+    entry = models.TicketHistory(
+        ticket_id=ticket_id, field_changed="status", old_value=None, new_value=new_value,
+        changed_at=datetime.utcnow() - age,
+    )
+    db.add(entry)
+    db.commit()
+    return entry
+
+
+def _watermark(db):
+    db.expire_all()
+    return db.get(models.AnalyticsWatermark, analytics.WATERMARK).last_id
+
+
+def test_watermark_stops_at_first_unsettled_row(board, create_ticket, db, monkeypatch):
+    monkeypatch.setattr(analytics, "ANALYTICS_SETTLE_SECONDS", 60)
+    ticket_id = _ticket(create_ticket, db)
+    settled = _history(db, ticket_id, "in progress", timedelta(hours=2))
+    young = _history(db, ticket_id, "done", timedelta(seconds=0))
+    # Written after `young` but stamped earlier, like a long transaction.
+    late = _history(db, ticket_id, "done", timedelta(hours=1))
+
+    assert analytics.run() >= 1
+    assert _watermark(db) == settled.id
+
+    young.changed_at = datetime.utcnow() - timedelta(minutes=5)
+    db.commit()
+    assert analytics.run() >= 2
+    assert _watermark(db) == late.id
+
+
+def test_rollup_counts_completions(board, create_ticket, db, monkeypatch):
+    monkeypatch.setattr(analytics, "ANALYTICS_SETTLE_SECONDS", 0)
+    ticket_id = _ticket(create_ticket, db)
+    _history(db, ticket_id, "in progress", timedelta(hours=3))
+    _history(db, ticket_id, "done", timedelta(hours=1))
+    analytics.run()
+    today = date.today()
+    summary = analytics.flow_summary(db, board["project"]["id"], today - timedelta(days=1), today)
+    assert summary["lead_time"]["count"] == 1
+    assert summary["cycle_time"]["count"] == 1
+    assert sum(week["count"] for week in summary["throughput"]) == 1
@@ -0,0 +1,41 @@
+from passlib.context import CryptContext
+from backend import hashing, models
+
+
+def _login(client, username, password):
+    return client.post("/api/login", data={"username": username, "password": password})
+
+
+def test_register_then_login_through_the_hash_pool(client):
+    registered = client.post(
+        "/api/register", json={"username": "alice", "email": "alice@example.com", "password": "s3cret"}
+    )
+    assert registered.status_code == 201, registered.text
+    token = _login(client, "alice", "s3cret").json()["access_token"]
+    me = client.get("/api/me", headers={"Authorization": f"Bearer {token}"})
+    assert me.json()["username"] == "alice"
+
+
+def test_wrong_password_and_unknown_user_are_rejected(client):
+    client.post("/api/register", json={"username": "alice", "email": "alice@example.com", "password": "s3cret"})
+    assert _login(client, "alice", "wrong").status_code == 401
+    assert _login(client, "nobody", "s3cret").status_code == 401
+
+
+def test_outdated_hash_is_upgraded_on_login(client, make_user, db):
+    user = make_user("alice")
+    user.hashed_password = CryptContext(schemes=["bcrypt"], bcrypt__rounds=4).hash("s3cret")
+    db.commit()
+    assert _login(client, "alice", "s3cret").status_code == 200
+    db.expire_all()
+    assert db.get(models.User, user.id).hashed_password.startswith(f"$2b${hashing.BCRYPT_ROUNDS:02d}$")
+    assert _login(client, "alice", "s3cret").status_code == 200
+
+
+def test_saturated_pool_sheds_load(client, monkeypatch):
+    monkeypatch.setattr(hashing.hasher, "queue_limit", 0)
+    response = client.post(
+        "/api/register", json={"username": "alice", "email": "alice@example.com", "password": "s3cret"}
+    )
+    assert response.status_code == 503
+    assert response.headers["Retry-After"] == "1"
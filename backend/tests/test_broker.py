@@ -0,0 +1,19 @@
+import pytest
+
+from backend.broker import Broker, InMemoryBroker
+
+
+def test_broker_requires_publish():
+    class Incomplete(Broker):
+        pass
+
+    with pytest.raises(TypeError):
+        Incomplete()
+
+
+def test_in_memory_broker_delivers_locally():
+    delivered = []
+    broker = InMemoryBroker()
+    broker.deliver = lambda topic, message: delivered.append((topic, message))
+    broker.publish("project:1", "hello")
+    assert delivered == [("project:1", "hello")]
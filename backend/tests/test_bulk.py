@@ -0,0 +1,51 @@
+from backend import models
+
+
+def _bulk(client, board, items):
+    response = client.post("/api/tickets/bulk", json={"items": items}, headers=board["headers"])
+    assert response.status_code == 200, response.text
+    return response.json()["results"]
+
+
+def test_bulk_creates_and_updates(client, board, create_ticket, db):
+    ticket = create_ticket("Old")
+    column_id = board["columns"][0]["id"]
+    results = _bulk(client, board, [
+        {"op": "create", "title": "New", "column_id": column_id},
+        {"op": "update", "id": ticket["id"], "title": "Renamed"},
+        {"op": "move", "id": ticket["id"], "column_id": board["columns"][1]["id"]},
+    ])
+    assert [result["ok"] for result in results] == [True, True, True]
+    moved = db.get(models.Ticket, ticket["id"])
+    assert (moved.title, moved.column_id) == ("Renamed", board["columns"][1]["id"])
+    assert db.get(models.Ticket, results[0]["id"]).title == "New"
+
+
+def test_null_required_fields_fail_per_item(client, board, create_ticket, db):
+    ticket = create_ticket("Keep")
+    results = _bulk(client, board, [
+        {"op": "update", "id": ticket["id"], "title": None},
+        {"op": "update", "id": ticket["id"], "status": None, "priority": None},
+        {"op": "update", "id": ticket["id"], "description": "Still applied"},
+    ])
+    assert [result["ok"] for result in results] == [False, False, True]
+    assert results[0]["error"] == "title cannot be null"
+    assert results[1]["error"] == "status, priority cannot be null"
+    stored = db.get(models.Ticket, ticket["id"])
+    assert (stored.title, stored.description) == ("Keep", "Still applied")
+
+
+def test_constraint_violation_only_fails_its_item(client, board, create_ticket, db):
+    ticket = create_ticket("Keep")
+    column_id = board["columns"][0]["id"]
+    results = _bulk(client, board, [
+        {"op": "create", "title": "Good", "column_id": column_id},
+        {"op": "update", "id": ticket["id"], "owner_id": 9999},
+        {"op": "update", "id": ticket["id"], "title": "Renamed"},
+    ])
+    assert [result["ok"] for result in results] == [True, False, True]
+    assert [result["index"] for result in results] == [0, 1, 2]
+    db.expire_all()
+    stored = db.get(models.Ticket, ticket["id"])
+    assert (stored.title, stored.owner_id) == ("Renamed", board["owner"].id)
+    assert db.get(models.Ticket, results[0]["id"]).title == "Good"
@@ -0,0 +1,33 @@
+from backend import deletion, models
+
+
+def test_async_delete_hides_project_then_purges(client, board, create_ticket, db, monkeypatch):
+    # Keep the purge out of the request so the pending state can be observed.
+    monkeypatch.setattr(deletion, "purge_project", lambda project_id: None)
+    project_id = board["project"]["id"]
+    create_ticket()
+    response = client.delete(f"/api/projects/{project_id}", params={"async": "true"}, headers=board["headers"])
+    assert response.status_code == 202, response.text
+    assert response.json()["status"] == deletion.PENDING
+
+    headers = board["headers"]
+    assert client.get(f"/api/projects/{project_id}", headers=headers).status_code == 404
+    assert client.get("/api/tickets", params={"project_id": project_id}, headers=headers).status_code == 404
+    assert client.get(f"/api/projects/{project_id}/settings", headers=headers).status_code == 404
+    assert client.delete(f"/api/projects/{project_id}", params={"async": "true"}, headers=headers).status_code == 404
+
+    monkeypatch.undo()
+    assert deletion.purge_project(project_id, chunk_size=1)
+    db.expire_all()
+    assert db.get(models.Project, project_id) is None
+    assert db.query(models.Ticket).filter(models.Ticket.project_id == project_id).count() == 0
+    assert client.get(f"/api/projects/{project_id}/deletion", headers=headers).json()["status"] == deletion.DONE
+
+
+def test_delete_now_cascades(client, board, create_ticket, db):
+    project_id = board["project"]["id"]
+    ticket = create_ticket()
+    response = client.delete(f"/api/projects/{project_id}", headers=board["headers"])
+    assert response.status_code == 204
+    assert db.get(models.Ticket, ticket["id"]) is None
+    assert db.get(models.Board, board["board"]["id"]) is None
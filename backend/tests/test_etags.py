@@ -0,0 +1,35 @@
+def test_project_read_revalidates_until_a_change(client, board, create_ticket):
+    project_id = board["project"]["id"]
+    headers = board["headers"]
+    first = client.get("/api/tickets", params={"project_id": project_id}, headers=headers)
+    etag = first.headers["ETag"]
+
+    cached = client.get("/api/tickets", params={"project_id": project_id}, headers={**headers, "If-None-Match": etag})
+    assert cached.status_code == 304
+    assert cached.headers["ETag"] == etag
+
+    create_ticket()
+    changed = client.get("/api/tickets", params={"project_id": project_id}, headers={**headers, "If-None-Match": etag})
+    assert changed.status_code == 200
+    assert changed.headers["ETag"] != etag
+
+
+def test_etag_varies_with_query(client, board):
+    project_id = board["project"]["id"]
+    headers = board["headers"]
+    plain = client.get("/api/tickets", params={"project_id": project_id}, headers=headers).headers["ETag"]
+    filtered = client.get("/api/tickets", params={"project_id": project_id, "status": "open"}, headers=headers)
+    assert filtered.headers["ETag"] != plain
+
+
+def test_weak_and_wildcard_validators_match(client, board):
+    url = f"/api/projects/{board['project']['id']}"
+    etag = client.get(url, headers=board["headers"]).headers["ETag"]
+    for header in (f"W/{etag}", f'"other", {etag}', "*"):
+        assert client.get(url, headers={**board["headers"], "If-None-Match": header}).status_code == 304
+
+
+def test_non_members_do_not_get_validators(client, board, make_user, auth):
+    response = client.get(f"/api/projects/{board['project']['id']}", headers=auth(make_user("mallory")))
+    assert response.status_code == 403
+    assert "ETag" not in response.headers
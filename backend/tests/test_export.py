@@ -0,0 +1,48 @@
+import csv
+import gzip
+import io
+import json
+
+from backend import export
+
+
+def _export(client, board, **params):
+    response = client.get(f"/api/projects/{board['project']['id']}/export", params=params, headers=board["headers"])
+    assert response.status_code == 200, response.text
+    return response
+
+
+def test_ndjson_nests_comments_and_history(client, board, create_ticket):
+    first, second = create_ticket("First"), create_ticket("Second")
+    client.post(f"/api/tickets/{first['id']}/comments", json={"content": "Looks good", "ticket_id": first["id"]},
+                headers=board["headers"])
+    client.put(f"/api/tickets/{first['id']}", json={"status": "done"}, headers=board["headers"])
+
+    response = _export(client, board)
+    assert response.headers["content-type"].startswith("application/x-ndjson")
+    lines = [json.loads(line) for line in response.text.splitlines()]
+    assert [line["id"] for line in lines] == [first["id"], second["id"]]
+    assert set(export.TICKET_COLUMNS) <= set(lines[0])
+    assert [comment["content"] for comment in lines[0]["comments"]] == ["Looks good"]
+    assert set(lines[0]["comments"][0]) == set(export.COMMENT_COLUMNS)
+    assert ("status", "done") in {(entry["field_changed"], entry["new_value"]) for entry in lines[0]["history"]}
+    assert lines[1]["comments"] == []
+
+
+def test_csv_export_tags_records_and_compresses(client, board, create_ticket):
+    ticket = create_ticket("Only")
+    client.post(f"/api/tickets/{ticket['id']}/comments", json={"content": "Hi", "ticket_id": ticket["id"]},
+                headers=board["headers"])
+    response = _export(client, board, format="csv", gzip="true")
+    rows = list(csv.DictReader(io.StringIO(gzip.decompress(response.content).decode())))
+    assert rows[0]["record_type"] == "ticket" and rows[0]["title"] == "Only"
+    assert "comment" in {row["record_type"] for row in rows}
+    assert {row["ticket_id"] for row in rows} == {str(ticket["id"])}
+
+
+def test_export_is_limited_to_admins_and_team_leads(client, board, make_user, auth):
+    project_id = board["project"]["id"]
+    developer = make_user("dev")
+    client.post(f"/api/projects/{project_id}/users", params={"user_id": developer.id}, headers=board["headers"])
+    response = client.get(f"/api/projects/{project_id}/export", headers=auth(developer))
+    assert response.status_code == 403
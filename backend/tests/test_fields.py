@@ -0,0 +1,38 @@
+import json
+
+
+def test_ticket_list_returns_requested_fields(client, board, create_ticket):
+    create_ticket("Alpha")
+    response = client.get(
+        "/api/tickets", params={"project_id": board["project"]["id"], "fields": "title,status"}, headers=board["headers"]
+    )
+    assert response.status_code == 200, response.text
+    assert response.json() == [{"id": response.json()[0]["id"], "title": "Alpha", "status": "open"}]
+
+
+def test_single_ticket_and_stream_honour_fields(client, board, create_ticket):
+    ticket = create_ticket("Alpha")
+    single = client.get(f"/api/tickets/{ticket['id']}", params={"fields": "priority"}, headers=board["headers"])
+    assert single.json() == {"id": ticket["id"], "priority": "medium"}
+    stream = client.get(
+        "/api/tickets", params={"project_id": board["project"]["id"], "fields": "title", "stream": "true"},
+        headers=board["headers"],
+    )
+    assert [json.loads(line) for line in stream.text.splitlines()] == [{"id": ticket["id"], "title": "Alpha"}]
+
+
+def test_project_and_board_reads_honour_fields(client, board):
+    project_id = board["project"]["id"]
+    project = client.get(f"/api/projects/{project_id}", params={"fields": "name"}, headers=board["headers"])
+    assert project.json() == {"id": project_id, "name": "Apollo"}
+    boards = client.get(f"/api/projects/{project_id}/boards", params={"fields": "name"}, headers=board["headers"])
+    assert boards.json() == [{"id": board["board"]["id"], "name": "Main"}]
+
+
+def test_unknown_fields_are_rejected(client, board):
+    response = client.get(
+        "/api/tickets", params={"project_id": board["project"]["id"], "fields": "title,comments,secret"},
+        headers=board["headers"],
+    )
+    assert response.status_code == 400
+    assert response.json()["detail"] == "Unknown fields: comments, secret"
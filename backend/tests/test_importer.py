@@ -0,0 +1,57 @@
+import io
+import json
+
+import pytest
+
+from backend import importer, models
+
+
+def _write(path, records):
+    path.write_text("".join(json.dumps(record) + "\n" for record in records))
+    return str(path)
+
+
+def _titles(db, project_id):
+    db.expire_all()
+    return [title for (title,) in db.query(models.Ticket.title).filter(models.Ticket.project_id == project_id).order_by(models.Ticket.id)]
+
+
+def test_import_resumes_after_failed_batch(board, db, tmp_path, monkeypatch):
+    project_id = board["project"]["id"]
+    column_id = board["columns"][0]["id"]
+    path = _write(tmp_path / "tickets.ndjson", [
+        {"title": f"Ticket {n}", "column_id": column_id, "comments": [{"content": "hi", "author": "owner"}]} for n in range(5)
+    ])
+    write_batch = importer._write_batch
+    calls = []
+
+    def failing_second_batch(*args):
+        calls.append(1)
+        if len(calls) == 2:
+            raise RuntimeError("connection lost")
+        return write_batch(*args)
+
+    monkeypatch.setattr(importer, "_write_batch", failing_second_batch)
+    with pytest.raises(RuntimeError):
+        importer.import_file(path, project_id, batch_size=2, use_copy=False)
+    assert _titles(db, project_id) == ["Ticket 0", "Ticket 1"]
+
+    monkeypatch.setattr(importer, "_write_batch", write_batch)
+    totals = importer.import_file(path, project_id, batch_size=2, use_copy=False)
+    assert totals["imported"] == 5
+    assert _titles(db, project_id) == [f"Ticket {n}" for n in range(5)]
+    assert db.query(models.Comment).count() == 5
+
+
+def test_rejected_records_are_reported(board, db, tmp_path):
+    project_id = board["project"]["id"]
+    path = _write(tmp_path / "tickets.ndjson", [
+        {"title": "Good", "column": "To Do"},
+        {"title": "", "column": "To Do"},
+        {"title": "Lost", "column": "Nowhere"},
+    ])
+    errors = io.StringIO()
+    totals = importer.import_file(path, project_id, use_copy=False, errors=errors)
+    assert (totals["imported"], totals["failed"]) == (1, 2)
+    assert [json.loads(line)["position"] for line in errors.getvalue().splitlines()] == [2, 3]
+    assert _titles(db, project_id) == ["Good"]
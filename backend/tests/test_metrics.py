@@ -0,0 +1,16 @@
+from backend import instrumentation
+
+
+def test_metrics_report_routes_by_template(client, board, create_ticket):
+    ticket = create_ticket()
+    client.get(f"/api/tickets/{ticket['id']}", headers=board["headers"])
+    body = client.get("/api/metrics").text
+    assert 'http_requests_total{method="GET",route="/api/tickets/{ticket_id}",status="200"}' in body
+    assert 'http_request_db_queries_count{method="POST",route="/api/tickets"}' in body
+    assert 'cache_hits_total{cache="principal"}' in body
+
+
+def test_metrics_token(client, monkeypatch):
+    monkeypatch.setattr(instrumentation, "METRICS_TOKEN", "s3cret")
+    assert client.get("/api/metrics").status_code == 401
+    assert client.get("/api/metrics", headers={"Authorization": "Bearer s3cret"}).status_code == 200
@@ -0,0 +1,33 @@
+import json
+
+
+def test_ticket_cursor_walks_every_ticket_once(client, board, create_ticket):
+    created = [create_ticket(f"Ticket {n}")["id"] for n in range(7)]
+    project_id = board["project"]["id"]
+    seen, params = [], {"project_id": project_id, "limit": 3}
+    while True:
+        response = client.get("/api/tickets", params=params, headers=board["headers"])
+        assert response.status_code == 200, response.text
+        seen += [ticket["id"] for ticket in response.json()]
+        cursor = response.headers.get("X-Next-Cursor")
+        if cursor is None:
+            break
+        params["cursor"] = cursor
+    assert seen == created
+
+
+def test_ticket_cursor_rejects_garbage(client, board):
+    response = client.get(
+        "/api/tickets", params={"project_id": board["project"]["id"], "cursor": "!!"}, headers=board["headers"]
+    )
+    assert response.status_code == 400
+
+
+def test_stream_returns_ndjson(client, board, create_ticket):
+    created = [create_ticket(f"Ticket {n}")["id"] for n in range(3)]
+    response = client.get(
+        "/api/tickets", params={"project_id": board["project"]["id"], "stream": "true"}, headers=board["headers"]
+    )
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("application/x-ndjson")
+    assert [json.loads(line)["id"] for line in response.text.splitlines()] == created
@@ -0,0 +1,43 @@
+from backend import permissions
+from backend.realtime import manager
+
+
+def test_membership_is_cached(client, board, make_user, db):
+    project_id = board["project"]["id"]
+    owner_id = board["owner"].id
+    assert permissions.is_project_member(db, project_id, owner_id)
+    hits = permissions.membership_cache.hits
+    assert permissions.is_project_member(db, project_id, owner_id)
+    assert permissions.membership_cache.hits == hits + 1
+
+
+def test_adding_a_member_replaces_cached_denial(client, board, make_user, auth):
+    project_id = board["project"]["id"]
+    user = make_user("bob")
+    assert client.get(f"/api/projects/{project_id}", headers=auth(user)).status_code == 403
+    response = client.post(f"/api/projects/{project_id}/users", params={"user_id": user.id}, headers=board["headers"])
+    assert response.status_code == 200, response.text
+    assert client.get(f"/api/projects/{project_id}", headers=auth(user)).status_code == 200
+
+
+def test_invalidation_is_published_to_other_workers(client, board, make_user, monkeypatch):
+    published = []
+    monkeypatch.setattr(manager.broker, "publish", lambda topic, message: published.append((topic, message)))
+    project_id = board["project"]["id"]
+    user = make_user("bob")
+    client.post(f"/api/projects/{project_id}/users", params={"user_id": user.id}, headers=board["headers"])
+    # The sync route hands the publish to the event loop; any later request runs it.
+    client.get("/api/metrics")
+    assert (permissions.MEMBERSHIP_TOPIC, f"{project_id}:{user.id}") in published
+
+
+def test_invalidation_from_another_worker_drops_entry(client, board, make_user, db):
+    project_id = board["project"]["id"]
+    user = make_user("bob")
+    assert not permissions.is_project_member(db, project_id, user.id)
+    permissions.add_project_member(db, project_id, user.id)
+    db.commit()
+    assert not permissions.is_project_member(db, project_id, user.id)
+    # What the broker delivers when a different worker made the change.
+    manager.broker.deliver(permissions.MEMBERSHIP_TOPIC, f"{project_id}:{user.id}")
+    assert permissions.is_project_member(db, project_id, user.id)
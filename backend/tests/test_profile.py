@@ -0,0 +1,30 @@
+from backend import security
+
+
+def test_async_routes_reuse_cached_principal(client, make_user, auth):
+    headers = auth(make_user("alice"))
+    assert client.get("/api/profile", headers=headers).status_code == 200
+    hits = security.principal_cache.hits
+    assert client.get("/api/profile", headers=headers).status_code == 200
+    assert security.principal_cache.hits == hits + 1
+
+
+def test_update_profile_through_cached_principal(client, make_user, auth):
+    headers = auth(make_user("alice"))
+    client.get("/api/profile", headers=headers)
+    response = client.put("/api/profile", json={"email": "alice@new.example.com"}, headers=headers)
+    assert response.status_code == 200, response.text
+    assert response.json()["email"] == "alice@new.example.com"
+    assert client.get("/api/profile", headers=headers).json()["email"] == "alice@new.example.com"
+
+
+def test_async_routes_reject_bad_tokens(client):
+    response = client.get("/api/profile", headers={"Authorization": "Bearer nonsense"})
+    assert response.status_code == 401
+
+
+def test_settings_use_async_principal(client, board, make_user, auth):
+    project_id = board["project"]["id"]
+    assert client.get(f"/api/projects/{project_id}/settings", headers=board["headers"]).status_code == 200
+    outsider = auth(make_user("mallory"))
+    assert client.get(f"/api/projects/{project_id}/settings", headers=outsider).status_code == 404
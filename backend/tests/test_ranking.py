@@ -0,0 +1,74 @@
+import importlib.util
+from pathlib import Path
+
+import pytest
+
+from backend import ranking
+
+
+def test_between_orders_keys():
+    first = ranking.between(None, None)
+    last = ranking.between(first, None)
+    head = ranking.between(None, first)
+    middle = ranking.between(first, last)
+    assert head < first < middle < last
+
+
+def test_repeated_inserts_at_one_spot_stay_ordered():
+    keys = [ranking.between(None, None)]
+    keys.append(ranking.between(keys[0], None))
+    for _ in range(200):
+        # Always insert right after the first key.
+        keys.insert(1, ranking.between(keys[0], keys[1]))
+    assert keys == sorted(keys)
+    assert len(set(keys)) == len(keys)
+    assert all(not key.endswith("0") for key in keys)
+
+
+def test_between_rejects_unordered_neighbours():
+    with pytest.raises(ValueError):
+        ranking.between("b", "a")
+
+
+def test_spread_is_ascending():
+    keys = ranking.spread(50)
+    assert keys == sorted(keys) and len(set(keys)) == 50
+
+
+def test_migration_keys_match_ranking():
+    path = Path(ranking.__file__).parent / "alembic" / "versions" / "e7b2d5f8a316_ticket_and_column_ranks.py"
+    spec = importlib.util.spec_from_file_location("ranks_migration", path)
+    migration = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(migration)
+    for count in (1, 2, 7, 1000):
+        assert migration._spread(count) == ranking.spread(count)
+
+
+def _column_titles(client, board, column=0):
+    snapshot = client.get(f"/api/boards/{board['board']['id']}/snapshot", headers=board["headers"]).json()
+    return [ticket["title"] for ticket in snapshot["columns"][column]["tickets"]]
+
+
+def test_move_ticket_between_neighbours(client, board, create_ticket):
+    a, b, c = (create_ticket(title) for title in "abc")
+    assert _column_titles(client, board) == ["a", "b", "c"]
+    response = client.post(f"/api/tickets/{c['id']}/move", json={"after_id": a["id"], "before_id": b["id"]}, headers=board["headers"])
+    assert response.status_code == 200, response.text
+    assert _column_titles(client, board) == ["a", "c", "b"]
+    client.post(f"/api/tickets/{a['id']}/move", json={}, headers=board["headers"])
+    assert _column_titles(client, board) == ["c", "b", "a"]
+
+
+def test_move_ticket_to_another_column(client, board, create_ticket):
+    ticket = create_ticket("a")
+    target = board["columns"][1]["id"]
+    response = client.post(f"/api/tickets/{ticket['id']}/move", json={"column_id": target}, headers=board["headers"])
+    assert response.status_code == 200, response.text
+    assert _column_titles(client, board, 1) == ["a"]
+
+
+def test_move_rejects_foreign_neighbour(client, board, create_ticket):
+    ticket = create_ticket("a")
+    other = create_ticket("b", column=1)
+    response = client.post(f"/api/tickets/{ticket['id']}/move", json={"after_id": other["id"]}, headers=board["headers"])
+    assert response.status_code == 409
@@ -0,0 +1,33 @@
+import json
+import time
+
+from backend import realtime
+
+
+def test_idle_listener_survives_past_idle_timeout(client, board, monkeypatch):
+    monkeypatch.setattr(realtime, "WS_PING_INTERVAL_SECONDS", 0.05)
+    monkeypatch.setattr(realtime, "WS_IDLE_TIMEOUT_SECONDS", 0.2)
+    token = board["headers"]["Authorization"].split()[1]
+    with client.websocket_connect(f"/ws?token={token}&project_id={board['project']['id']}") as websocket:
+        deadline = time.monotonic() + 0.6
+        pings = 0
+        # The client only listens; it never sends a pong.
+        while time.monotonic() < deadline:
+            assert json.loads(websocket.receive_text()) == {"type": "ping"}
+            pings += 1
+        assert pings > 5
+        assert len(realtime.manager.subscribers) == 1
+
+
+def test_project_events_reach_subscribers(client, board, create_ticket):
+    token = board["headers"]["Authorization"].split()[1]
+    topic = realtime.project_topic(board["project"]["id"])
+    with client.websocket_connect(f"/ws?token={token}&project_id={board['project']['id']}") as websocket:
+        # Subscription happens after the handshake; wait for it.
+        deadline = time.monotonic() + 5
+        while topic not in realtime.manager.topics and time.monotonic() < deadline:
+            time.sleep(0.01)
+        ticket = create_ticket("Launch")
+        event = json.loads(websocket.receive_text())
+        assert event["type"] == "ticket.created"
+        assert event["ticket_id"] == ticket["id"]
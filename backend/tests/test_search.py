@@ -0,0 +1,66 @@
+import json
+from backend import search
+
+
+def _search(client, board, query, **params):
+    return client.get(
+        "/api/tickets", params={"project_id": board["project"]["id"], "search": query, **params}, headers=board["headers"]
+    )
+
+
+def test_title_matches_rank_above_comment_matches(client, board, create_ticket):
+    mentioned = create_ticket("Unrelated")
+    client.post(
+        f"/api/tickets/{mentioned['id']}/comments",
+        json={"content": "blocks the launch", "ticket_id": mentioned["id"]},
+        headers=board["headers"],
+    )
+    titled = create_ticket("Launch checklist")
+    create_ticket("Something else")
+    response = _search(client, board, "launch")
+    assert response.status_code == 200, response.text
+    assert [ticket["id"] for ticket in response.json()] == [titled["id"], mentioned["id"]]
+
+
+def test_every_term_matches_as_prefix(client, board, create_ticket):
+    create_ticket("Launch checklist")
+    create_ticket("Launch party")
+    assert [ticket["title"] for ticket in _search(client, board, "laun check").json()] == ["Launch checklist"]
+
+
+def test_index_follows_updates_and_deletes(client, board, create_ticket):
+    ticket = create_ticket("Launch checklist")
+    client.put(f"/api/tickets/{ticket['id']}", json={"title": "Landing page"}, headers=board["headers"])
+    assert _search(client, board, "launch").json() == []
+    assert len(_search(client, board, "landing").json()) == 1
+    client.delete(f"/api/tickets/{ticket['id']}", headers=board["headers"])
+    assert _search(client, board, "landing").json() == []
+
+
+def test_index_is_built_from_existing_rows(client, board, create_ticket):
+    create_ticket("Launch checklist")
+    # A fresh worker starts with an empty index and loads it on first search.
+    search.fallback_index = search.InvertedIndex()
+    assert len(_search(client, board, "launch").json()) == 1
+
+
+def test_search_pages_by_offset(client, board, create_ticket):
+    for n in range(5):
+        create_ticket(f"Launch {n}")
+    seen, params = [], {"limit": 2}
+    while True:
+        response = _search(client, board, "launch", **params)
+        seen += [ticket["id"] for ticket in response.json()]
+        cursor = response.headers.get("X-Next-Cursor")
+        if cursor is None:
+            break
+        params["cursor"] = cursor
+    assert len(seen) == len(set(seen)) == 5
+
+
+def test_stream_applies_search(client, board, create_ticket):
+    wanted = create_ticket("Launch checklist")
+    create_ticket("Something else")
+    response = _search(client, board, "laun", stream="true")
+    assert response.status_code == 200
+    assert [json.loads(line)["id"] for line in response.text.splitlines()] == [wanted["id"]]
@@ -0,0 +1,54 @@
+from backend import security
+from backend.realtime import manager
+
+
+def test_principal_is_served_from_cache(client, make_user, auth):
+    user = make_user("alice")
+    headers = auth(user)
+    assert client.get("/api/profile", headers=headers).status_code == 200
+    hits = security.principal_cache.hits
+    assert client.get("/api/profile", headers=headers).json()["username"] == "alice"
+    assert security.principal_cache.hits == hits + 1
+
+
+def test_invalidation_forces_reread(client, make_user, auth, db):
+    user = make_user("alice")
+    headers = auth(user)
+    client.get("/api/profile", headers=headers)
+    user.email = "changed@example.com"
+    db.commit()
+    assert client.get("/api/profile", headers=headers).json()["email"] == "alice@example.com"
+    security.invalidate_user(user.id)
+    assert client.get("/api/profile", headers=headers).json()["email"] == "changed@example.com"
+    # The re-read principal is cached again despite the marker.
+    hits = security.principal_cache.hits
+    client.get("/api/profile", headers=headers)
+    assert security.principal_cache.hits == hits + 1
+
+
+def test_invalidation_markers_are_bounded(monkeypatch):
+    monkeypatch.setattr(security.user_invalidations, "max_size", 10)
+    for user_id in range(100):
+        security.invalidate_user(user_id)
+    assert len(security.user_invalidations) == 10
+
+
+def test_invalidation_is_published_to_other_workers(client, make_user, monkeypatch):
+    published = []
+    monkeypatch.setattr(manager.broker, "publish", lambda topic, message: published.append((topic, message)))
+    user = make_user("alice")
+    security.invalidate_user(user.id)
+    # Published from this (non-loop) thread; any request lets the loop run it.
+    client.get("/api/health")
+    assert (security.USER_TOPIC, str(user.id)) in published
+
+
+def test_invalidation_from_another_worker_forces_reread(client, make_user, auth, db):
+    user = make_user("alice")
+    headers = auth(user)
+    client.get("/api/profile", headers=headers)
+    user.role = "Admin"
+    db.commit()
+    # What the broker delivers when a different worker made the change.
+    manager.broker.deliver(security.USER_TOPIC, str(user.id))
+    assert client.get("/api/profile", headers=headers).json()["role"] == "Admin"
@@ -0,0 +1,53 @@
+import pytest
+from sqlalchemy import select
+from sqlalchemy.exc import IntegrityError
+
+from backend import models
+
+
+def test_ticket_takes_project_from_column(create_ticket, board, db):
+    ticket = create_ticket()
+    assert db.get(models.Ticket, ticket["id"]).project_id == board["project"]["id"]
+
+
+def test_ticket_requires_project(board, db):
+    db.add(models.Ticket(title="Orphan", column_id=board["columns"][0]["id"], rank="1"))
+    with pytest.raises(IntegrityError):
+        db.commit()
+
+
+def test_history_cursor_reaches_the_end(client, board, create_ticket, db):
+    ticket = create_ticket()
+    for revision in range(7):
+        response = client.put(f"/api/tickets/{ticket['id']}", json={"title": f"Revision {revision}"}, headers=board["headers"])
+        assert response.status_code == 200, response.text
+    seen, params = [], {"limit": 3}
+    for _ in range(10):
+        response = client.get(f"/api/tickets/{ticket['id']}/history", params=params, headers=board["headers"])
+        assert response.status_code == 200, response.text
+        seen += [entry["id"] for entry in response.json()]
+        cursor = response.headers.get("X-Next-Cursor")
+        if cursor is None:
+            break
+        params = {"limit": 3, "cursor": cursor}
+    else:
+        pytest.fail("history cursor never ran out")
+    stored = db.execute(select(models.TicketHistory.id).where(models.TicketHistory.ticket_id == ticket["id"])).scalars().all()
+    assert len(stored) >= 7
+    assert seen == sorted(stored, reverse=True)
+
+
+def test_history_rejects_bad_cursor(client, board, create_ticket):
+    ticket = create_ticket()
+    response = client.get(f"/api/tickets/{ticket['id']}/history", params={"cursor": "e30"}, headers=board["headers"])
+    assert response.status_code == 400
+
+
+@pytest.mark.parametrize("field", ["column_id", "title", "status", "priority"])
+def test_update_rejects_clearing_required_fields(client, board, create_ticket, db, field):
+    ticket = create_ticket("Keep")
+    response = client.put(f"/api/tickets/{ticket['id']}", json={field: None}, headers=board["headers"])
+    assert response.status_code == 400
+    assert response.json()["detail"] == f"{field} cannot be null"
+    stored = db.get(models.Ticket, ticket["id"])
+    assert (stored.title, stored.column_id) == ("Keep", board["columns"][0]["id"])
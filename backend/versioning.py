@@ -0,0 +1,80 @@
+from sqlalchemy import select, update
+from sqlalchemy.orm import Session
+from . import models
+
+def bump_project_version(db: Session, project_id: int, amount: int = 1) -> int:
+    """Advance the project's version by `amount` and return the new value.
+
+    Runs inside the current transaction. The UPDATE takes the project row
+    lock, so concurrent writers to the same project commit their versions in
+    order and readers never see a gap fill in behind them. Callers that stamp
+    several tickets reserve one version per ticket so versions stay unique.
+    """
+    return db.execute(_bump(project_id, amount)).scalar_one()
+
+async def bump_project_version_async(db, project_id: int, amount: int = 1) -> int:
+    return (await db.execute(_bump(project_id, amount))).scalar_one()
+
+def _touch_user_projects(user_id: int):
+    # Project reads embed member details, so a profile change alters every
+    # project the user belongs to.
+    return (
+        update(models.Project)
+        .where(models.Project.id.in_(
+            select(models.project_users.c.project_id).where(models.project_users.c.user_id == user_id)
+        ))
+        .values(version=models.Project.version + 1)
+        .execution_options(synchronize_session=False)
+    )
+
+async def touch_user_projects_async(db, user_id: int):
+    await db.execute(_touch_user_projects(user_id))
+
+def _bump(project_id: int, amount: int = 1):
+    return (
+        update(models.Project)
+        .where(models.Project.id == project_id)
+        .values(version=models.Project.version + amount)
+        .returning(models.Project.version)
+    )
+
+def record_tombstone(db: Session, project_id: int, ticket_id: int, version: int):
+    db.add(models.TicketTombstone(project_id=project_id, ticket_id=ticket_id, version=version))
+
+def _version(project_id: int):
+    # Projects awaiting purge (see deletion.py) no longer exist to readers.
+    return select(models.Project.version).where(models.Project.id == project_id, models.Project.deleted_at.is_(None))
+
+def current_version(db: Session, project_id: int):
+    """The project's version, or None if it does not exist or is being deleted."""
+    return db.execute(_version(project_id)).scalar()
+
+async def current_version_async(db, project_id: int):
+    return (await db.execute(_version(project_id))).scalar()
+
+def changes_since(db: Session, project_id: int, since: int, limit: int) -> dict:
+    """Tickets changed and ticket ids removed after `since`, oldest first.
+
+    When more than `limit` tickets changed, the result stops at the last
+    returned ticket's version; callers continue from the returned version.
+    """
+    tickets = db.execute(
+        select(models.Ticket)
+        .where(models.Ticket.project_id == project_id, models.Ticket.version > since)
+        .order_by(models.Ticket.version)
+        .limit(limit + 1)
+    ).scalars().all()
+    has_more = len(tickets) > limit
+    if has_more:
+        tickets = tickets[:limit]
+        upto = tickets[-1].version
+    else:
+        upto = current_version(db, project_id) or since
+    deleted = db.execute(
+        select(models.TicketTombstone.ticket_id).where(
+            models.TicketTombstone.project_id == project_id,
+            models.TicketTombstone.version > since,
+            models.TicketTombstone.version <= upto,
+        )
+    ).scalars().all()
+    return {"version": upto, "has_more": has_more, "tickets": tickets, "deleted": deleted}
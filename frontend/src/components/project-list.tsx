@@ -5,8 +5,7 @@ import axios from 'axios'
 import Link from 'next/link'
 import { Button } from '@/components/ui/button'
 import { Card, CardContent } from '@/components/ui/card'
-import { Avatar, AvatarFallback } from '@/components/ui/avatar'
-import { getInitials, formatDate } from '@/lib/utils'
+import { formatDate } from '@/lib/utils'
 import { FolderOpen, Users, Calendar, Plus } from 'lucide-react'
 
 interface Project {
@@ -14,11 +13,7 @@ interface Project {
   name: string
   description: string
   created_at: string
-  users: Array<{
-    id: number
-    username: string
-    email: string
-  }>
+  member_count: number
 }
 
 export function ProjectList() {
@@ -96,26 +91,10 @@ export function ProjectList() {
                   </div>
                   <div className="flex items-center">
                     <Users className="mr-1 h-3 w-3" />
-                    {project.users?.length || 0} members
+                    {project.member_count} members
                   </div>
                 </div>
               </div>
-              <div className="flex -space-x-1 ml-2">
-                {project.users?.slice(0, 3).map((user) => (
-                  <Avatar key={user.id} className="h-6 w-6 border-2 border-white">
-                    <AvatarFallback className="text-xs">
-                      {getInitials(user.username)}
-                    </AvatarFallback>
-                  </Avatar>
-                ))}
-                {project.users?.length > 3 && (
-                  <div className="h-6 w-6 rounded-full bg-gray-100 border-2 border-white flex items-center justify-center">
-                    <span className="text-xs text-gray-600">
-                      +{project.users.length - 3}
-                    </span>
-                  </div>
-                )}
-              </div>
             </div>
           </CardContent>
         </Card>